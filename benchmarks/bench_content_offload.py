@@ -0,0 +1,87 @@
+# Benchmark: event loop lag tijdens content analyse, met en zonder executor offload
+#
+# Gebruik: python benchmarks/bench_content_offload.py [--texts 20000] [--workers 4]
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from typing import Dict, List, Any
+
+# Voeg de src directory toe aan sys.path zodat we de modules kunnen importeren
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from tools.content_tools import ContentTools
+from orchestration.batch import percentile
+
+SAMPLE_TEXT = (
+    "Ontdek de nieuwe eco-vriendelijke productlijn van GreenTech! Onze duurzame gadgets "
+    "zijn heel goed voor het milieu en niet duur. hij word blij van de de nieuwe oplader , "
+    "die sneller laadt als ooit tevoren. Bestel vandaag nog en geniet van gratis verzending!!"
+)
+
+# Interval van de ticker die de event loop lag meet
+TICK_SECONDS = 0.005
+
+
+async def measure_lag(stop: asyncio.Event, lags: List[float]):
+    """Meet hoeveel later dan gepland een korte sleep terugkomt."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - started - TICK_SECONDS))
+
+
+async def run_scenario(executor_type: str, texts: List[str], workers: int) -> Dict[str, Any]:
+    """Analyseer alle teksten (sentiment, keywords, grammatica) en meet de loop lag."""
+    tools = ContentTools({"executor": {"type": executor_type, "max_workers": workers,
+                                       "chunk_size": 256}})
+    # Warm de executor op zodat het starten van processen niet meetelt
+    await tools.grammar_check_batch(texts[:workers])
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.ensure_future(measure_lag(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        tools.analyze_sentiment_batch(texts),
+        tools.keyword_extraction_batch(texts),
+        tools.grammar_check_batch(texts),
+    )
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    tools.close()
+    return {
+        "executor": executor_type,
+        "elapsed_seconds": round(elapsed, 3),
+        "texts_per_second": round(len(texts) / elapsed),
+        "lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+        "lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+        "lag_max_ms": round(max(lags, default=0.0) * 1000, 2),
+    }
+
+
+async def main():
+    """Draai alle scenario's en print een tabel."""
+    parser = argparse.ArgumentParser(description="Event loop lag benchmark voor ContentTools")
+    parser.add_argument("--texts", type=int, default=20000, help="Aantal teksten per scenario")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Aantal workers voor thread/process executors")
+    args = parser.parse_args()
+
+    texts = [f"{SAMPLE_TEXT} Variant {i}." for i in range(args.texts)]
+    print(f"{args.texts} teksten, {args.workers} workers\n")
+    print(f"{'executor':<10}{'tijd (s)':>10}{'teksten/s':>12}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}")
+    for executor_type in ("inline", "thread", "process"):
+        result = await run_scenario(executor_type, texts, args.workers)
+        print(f"{result['executor']:<10}{result['elapsed_seconds']:>10}{result['texts_per_second']:>12}"
+              f"{result['lag_p50_ms']:>8}ms{result['lag_p99_ms']:>8}ms{result['lag_max_ms']:>8}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
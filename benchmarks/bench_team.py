@@ -0,0 +1,279 @@
+# Benchmark: end-to-end overhead van MarketingTeam met een replay backend
+#
+# Gebruik: python benchmarks/bench_team.py [--campaigns 200] [--concurrency 8]
+#          [--model-latency 0] [--tokens-per-second 0] [--error-rate 0]
+#          [--provider-concurrency 0] [--rate-limit] [--requests-per-minute 0]
+#          [--output resultaten.json] [--baseline baseline.json --max-regression 0.2]
+#
+# Zonder modellatency (standaard) is alle gemeten tijd overhead van de orkestratie.
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import argparse
+import contextlib
+from typing import Dict, List, Any, Optional, Callable, Awaitable, AsyncIterator, Iterable
+
+# Voeg de src directory toe aan sys.path zodat we de modules kunnen importeren
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from main import MarketingTeam
+from orchestration import events
+from orchestration.batch import percentile
+
+CAMPAIGN_TYPES = ("Instagram Post", "Email Campaign", "LinkedIn Post", "Tweet", "Blog Post")
+
+# Interval waarmee het geheugengebruik wordt bemonsterd
+RSS_SAMPLE_SECONDS = 0.01
+
+
+def make_campaigns(count: int) -> List[Dict[str, Any]]:
+    """Maak unieke campagne-specificaties (geen cache hits tussen campagnes)."""
+    return [{
+        "prompt": f"Promoot de nieuwe eco-vriendelijke productlijn, variant {i}",
+        "campaign_type": CAMPAIGN_TYPES[i % len(CAMPAIGN_TYPES)],
+        "brand_info": "GreenTech is een duurzaam technologiebedrijf dat focust op milieuvriendelijke gadgets",
+        "target_audience": "Milieubewuste consumenten tussen 25-40 jaar",
+    } for i in range(count)]
+
+
+def current_rss_mb() -> float:
+    """Huidig resident geheugen van dit proces in MB."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def sample_rss(stop: asyncio.Event, peak: List[float]):
+    """Houd het hoogste RSS bij tot stop gezet wordt."""
+    while not stop.is_set():
+        peak[0] = max(peak[0], current_rss_mb())
+        await asyncio.sleep(RSS_SAMPLE_SECONDS)
+
+
+def make_team(workdir: str, args: argparse.Namespace, cached: bool = False) -> MarketingTeam:
+    """Bouw een team dat de replay backend gebruikt."""
+    backend = {
+        "type": "replay",
+        "recordings": args.recordings,
+        "tokens_per_second": args.tokens_per_second,
+        "error_rate": args.error_rate,
+        "max_concurrency": args.provider_concurrency or None,
+        "seed": args.seed,
+        "latency": ({"distribution": "lognormal", "median_seconds": args.model_latency, "sigma": 0.4}
+                    if args.model_latency else {"distribution": "constant", "seconds": 0.0}),
+    }
+    config = {
+        "content_creator": {"backend": backend},
+        "marketing_reviewer": {"backend": backend},
+        "search_tools": {"cache": {"enabled": False}},
+        "response_cache": {"enabled": cached, "path": os.path.join(workdir, "responses.sqlite")},
+        "batch": {"concurrency": args.concurrency},
+        "rate_limits": {"default": {
+            "requests_per_minute": args.requests_per_minute or None,
+            "tokens_per_minute": args.tokens_per_minute or None,
+            "max_concurrency": args.concurrency,
+        }} if args.rate_limit else {},
+        "pipeline": {
+            "creator": {"workers": max(1, args.concurrency // 2)},
+            "reviewer": {"workers": max(1, args.concurrency // 2)},
+            "dedup": {"enabled": False}
+        },
+    }
+    path = os.path.join(workdir, f"config-{'cached' if cached else 'plain'}.json")
+    with open(path, "w") as f:
+        json.dump(config, f)
+    return MarketingTeam(path)
+
+
+async def measure(name: str, scenario: Callable[[], Awaitable[List[float]]], attempted: int) -> Dict[str, Any]:
+    """Draai een scenario en bereken latency-percentielen, doorvoer en piek-RSS.
+
+    Args:
+        name: Naam van het scenario
+        scenario: Geeft de latencies van de geslaagde runs
+        attempted: Aantal gestarte runs (het verschil telt als fout)
+    """
+    peak = [current_rss_mb()]
+    stop = asyncio.Event()
+    sampler = asyncio.ensure_future(sample_rss(stop, peak))
+    started = time.perf_counter()
+    latencies = await scenario()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    return {
+        "scenario": name,
+        "runs": len(latencies),
+        "errors": attempted - len(latencies),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "peak_rss_mb": round(peak[0], 1),
+    }
+
+
+async def item_latencies(run: Callable[[Iterable[Dict[str, Any]]], AsyncIterator[Dict[str, Any]]],
+                         campaigns: List[Dict[str, Any]]) -> List[float]:
+    """Meet de latency van de geslaagde items van een runner met perf_counter.
+
+    De runners ronden latency_seconds af op milliseconden, wat bij snelle
+    backends 0 oplevert. Hier loopt de klok vanaf het moment dat de runner
+    een campagne uit de invoer haalt tot het item terugkomt.
+    """
+    started: Dict[int, float] = {}
+
+    def source():
+        for index, campaign in enumerate(campaigns):
+            started[index] = time.perf_counter()
+            yield campaign
+
+    latencies = []
+    async for item in run(source()):
+        if item["status"] == "ok":
+            latencies.append(time.perf_counter() - started[item["index"]])
+    return latencies
+
+
+async def run_benchmarks(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Draai alle scenario's: single, batch, pipelined, streaming en cached."""
+    workdir = tempfile.mkdtemp(prefix="bench_team_")
+    team = make_team(workdir, args)
+    cached_team = make_team(workdir, args, cached=True)
+    campaigns = make_campaigns(args.campaigns)
+    singles = campaigns[:args.single_runs]
+
+    async def single() -> List[float]:
+        latencies = []
+        for campaign in singles:
+            started = time.perf_counter()
+            try:
+                await team.run(**campaign)
+            except Exception:
+                continue
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def batch() -> List[float]:
+        return await item_latencies(lambda source: team.run_many(source, args.concurrency), campaigns)
+
+    async def pipelined() -> List[float]:
+        return await item_latencies(team.run_pipelined, campaigns)
+
+    async def streaming() -> List[float]:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(campaign: Dict[str, Any]) -> Optional[float]:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async for event in team.run_stream(**campaign):
+                        if event["type"] == events.DONE:
+                            return time.perf_counter() - started
+                except Exception:
+                    pass
+            return None
+
+        latencies = await asyncio.gather(*(one(campaign) for campaign in campaigns))
+        return [latency for latency in latencies if latency is not None]
+
+    async def cached() -> List[float]:
+        return await item_latencies(lambda source: cached_team.run_many(source, args.concurrency), campaigns)
+
+    # Warm-up (imports, eerste allocaties) en het vullen van de response cache
+    async for _ in team.run_many(campaigns[:1], 1):
+        pass
+    async for _ in cached_team.run_many(campaigns, args.concurrency):
+        pass
+
+    results = []
+    for name, scenario in (("single", single), ("batch", batch), ("pipelined", pipelined),
+                           ("streaming", streaming), ("cached", cached)):
+        results.append(await measure(name, scenario, len(singles) if name == "single" else len(campaigns)))
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, max_regression: float) -> List[str]:
+    """Vergelijk p95 en doorvoer met een eerder opgeslagen run.
+
+    Returns:
+        Beschrijvingen van de scenario's die meer dan max_regression achteruit gingen
+    """
+    with open(baseline_path, "r") as f:
+        baseline = {item["scenario"]: item for item in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        base = baseline.get(result["scenario"])
+        if base is None:
+            continue
+        # Een baseline van 0 (bijv. een meetfout) mag geen regressie verbergen
+        if result["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{result['scenario']}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["throughput_per_second"] < base["throughput_per_second"] * (1 - max_regression):
+            regressions.append(f"{result['scenario']}: doorvoer {base['throughput_per_second']}/s -> "
+                               f"{result['throughput_per_second']}/s")
+    return regressions
+
+
+def main():
+    """Draai de benchmark, print een tabel en vergelijk optioneel met een baseline."""
+    parser = argparse.ArgumentParser(description="End-to-end benchmark voor MarketingTeam met een replay backend")
+    parser.add_argument("--campaigns", type=int, default=200, help="Aantal campagnes per scenario")
+    parser.add_argument("--single-runs", type=int, default=50, help="Aantal runs in het single scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Gelijktijdige campagnes")
+    parser.add_argument("--model-latency", type=float, default=0.0,
+                        help="Mediane tijd tot het eerste token in seconden (0 = alleen overhead meten)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Gesimuleerde outputsnelheid (0 = direct)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Kans op een gesimuleerde 429 per call")
+    parser.add_argument("--provider-concurrency", type=int, default=0,
+                        help="Gesimuleerd quotum: calls boven dit aantal gelijktijdige calls krijgen een 429")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Gebruik de adaptieve rate limiter (concurrency, retries na 429)")
+    parser.add_argument("--requests-per-minute", type=float, default=0.0, help="Limiet voor --rate-limit")
+    parser.add_argument("--tokens-per-minute", type=float, default=0.0, help="Limiet voor --rate-limit")
+    parser.add_argument("--recordings", help="JSONL met opgenomen completions (backend type \"record\")")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Schrijf de resultaten als JSON naar dit bestand")
+    parser.add_argument("--baseline", help="JSON van een eerdere run om mee te vergelijken")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Toegestane achteruitgang t.o.v. de baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # De prints van MarketingTeam horen niet in de uitvoer van de benchmark
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = asyncio.run(run_benchmarks(args))
+
+    print(f"\n{args.campaigns} campagnes, concurrency {args.concurrency}, "
+          f"modellatency {args.model_latency}s\n")
+    print(f"{'scenario':<12}{'runs':>6}{'fouten':>8}{'runs/s':>10}{'p50':>11}{'p95':>11}{'p99':>11}{'piek RSS':>11}")
+    for result in results:
+        print(f"{result['scenario']:<12}{result['runs']:>6}{result['errors']:>8}{result['throughput_per_second']:>10}"
+              f"{result['p50_ms']:>9}ms{result['p95_ms']:>9}ms{result['p99_ms']:>9}ms"
+              f"{result['peak_rss_mb']:>8} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"arguments": vars(args), "results": results}, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.max_regression)
+        for regression in regressions:
+            print(f"Regressie: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# Model Backends voor AutoGen Marketing Team
+
+import os
+import json
+import math
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Dict, List, Any, Optional, AsyncIterator
+
+# Standaardantwoorden van de replay backend als er geen opnames zijn
+DEFAULT_COMPLETIONS = {
+    "content_creator": (
+        "Ontdek de nieuwe eco-vriendelijke productlijn van GreenTech! Slimme gadgets die "
+        "minder energie verbruiken, langer meegaan en gemaakt zijn van gerecyclede materialen. "
+        "Duurzaam leven was nog nooit zo eenvoudig. Bekijk de collectie via de link in onze bio. "
+        "#GreenTech #Duurzaam #EcoTech"
+    ),
+    "marketing_reviewer": (
+        "<score>8</score>\n"
+        "<strengths>Duidelijke boodschap, past bij de doelgroep en heeft een concrete call-to-action.</strengths>\n"
+        "<improvements>Maak het voordeel voor de gebruiker concreter en verkort de tweede zin.</improvements>\n"
+        "<improved_content>Ontdek de eco-vriendelijke gadgets van GreenTech: tot 40% zuiniger, "
+        "gemaakt van gerecyclede materialen en gebouwd om lang mee te gaan. Duurzaam leven, "
+        "zonder concessies. Bekijk de collectie via de link in onze bio. #GreenTech #Duurzaam</improved_content>\n"
+        "<explanation>Het voordeel is meetbaar gemaakt en de tekst is compacter.</explanation>"
+    ),
+}
+
+
+def prompt_hash(text: str) -> str:
+    """SHA-256 van een prompt, waarmee opnames aan prompts gekoppeld worden."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ModelCallError(Exception):
+    """Fout van een modelcall met de HTTP-status van de provider.
+
+    Attributes:
+        status_code: HTTP-status (bijv. 429 of 529 bij overbelasting)
+        retry_after: Door de provider gevraagde wachttijd in seconden (of None)
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class ModelResponse:
+    """Response in de vorm die LLMClient van een agent verwacht (message.content en usage)."""
+
+    def __init__(self, content: str, usage: Dict[str, int]):
+        self.message = _Message(content)
+        self.usage = usage
+
+
+class ReplayStream:
+    """Streaming response: geeft chunks met de ingestelde tokensnelheid."""
+
+    def __init__(self, backend: "ReplayBackend", chunks: List[str], delays: List[float],
+                 usage: Dict[str, int], error: Optional[ModelCallError] = None):
+        self._backend = backend
+        self._chunks = chunks
+        self._delays = delays
+        self._error = error
+        self.usage = usage
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        self._backend._active += 1
+        try:
+            for index, (chunk, delay) in enumerate(zip(self._chunks, self._delays)):
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Een geïnjecteerde fout midden in de stream
+                if self._error is not None and index == len(self._chunks) // 2:
+                    raise self._error
+                yield chunk
+        finally:
+            self._backend._active -= 1
+
+
+class ReplayBackend:
+    """Lokale, deterministische stand-in voor het model.
+
+    Speelt opgenomen completions af (zie RecordingBackend) met een
+    configureerbare latency-verdeling, tokensnelheid en foutinjectie, zodat de
+    overhead van de orkestratie gemeten kan worden zonder een echt model.
+    Willekeur is per prompt en per herhaling van die prompt geseed, zodat een
+    benchmark bij gelijke invoer dezelfde latencies en fouten oplevert, ook als
+    calls in een andere volgorde binnenkomen.
+
+    Configuratie voorbeeld::
+
+        {
+            "type": "replay",
+            "recordings": "benchmarks/recordings.jsonl",
+            "latency": {"distribution": "lognormal", "median_seconds": 0.8, "sigma": 0.4},
+            "tokens_per_second": 80,
+            "error_rate": 0.02,
+            "error_status": 429,
+            "retry_after_seconds": 1.0,
+            "max_concurrency": 8,
+            "seed": 42
+        }
+
+    Met max_concurrency gedraagt de backend zich als een provider met een
+    quotum: een call boven dat aantal gelijktijdige calls krijgt direct een 429.
+    """
+
+    def __init__(self, name: str, system_message: str, config: Dict[str, Any]):
+        """Initialize de backend.
+
+        Args:
+            name: Naam van de agent (kiest de opnames en standaardantwoorden)
+            system_message: System message van de agent
+            config: Settings: recordings, completions, latency, tokens_per_second,
+                chunk_tokens, error_rate, error_status, retry_after_seconds,
+                max_concurrency, seed
+        """
+        self.name = name
+        self.system_message = system_message
+        self.latency = config.get("latency", {"distribution": "constant", "seconds": 0.0})
+        self.tokens_per_second = config.get("tokens_per_second", 0)
+        self.chunk_tokens = max(1, config.get("chunk_tokens", 8))
+        self.error_rate = config.get("error_rate", 0.0)
+        self.error_status = config.get("error_status", 429)
+        self.retry_after = config.get("retry_after_seconds")
+        self.seed = config.get("seed", 0)
+        self.max_concurrency = config.get("max_concurrency")
+        self.calls = 0
+        self.rejected = 0
+        self._active = 0
+        self._occurrences: Dict[str, int] = {}
+
+        # Opnames van deze agent: exact per prompt-hash, en als pool voor onbekende prompts
+        self._by_prompt: Dict[str, Dict[str, Any]] = {}
+        self._pool: List[Dict[str, Any]] = [{"completion": c} for c in config.get("completions", [])]
+        path = config.get("recordings")
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record.get("agent", name) != name:
+                        continue
+                    self._pool.append(record)
+                    if record.get("prompt_sha256"):
+                        self._by_prompt[record["prompt_sha256"]] = record
+        if not self._pool:
+            self._pool.append({"completion": DEFAULT_COMPLETIONS.get(name, DEFAULT_COMPLETIONS["content_creator"])})
+
+    def _rng(self, key: str) -> random.Random:
+        """Geef een RNG die alleen van de seed, de prompt en de herhaling afhangt."""
+        occurrence = self._occurrences.get(key, 0)
+        self._occurrences[key] = occurrence + 1
+        return random.Random(f"{self.seed}:{key}:{occurrence}")
+
+    def _sample_latency(self, rng: random.Random) -> float:
+        """Trek de tijd tot het eerste token uit de geconfigureerde verdeling."""
+        distribution = self.latency.get("distribution", "constant")
+        if distribution == "lognormal":
+            return rng.lognormvariate(math.log(self.latency.get("median_seconds", 0.5)),
+                                      self.latency.get("sigma", 0.5))
+        if distribution == "uniform":
+            return rng.uniform(self.latency.get("min_seconds", 0.0), self.latency.get("max_seconds", 1.0))
+        if distribution == "exponential":
+            return rng.expovariate(1.0 / max(1e-9, self.latency.get("mean_seconds", 0.5)))
+        return self.latency.get("seconds", 0.0)
+
+    async def generate_response(self, text: str, is_chat: bool = False, stream: bool = False,
+                                messages: Optional[List[Dict[str, Any]]] = None, **kwargs: Any):
+        """Geef een (opgenomen) completion terug, met gesimuleerde latency en fouten.
+
+        Args:
+            text: De prompt
+            is_chat: Genegeerd (compatibel met de agent-interface)
+            stream: Geef een ReplayStream in plaats van een ModelResponse
+            messages: Genegeerd (prompt caching wordt niet gesimuleerd)
+
+        Returns:
+            ModelResponse, of ReplayStream bij stream=True
+
+        Raises:
+            ModelCallError: Bij een geïnjecteerde fout
+        """
+        self.calls += 1
+        if self.max_concurrency and self._active >= self.max_concurrency:
+            self.rejected += 1
+            raise ModelCallError(f"Quotum van {self.max_concurrency} gelijktijdige calls overschreden",
+                                 429, self.retry_after)
+        key = prompt_hash(text)
+        rng = self._rng(key)
+        record = self._by_prompt.get(key) or self._pool[int(key[:8], 16) % len(self._pool)]
+        completion = record["completion"]
+        output_tokens = _estimate_tokens(completion)
+        usage = record.get("usage") or {"input_tokens": _estimate_tokens(text), "output_tokens": output_tokens}
+
+        first_token = self._sample_latency(rng)
+        error = None
+        if self.error_rate and rng.random() < self.error_rate:
+            error = ModelCallError(f"Gesimuleerde fout {self.error_status} voor {self.name}",
+                                   self.error_status, self.retry_after)
+
+        if not stream:
+            duration = first_token + (output_tokens / self.tokens_per_second if self.tokens_per_second else 0.0)
+            if duration > 0:
+                self._active += 1
+                try:
+                    await asyncio.sleep(duration)
+                finally:
+                    self._active -= 1
+            if error is not None:
+                raise error
+            return ModelResponse(completion, usage)
+
+        if error is not None and rng.random() < 0.5:
+            # Helft van de fouten komt vóór het eerste token, de rest halverwege de stream
+            await asyncio.sleep(first_token)
+            raise error
+        size = self.chunk_tokens * 4
+        chunks = [completion[i:i + size] for i in range(0, len(completion), size)] or [""]
+        per_chunk = self.chunk_tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+        delays = [first_token] + [per_chunk] * (len(chunks) - 1)
+        return ReplayStream(self, chunks, delays, usage, error)
+
+
+class RecordingBackend:
+    """Neemt completions van een echte agent op voor later afspelen met ReplayBackend."""
+
+    def __init__(self, agent, path: str):
+        """Initialize de backend.
+
+        Args:
+            agent: De AutoGen agent die de completions genereert
+            path: JSONL-bestand waaraan de opnames worden toegevoegd
+        """
+        self.agent = agent
+        self.name = getattr(agent, "name", "")
+        self.system_message = getattr(agent, "system_message", "")
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _write(self, text: str, completion: str, usage: Any):
+        if not isinstance(usage, dict):
+            usage = {name: getattr(usage, name) for name in ("input_tokens", "output_tokens")
+                     if getattr(usage, name, None) is not None} if usage is not None else None
+        record = {"agent": self.name, "prompt_sha256": prompt_hash(text), "completion": completion}
+        if usage:
+            record["usage"] = usage
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def generate_response(self, text: str, **kwargs: Any):
+        response = await self.agent.generate_response(text, **kwargs)
+        if not hasattr(response, "__aiter__"):
+            self._write(text, response.message.content, getattr(response, "usage", None))
+            return response
+        return _RecordedStream(self, text, response)
+
+
+class _RecordedStream:
+    """Geeft een stream ongewijzigd door en neemt de volledige tekst op."""
+
+    def __init__(self, backend: RecordingBackend, text: str, response: Any):
+        self._backend = backend
+        self._text = text
+        self._response = response
+
+    @property
+    def usage(self):
+        return getattr(self._response, "usage", None)
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        chunks = []
+        async for chunk in self._response:
+            chunks.append(chunk if isinstance(chunk, str) else getattr(chunk, "content", "") or "")
+            yield chunk
+        self._backend._write(self._text, "".join(chunks), self.usage)
+
+
+def create_backend(agent, config: Optional[Dict[str, Any]] = None):
+    """Kies de backend voor de modelcalls van een agent.
+
+    Args:
+        agent: De AutoGen agent (standaard backend)
+        config: De "backend" sectie uit de agentconfig: type "autogen" (standaard),
+            "replay" of "record" (autogen met opname naar "path")
+
+    Returns:
+        Object met een async generate_response(text, ...) en name/system_message
+    """
+    config = config or {}
+    backend_type = config.get("type", "autogen")
+    if backend_type == "autogen":
+        return agent
+    if backend_type == "replay":
+        return ReplayBackend(getattr(agent, "name", ""), getattr(agent, "system_message", ""), config)
+    if backend_type == "record":
+        return RecordingBackend(agent, config.get("path", "benchmarks/recordings.jsonl"))
+    raise ValueError(f"Onbekend backend type: {backend_type}")
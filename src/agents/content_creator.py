@@ -1,18 +1,33 @@
 # ContentCreator Agent voor AutoGen Marketing Team
 
 import autogen
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
+
+from agents.llm_client import LLMClient
+from agents.backends import create_backend
+from agents.prompt_builder import PromptAssembler, AssembledPrompt
+from cache.response_cache import ResponseCache
+from retrieval.campaign_index import CampaignIndex, entry_text
+from utils.rate_limiter import RateLimiter
 
 class ContentCreator:
     """Agent die verantwoordelijk is voor het creëren van originele marketingcontent."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 example_index: Optional[CampaignIndex] = None):
         """Initialize the ContentCreator agent.
         
         Args:
             config: Configuratie voor de agent, inclusief model settings
+                (en few_shot: {"k", "min_score", "max_chars"}; backend: zie agents/backends.py)
+            rate_limiter: Optionele gedeelde rate limiter voor modelcalls
+            cache: Optionele gedeelde response cache
+            example_index: Optionele index met eerdere campagnes voor few-shot voorbeelden
         """
         self.config = config
+        self.example_index = example_index
+        self.few_shot = config.get("few_shot", {})
         self.llm_config = {
             "model": config.get("model", "claude-3-5-sonnet"),
             "temperature": config.get("temperature", 0.7),
@@ -29,9 +44,70 @@ class ContentCreator:
             """,
             llm_config=self.llm_config
         )
+        
+        # Modelcalls lopen via de agent, of via een replay backend voor tests en benchmarks
+        self.llm = LLMClient(create_backend(self.agent, config.get("backend")), self.llm_config,
+                             rate_limiter, cache,
+                             prompt_caching=config.get("prompt_caching", True))
+        
+        # Vaste instructies staan vooraan zodat ze een herbruikbare prompt-prefix vormen
+        self.prompt_assembler = PromptAssembler(
+            """Creëer marketingcontent voor het onderstaande merk en de onderstaande doelgroep.
+            Zorg dat de content perfect is afgestemd op de merkidentiteit en doelgroep.
+            Maak het overtuigend, boeiend en geschikt voor het opgegeven kanaal.
+            Gebruik relevante feiten uit de marktcontext als die is meegegeven, zonder bronnen letterlijk over te nemen.
+            Eventuele voorbeelden zijn eerdere, goed beoordeelde campagnes: neem de aanpak over, niet de tekst."""
+        )
+        self.revision_assembler = PromptAssembler(
+            """Herschrijf de huidige versie van de marketingcontent voor het onderstaande merk en de onderstaande doelgroep.
+            Verwerk de feedback van de laatste review en behoud wat in eerdere rondes goed werkte.
+            Geef alleen de nieuwe versie van de content terug."""
+        )
+    
+    def find_examples(self, campaign_type: str, target_audience: str,
+                      prompt: str) -> List[Dict[str, Any]]:
+        """Zoek vergelijkbare, goed beoordeelde campagnes in de example index.
+        
+        Returns:
+            De top-k campagnes (leeg zonder index)
+        """
+        if self.example_index is None:
+            return []
+        return self.example_index.search(
+            entry_text(campaign_type, target_audience, prompt),
+            k=self.few_shot.get("k", 3),
+            min_score=self.few_shot.get("min_score", 8)
+        )
+    
+    def _format_examples(self, examples: List[Dict[str, Any]]) -> str:
+        """Zet voorbeelden om naar een promptblok, elk ingekort tot max_chars."""
+        max_chars = self.few_shot.get("max_chars", 1200)
+        parts = []
+        for number, example in enumerate(examples, 1):
+            content = example["content"]
+            if len(content) > max_chars:
+                content = content[:max_chars].rsplit(" ", 1)[0] + "..."
+            parts.append(f"Voorbeeld {number} ({example['campaign_type']}, score {example['score']}/10):\n{content}")
+        return "\n\n".join(parts)
+    
+    def _build_prompt(self, brand_info: str, campaign_type: str, target_audience: str,
+                      prompt: str, research_context: Optional[str] = None) -> AssembledPrompt:
+        """Bouw de content prompt met de stabiele delen (merk, doelgroep) vooraan."""
+        volatile = [("KANAAL", campaign_type)]
+        examples = self.find_examples(campaign_type, target_audience, prompt)
+        if examples:
+            volatile.append(("VOORBEELDEN", self._format_examples(examples)))
+        if research_context:
+            volatile.append(("MARKTCONTEXT", research_context))
+        volatile.append(("VERZOEK", prompt))
+        return self.prompt_assembler.assemble(
+            stable=[("MERK INFORMATIE", brand_info), ("DOELGROEP", target_audience)],
+            volatile=volatile
+        )
     
     async def create_content(self, brand_info: str, campaign_type: str, 
-                           target_audience: str, prompt: str) -> str:
+                           target_audience: str, prompt: str,
+                           research_context: Optional[str] = None) -> str:
         """Creëer marketingcontent op basis van de verstrekte informatie.
         
         Args:
@@ -39,30 +115,64 @@ class ContentCreator:
             campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
             target_audience: Beschrijving van de doelgroep
             prompt: Specifieke instructies voor de content
+            research_context: Optionele marktcontext uit de research stage
             
         Returns:
             De gegenereerde marketingcontent
         """
         # Bouw de complete prompt
-        content_prompt = f"""Creëer {campaign_type} content voor het volgende merk:
-        
-        MERK INFORMATIE:
-        {brand_info}
+        content_prompt = self._build_prompt(brand_info, campaign_type, target_audience, prompt,
+                                            research_context)
         
-        DOELGROEP:
-        {target_audience}
-        
-        VERZOEK:
-        {prompt}
+        # Gebruik de agent om content te genereren
+        return await self.llm.complete(content_prompt)
+    
+    async def revise_content(self, brand_info: str, campaign_type: str,
+                             target_audience: str, prompt: str, content: str,
+                             feedback: str, history: str = "") -> str:
+        """Reviseer content op basis van reviewfeedback.
         
-        Zorg dat de content perfect is afgestemd op de merkidentiteit en doelgroep.
-        Maak het overtuigend, boeiend en geschikt voor het specifieke kanaal ({campaign_type}).
+        Args:
+            brand_info: Informatie over het merk
+            campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
+            target_audience: Beschrijving van de doelgroep
+            prompt: Specifieke instructies voor de content
+            content: De huidige versie van de content
+            feedback: Verbeterpunten uit de laatste review
+            history: Samenvatting van eerdere rondes (scores en verbeterpunten)
+            
+        Returns:
+            De gereviseerde marketingcontent
         """
+        volatile = [("KANAAL", campaign_type), ("VERZOEK", prompt)]
+        if history:
+            volatile.append(("EERDERE RONDES", history))
+        volatile += [("HUIDIGE VERSIE", content), ("FEEDBACK", feedback or "Geen specifieke verbeterpunten")]
+        revision_prompt = self.revision_assembler.assemble(
+            stable=[("MERK INFORMATIE", brand_info), ("DOELGROEP", target_audience)],
+            volatile=volatile
+        )
+        return await self.llm.complete(revision_prompt)
+    
+    async def create_content_stream(self, brand_info: str, campaign_type: str,
+                                    target_audience: str, prompt: str,
+                                    research_context: Optional[str] = None) -> AsyncIterator[str]:
+        """Creëer marketingcontent en geef de tekst in stukken terug zodra die binnenkomt.
         
-        # Gebruik de agent om content te genereren
-        response = await self.agent.generate_response(content_prompt, is_chat=False)
-        
-        return response.message.content
+        Args:
+            brand_info: Informatie over het merk
+            campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
+            target_audience: Beschrijving van de doelgroep
+            prompt: Specifieke instructies voor de content
+            research_context: Optionele marktcontext uit de research stage
+            
+        Returns:
+            Async iterator met tekstfragmenten van de content
+        """
+        content_prompt = self._build_prompt(brand_info, campaign_type, target_audience, prompt,
+                                            research_context)
+        async for chunk in self.llm.stream(content_prompt):
+            yield chunk
     
     def get_agent(self):
         """Return de onderliggende AutoGen agent voor groepschats."""
@@ -0,0 +1,175 @@
+# Incrementele Review voor AutoGen Marketing Team
+
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+from agents.prompt_builder import PromptAssembler, AssembledPrompt
+
+_SECTION_SPLIT_RE = re.compile(r"\n\s*\n")
+_WHITESPACE_RE = re.compile(r"\s+")
+_SECTION_RE = re.compile(r"<section\s+id=\"?(\d+)\"?\s*>(.*?)</section>", re.DOTALL | re.IGNORECASE)
+
+# Aantal tekens waarmee ongewijzigde secties als context worden meegegeven
+OUTLINE_CHARS = 80
+
+_SECTION_ASSEMBLER = PromptAssembler(
+    """Beoordeel en verbeter alleen de gemarkeerde secties van de marketingcontent onderaan dit bericht.
+    De overige secties staan ingekort in de opbouw als context.
+
+    Antwoord per beoordeelde sectie in exact dit formaat:
+    <section id="N"><score>geheel getal van 1 tot 10</score><improvements>verbeterpunten</improvements><improved_content>alleen de verbeterde sectie</improved_content></section>"""
+)
+
+
+def split_sections(content: str) -> List[str]:
+    """Splits content in secties (alinea's gescheiden door lege regels).
+
+    Args:
+        content: De volledige content
+
+    Returns:
+        Lijst met niet-lege secties
+    """
+    return [section.strip() for section in _SECTION_SPLIT_RE.split(content) if section.strip()]
+
+
+def fingerprint(*parts: str) -> str:
+    """Stabiele fingerprint van tekst, ongevoelig voor verschillen in witruimte."""
+    normalized = "\x1f".join(_WHITESPACE_RE.sub(" ", part).strip() for part in parts)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class SectionReviewCache:
+    """Begrensde LRU-cache van reviewresultaten per sectie."""
+
+    def __init__(self, max_entries: int = 2048):
+        """Initialize de cache.
+
+        Args:
+            max_entries: Maximaal aantal gecachete secties
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Haal het reviewresultaat van een sectie op."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Sla het reviewresultaat van een sectie op."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def build_section_prompt(sections: List[str], changed: List[int], brand_info: str,
+                         campaign_type: str, target_audience: str) -> AssembledPrompt:
+    """Bouw een review prompt voor alleen de gewijzigde secties.
+
+    Ongewijzigde secties gaan als ingekorte outline mee, zodat het model de
+    context van de hele content kent zonder dat die volledig verstuurd wordt.
+
+    Args:
+        sections: Alle secties van de content
+        changed: Indices van de te beoordelen secties
+        brand_info: Informatie over het merk
+        campaign_type: Type campagne
+        target_audience: Beschrijving van de doelgroep
+
+    Returns:
+        De review prompt
+    """
+    changed_set = set(changed)
+    outline = []
+    for index, section in enumerate(sections):
+        if index in changed_set:
+            outline.append(f"[{index}] (te beoordelen)")
+        else:
+            short = section[:OUTLINE_CHARS] + ("..." if len(section) > OUTLINE_CHARS else "")
+            outline.append(f"[{index}] {short}")
+    to_review = "\n".join(f'<section id="{index}">\n{sections[index]}\n</section>' for index in changed)
+
+    return _SECTION_ASSEMBLER.assemble(
+        stable=[("MERK INFORMATIE", brand_info), ("DOELGROEP", target_audience)],
+        volatile=[
+            ("KANAAL", campaign_type),
+            ("OPBOUW VAN DE VOLLEDIGE CONTENT (ongewijzigde secties ingekort)", "\n".join(outline)),
+            ("TE BEOORDELEN SECTIES", to_review),
+        ]
+    )
+
+
+def parse_section_response(text: str, parser) -> Dict[int, Dict[str, Any]]:
+    """Parse het antwoord op een sectie-review.
+
+    Args:
+        text: Response van het model
+        parser: ReviewParser voor de inhoud van elke sectie
+
+    Returns:
+        Dict van sectie-index naar score, verbeterpunten en verbeterde sectie.
+        Secties zonder bruikbare score ontbreken.
+    """
+    results = {}
+    for match in _SECTION_RE.finditer(text):
+        parsed = parser.parse(match.group(2))
+        if "error" in parsed:
+            continue
+        results[int(match.group(1))] = {
+            "score": parsed["score"],
+            "improvements": parsed["improvements"],
+            "improved_content": parsed["improved_content"],
+        }
+    return results
+
+
+def merge_sections(sections: List[str], reviews: List[Optional[Dict[str, Any]]],
+                   raw_review: str) -> Dict[str, Any]:
+    """Voeg de per-sectie resultaten samen tot het standaard reviewformaat.
+
+    De totaalscore is het naar lengte gewogen gemiddelde van de sectiescores.
+
+    Args:
+        sections: Alle secties van de content
+        reviews: Reviewresultaat per sectie (None als de sectie niet beoordeeld kon worden)
+        raw_review: De ruwe modelresponse van deze ronde
+
+    Returns:
+        Dict met score, review en improved_content (zoals review_content), plus details per sectie
+    """
+    weighted, total_weight = 0.0, 0
+    improved, notes = [], []
+    for index, (section, review) in enumerate(zip(sections, reviews)):
+        if review is None:
+            improved.append(section)
+            continue
+        weighted += review["score"] * len(section)
+        total_weight += len(section)
+        improved.append(review["improved_content"] or section)
+        if review["improvements"]:
+            notes.append(f"Sectie {index}: {review['improvements']}")
+
+    score = round(weighted / total_weight, 1) if total_weight else 0
+    result = {
+        "score": int(score) if float(score).is_integer() else score,
+        "review": "\n\n".join(notes) or raw_review,
+        "improved_content": "\n\n".join(improved),
+        "sections": [
+            {"index": index, "score": review["score"] if review else None,
+             "cached": bool(review and review.get("cached"))}
+            for index, review in enumerate(reviews)
+        ],
+    }
+    if total_weight == 0:
+        result["error"] = "Geen enkele sectie kon beoordeeld worden"
+    return result
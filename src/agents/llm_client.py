@@ -0,0 +1,293 @@
+# LLM Client voor AutoGen Marketing Team
+
+import time
+import asyncio
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterator, Union
+
+from agents.prompt_builder import AssembledPrompt
+from cache.response_cache import ResponseCache, make_cache_key
+from utils.rate_limiter import RateLimiter, overload_status, retry_after_seconds
+from utils.tracing import tracer
+
+# Usage-velden zoals de provider ze rapporteert, met onze namen
+USAGE_FIELDS = {
+    "input_tokens": "input_tokens",
+    "output_tokens": "output_tokens",
+    "cache_read_input_tokens": "cache_read_tokens",
+    "cache_creation_input_tokens": "cache_write_tokens",
+}
+
+Prompt = Union[str, AssembledPrompt]
+
+# Tokentellers van de usage_scope die in de huidige task actief is
+_usage_scope: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("usage_scope", default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    """Ruwe schatting van het aantal tokens (ongeveer 4 tekens per token)."""
+    return max(1, len(text) // 4)
+
+
+@contextmanager
+def usage_scope() -> Iterator[Dict[str, int]]:
+    """Tel de tokens van alle modelcalls binnen dit blok, ook die van subtaken.
+
+    Anders dan de tellers per client telt dit alleen de calls van de eigen
+    task, ook als andere campagnes tegelijk dezelfde agents gebruiken.
+
+    Returns:
+        Context manager die de (bijgewerkte) tellers per usage-veld geeft
+    """
+    totals = {name: 0 for name in USAGE_FIELDS.values()}
+    token = _usage_scope.set(totals)
+    try:
+        yield totals
+    finally:
+        _usage_scope.reset(token)
+
+
+class LLMClient:
+    """Gedeelde aanroeplaag voor de modelcalls van de agents.
+
+    Alle agents roepen het model via deze client aan, zodat gedeelde zaken
+    zoals het rate-budget per provider, de response cache, prompt caching en
+    het bijhouden van token usage op één plek worden afgehandeld. Een 429 of
+    overbelasting wordt aan de gedeelde rate limiter gemeld (die de
+    concurrency verlaagt en het model pauzeert) en de call wordt herhaald.
+    """
+
+    def __init__(self, agent, llm_config: Dict[str, Any],
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 prompt_caching: bool = True,
+                 usage_history: int = 256):
+        """Initialize de client.
+
+        Args:
+            agent: De AutoGen agent die de completions genereert, of een backend
+                met dezelfde generate_response interface (zie agents/backends.py)
+            llm_config: Model settings van de agent
+            rate_limiter: Optionele gedeelde rate limiter
+            cache: Optionele gedeelde response cache
+            prompt_caching: Stuur opgebouwde prompts als messages met cache breakpoints
+            usage_history: Aantal calls waarvan de usage bewaard wordt
+        """
+        self.agent = agent
+        self.llm_config = llm_config
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.prompt_caching = prompt_caching
+        self.usage = {"calls": 0, **{name: 0 for name in USAGE_FIELDS.values()}}
+        self.call_usage = deque(maxlen=usage_history)
+
+    def _cache_key(self, text: str) -> str:
+        """Bouw de response-cache sleutel voor een prompt."""
+        return make_cache_key(self.llm_config, getattr(self.agent, "system_message", ""), text)
+
+    def _request_kwargs(self, prompt: Prompt, **kwargs: Any) -> Dict[str, Any]:
+        """Extra argumenten voor de agent, inclusief messages met cache breakpoints."""
+        if self.prompt_caching and isinstance(prompt, AssembledPrompt):
+            kwargs["messages"] = prompt.messages()
+        return kwargs
+
+    def _record_usage(self, response: Any) -> Dict[str, Any]:
+        """Leg de token usage van een response vast (per call en opgeteld)."""
+        usage = getattr(response, "usage", None)
+        record = {"time": time.time(), "model": self.llm_config.get("model")}
+        for source, name in USAGE_FIELDS.items():
+            value = usage.get(source) if isinstance(usage, dict) else getattr(usage, source, None)
+            record[name] = int(value or 0)
+            self.usage[name] += record[name]
+        self.usage["calls"] += 1
+        self.call_usage.append(record)
+        scope = _usage_scope.get()
+        if scope is not None:
+            for name in USAGE_FIELDS.values():
+                scope[name] += record[name]
+        return record
+
+    def _span(self, stream: bool):
+        """Span voor één modelcall."""
+        return tracer.span("llm.call", agent=getattr(self.agent, "name", None),
+                           model=self.llm_config.get("model"), stream=stream)
+
+    def _expected_tokens(self, text: str) -> int:
+        """Verwacht tokenverbruik van een call: de prompt plus de gemiddelde output tot nu toe."""
+        outputs = [record["output_tokens"] for record in self.call_usage if record["output_tokens"]]
+        output = sum(outputs) / len(outputs) if outputs else self.llm_config.get("max_tokens", 0)
+        return estimate_tokens(text) + int(output)
+
+    async def _wait_for_budget(self, span, tokens: int = 0):
+        """Wacht op het rate-budget en een vrije plaats voor het model en leg de wachttijd vast.
+
+        Na deze wachttijd moet _release_budget volgen.
+        """
+        if self.rate_limiter is None:
+            return
+        waited = time.monotonic()
+        await self.rate_limiter.acquire(self.llm_config["model"], tokens)
+        span.set(queue_wait_seconds=round(time.monotonic() - waited, 6))
+
+    def _release_budget(self):
+        if self.rate_limiter is not None:
+            self.rate_limiter.release(self.llm_config["model"])
+
+    def _report_success(self, reserved: int, record: Dict[str, Any]):
+        """Meld een geslaagde call met het werkelijke tokenverbruik aan de rate limiter."""
+        if self.rate_limiter is not None:
+            used = record["input_tokens"] + record["cache_write_tokens"] + record["output_tokens"]
+            self.rate_limiter.report_success(self.llm_config["model"], reserved, used)
+
+    def _retry_delay(self, error: Exception, attempt: int, span) -> Optional[float]:
+        """Meld een 429 of overbelasting aan de rate limiter.
+
+        Met een retry-after van de provider pauzeert de rate limiter het hele
+        model; anders wacht alleen deze call (exponentiële backoff).
+
+        Returns:
+            Wachttijd vóór de volgende poging, of None als de call niet herhaald mag worden
+        """
+        if self.rate_limiter is None or overload_status(error) is None:
+            return None
+        model = self.llm_config["model"]
+        delay = self.rate_limiter.report_overload(model, retry_after_seconds(error), attempt)
+        span.set(throttled=attempt + 1, retry_delay_seconds=round(delay, 3))
+        return delay if attempt < self.rate_limiter.max_retries(model) else None
+
+    @staticmethod
+    def _usage_attrs(record: Dict[str, Any]) -> Dict[str, int]:
+        """Token counts van een call als span-attributen."""
+        return {name: record[name] for name in USAGE_FIELDS.values()}
+
+    async def complete(self, prompt: Prompt) -> str:
+        """Genereer een completion voor de prompt.
+
+        Identieke combinaties van llm_config, system message en prompt worden
+        uit de cache beantwoord als die geconfigureerd is.
+
+        Args:
+            prompt: De volledig opgebouwde prompt (tekst of AssembledPrompt)
+
+        Returns:
+            De tekst van de completion
+        """
+        text = prompt.text if isinstance(prompt, AssembledPrompt) else prompt
+        with self._span(stream=False) as span:
+            key = None
+            if self.cache is not None:
+                key = self._cache_key(text)
+                cached = await self.cache.aget(key)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached
+
+            started = time.monotonic()
+            attempt = 0
+            delay = None
+            while True:
+                if delay:
+                    await asyncio.sleep(delay)
+                reserved = self._expected_tokens(text)
+                await self._wait_for_budget(span, reserved)
+                try:
+                    response = await self.agent.generate_response(text, is_chat=False,
+                                                                  **self._request_kwargs(prompt))
+                    break
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt, span)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                finally:
+                    self._release_budget()
+            content = response.message.content
+            record = self._record_usage(response)
+            self._report_success(reserved, record)
+            span.set(**self._usage_attrs(record))
+
+            if self.cache is not None:
+                await self.cache.aset(key, content, latency=time.monotonic() - started,
+                                      tokens=estimate_tokens(text) + estimate_tokens(content))
+            return content
+
+    async def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        """Genereer een completion en geef de tekst in stukken terug zodra die binnenkomt.
+
+        Een cache hit wordt als één stuk teruggegeven. Levert de agent geen
+        stream maar een volledige response, dan komt die ook als één stuk terug.
+        Na een 429 of overbelasting wordt de call alleen herhaald als er nog
+        niets is doorgegeven.
+
+        Args:
+            prompt: De volledig opgebouwde prompt (tekst of AssembledPrompt)
+
+        Returns:
+            Async iterator met tekstfragmenten
+        """
+        text = prompt.text if isinstance(prompt, AssembledPrompt) else prompt
+        with self._span(stream=True) as span:
+            key = None
+            if self.cache is not None:
+                key = self._cache_key(text)
+                cached = await self.cache.aget(key)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    yield cached
+                    return
+
+            started = time.monotonic()
+            chunks = []
+            attempt = 0
+            delay = None
+            while True:
+                if delay:
+                    await asyncio.sleep(delay)
+                reserved = self._expected_tokens(text)
+                await self._wait_for_budget(span, reserved)
+                try:
+                    response = await self.agent.generate_response(text, is_chat=False,
+                                                                  **self._request_kwargs(prompt, stream=True))
+                    if hasattr(response, "__aiter__"):
+                        async for chunk in response:
+                            text_chunk = chunk if isinstance(chunk, str) else getattr(chunk, "content", "") or ""
+                            if text_chunk:
+                                if not chunks:
+                                    span.set(first_chunk_seconds=round(time.monotonic() - started, 6))
+                                chunks.append(text_chunk)
+                                yield text_chunk
+                    else:
+                        chunks.append(response.message.content)
+                        yield response.message.content
+                    break
+                except Exception as e:
+                    delay = None if chunks else self._retry_delay(e, attempt, span)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                finally:
+                    self._release_budget()
+            record = self._record_usage(response)
+            self._report_success(reserved, record)
+            span.set(**self._usage_attrs(record))
+
+            if self.cache is not None:
+                content = "".join(chunks)
+                await self.cache.aset(key, content, latency=time.monotonic() - started,
+                                      tokens=estimate_tokens(text) + estimate_tokens(content))
+
+    def usage_stats(self) -> Dict[str, Any]:
+        """Geef de opgetelde token usage terug, inclusief prompt-cache reads en writes.
+
+        Returns:
+            Dict met aantallen calls en tokens en het aandeel input uit de prompt cache
+        """
+        total_input = (self.usage["input_tokens"] + self.usage["cache_read_tokens"]
+                       + self.usage["cache_write_tokens"])
+        return {
+            **self.usage,
+            "cache_read_ratio": round(self.usage["cache_read_tokens"] / total_input, 3)
+            if total_input else 0.0,
+        }
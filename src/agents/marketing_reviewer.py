@@ -1,16 +1,34 @@
 # MarketingReviewer Agent voor AutoGen Marketing Team
 
+import json
+import inspect
 import autogen
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
+
+from agents.llm_client import LLMClient
+from agents.backends import create_backend
+from agents.prompt_builder import PromptAssembler, AssembledPrompt
+from agents.incremental_review import (
+    SectionReviewCache, split_sections, fingerprint,
+    build_section_prompt, parse_section_response, merge_sections
+)
+from agents.review_parser import ReviewParser
+from cache.response_cache import ResponseCache
+from utils.rate_limiter import RateLimiter
+from utils.tracing import tracer
 
 class MarketingReviewer:
     """Agent die verantwoordelijk is voor het beoordelen en verbeteren van marketingcontent."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None):
         """Initialize the MarketingReviewer agent.
         
         Args:
             config: Configuratie voor de agent, inclusief model settings
+                (backend: zie agents/backends.py)
+            rate_limiter: Optionele gedeelde rate limiter voor modelcalls
+            cache: Optionele gedeelde response cache
         """
         self.config = config
         self.llm_config = {
@@ -29,6 +47,41 @@ class MarketingReviewer:
             """,
             llm_config=self.llm_config
         )
+        
+        # Modelcalls lopen via de agent, of via een replay backend voor tests en benchmarks
+        self.llm = LLMClient(create_backend(self.agent, config.get("backend")), self.llm_config,
+                             rate_limiter, cache,
+                             prompt_caching=config.get("prompt_caching", True))
+        
+        # Gestructureerd outputformaat van de review ("tags", "json" of "text")
+        self.parser = ReviewParser(config.get("review_format", "tags"))
+        
+        # Vaste instructies staan vooraan zodat ze een herbruikbare prompt-prefix vormen
+        self.prompt_assembler = PromptAssembler(inspect.cleandoc(
+            """Beoordeel en verbeter de marketingcontent onderaan dit bericht.
+            
+            Geef een gestructureerde beoordeling met:
+            1. Algemene indruk (schaal 1-10)
+            2. Sterke punten
+            3. Verbeterpunten
+            4. Verbeterde versie van de content
+            5. Uitleg van de wijzigingen
+            
+            Zorg dat de verbeterde content perfect aansluit bij de merkidentiteit en doelgroep.
+            """
+        ) + "\n\n" + self.parser.instructions())
+        
+        # Reviewresultaten per sectie voor incrementele reviews
+        self.section_cache = SectionReviewCache(config.get("section_cache_entries", 2048))
+        self.section_parser = ReviewParser("tags")
+    
+    def _build_prompt(self, content: str, brand_info: str,
+                      campaign_type: str, target_audience: str) -> AssembledPrompt:
+        """Bouw de review prompt met de stabiele delen (instructies, merk, doelgroep) vooraan."""
+        return self.prompt_assembler.assemble(
+            stable=[("MERK INFORMATIE", brand_info), ("DOELGROEP", target_audience)],
+            volatile=[("KANAAL", campaign_type), ("CONTENT", content)]
+        )
     
     async def review_content(self, content: str, brand_info: str, 
                           campaign_type: str, target_audience: str) -> Dict[str, Any]:
@@ -44,62 +97,93 @@ class MarketingReviewer:
             Dict met beoordeling, verbeterpunten en verbeterde content
         """
         # Bouw de review prompt
-        review_prompt = f"""Beoordeel en verbeter de volgende {campaign_type} content:
-        
-        CONTENT:
-        {content}
+        review_prompt = self._build_prompt(content, brand_info, campaign_type, target_audience)
         
-        MERK INFORMATIE:
-        {brand_info}
+        # Gebruik de agent om de beoordeling te genereren
+        result = await self.llm.complete(review_prompt)
         
-        DOELGROEP:
-        {target_audience}
+        return self.parse_review(result)
+    
+    async def review_content_stream(self, content: str, brand_info: str,
+                                    campaign_type: str, target_audience: str) -> AsyncIterator[str]:
+        """Beoordeel de content en geef de review-tekst in stukken terug zodra die binnenkomt.
         
-        Geef een gestructureerde beoordeling met:
-        1. Algemene indruk (schaal 1-10)
-        2. Sterke punten
-        3. Verbeterpunten
-        4. Verbeterde versie van de content
-        5. Uitleg van de wijzigingen
+        Gebruik parse_review op de samengevoegde tekst voor score en verbeterde content.
         
-        Zorg dat de verbeterde content perfect aansluit bij de merkidentiteit en doelgroep.
+        Args:
+            content: De te beoordelen marketingcontent
+            brand_info: Informatie over het merk
+            campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
+            target_audience: Beschrijving van de doelgroep
+            
+        Returns:
+            Async iterator met tekstfragmenten van de review
         """
+        review_prompt = self._build_prompt(content, brand_info, campaign_type, target_audience)
+        async for chunk in self.llm.stream(review_prompt):
+            yield chunk
+    
+    async def review_content_incremental(self, content: str, brand_info: str,
+                                         campaign_type: str, target_audience: str) -> Dict[str, Any]:
+        """Beoordeel alleen de secties die sinds een eerdere review gewijzigd zijn.
         
-        # Gebruik de agent om de beoordeling te genereren
-        response = await self.agent.generate_response(review_prompt, is_chat=False)
-        result = response.message.content
-        
-        # Parse de resultaten (vereenvoudigd, in werkelijkheid zou je een meer robuuste parser gebruiken)
-        # Hier splitsen we het gewoon op secties
-        sections = result.split("\n\n")
-        
-        try:
-            # Probeer de score te extraheren
-            score_line = next((s for s in sections if "schaal" in s.lower()), "")
-            score = int(score_line.split("/")[0].strip()[-1]) if "/" in score_line else \
-                   int(next((c for c in score_line if c.isdigit()), 0))
-            
-            # Zoek verbeterde content
-            improved_content_idx = next((i for i, s in enumerate(sections) 
-                                     if "verbeterde versie" in s.lower() or 
-                                     "verbeterde content" in s.lower()), -1)
+        De content wordt in secties gesplitst en elke sectie krijgt een fingerprint.
+        Secties die al eerder (met dezelfde merk- en doelgroepinformatie) beoordeeld
+        zijn komen uit de cache; alleen de overige secties gaan, met een ingekorte
+        outline van de rest als context, naar het model.
+        
+        Args:
+            content: De te beoordelen marketingcontent
+            brand_info: Informatie over het merk
+            campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
+            target_audience: Beschrijving van de doelgroep
             
-            improved_content = sections[improved_content_idx + 1] if improved_content_idx >= 0 and \
-                              improved_content_idx + 1 < len(sections) else ""
+        Returns:
+            Dict met score, review en verbeterde content (zoals review_content),
+            plus per sectie de score en of die uit de cache kwam
+        """
+        sections = split_sections(content)
+        brief = json.dumps(self.llm_config, sort_keys=True)
+        keys = [fingerprint(brief, brand_info, campaign_type, target_audience, section)
+                for section in sections]
+        
+        reviews: List[Optional[Dict[str, Any]]] = []
+        changed = []
+        for index, key in enumerate(keys):
+            cached = self.section_cache.get(key)
+            if cached is None:
+                changed.append(index)
+                reviews.append(None)
+            else:
+                reviews.append({**cached, "cached": True})
+        
+        raw_review = ""
+        if changed:
+            section_prompt = build_section_prompt(sections, changed, brand_info,
+                                                  campaign_type, target_audience)
+            raw_review = await self.llm.complete(section_prompt)
+            parsed = parse_section_response(raw_review, self.section_parser)
+            for index in changed:
+                if index in parsed:
+                    reviews[index] = parsed[index]
+                    self.section_cache.set(keys[index], parsed[index])
+        
+        result = merge_sections(sections, reviews, raw_review)
+        result["reviewed_sections"] = len(changed)
+        result["cached_sections"] = len(sections) - len(changed)
+        return result
+    
+    def parse_review(self, result: str) -> Dict[str, Any]:
+        """Parse een volledige review response.
+        
+        Args:
+            result: De volledige tekst van de review
             
-            return {
-                "score": score,
-                "review": result,
-                "improved_content": improved_content
-            }
-        except Exception as e:
-            # Als parsing faalt, geef de volledige review terug
-            return {
-                "score": 0,
-                "review": result,
-                "improved_content": "",
-                "error": str(e)
-            }
+        Returns:
+            Dict met score, review, verbeterde content en de losse secties
+        """
+        with tracer.span("reviewer.parse", chars=len(result)):
+            return self.parser.parse(result)
     
     def get_agent(self):
         """Return de onderliggende AutoGen agent voor groepschats."""
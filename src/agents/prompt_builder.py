@@ -0,0 +1,112 @@
+# Prompt Builder voor AutoGen Marketing Team
+
+import inspect
+from typing import Dict, List, Any, Optional, Tuple
+
+# Cache-markering in het formaat van de Anthropic Messages API
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+class PromptBlock:
+    """Eén blok tekst in een prompt."""
+
+    def __init__(self, text: str, stable: bool, breakpoint: bool = False):
+        """Initialize het blok.
+
+        Args:
+            text: De tekst van het blok
+            stable: Of het blok gelijk blijft over veel requests (bijv. merkinformatie)
+            breakpoint: Of na dit blok een prompt-cache breakpoint komt
+        """
+        self.text = text
+        self.stable = stable
+        self.breakpoint = breakpoint
+
+
+class AssembledPrompt:
+    """Een prompt opgebouwd uit blokken, met de stabiele blokken vooraan.
+
+    Omdat providers prompt caching op de prefix van een request toepassen,
+    staan alle blokken die over campagnes heen gelijk blijven (instructies,
+    merkinformatie, doelgroep) vóór de blokken die per request verschillen.
+    """
+
+    def __init__(self, blocks: List[PromptBlock]):
+        """Initialize de prompt.
+
+        Args:
+            blocks: De blokken in de volgorde waarin ze verstuurd worden
+        """
+        self.blocks = blocks
+
+    @property
+    def text(self) -> str:
+        """De volledige prompt als platte tekst."""
+        return "\n\n".join(block.text for block in self.blocks)
+
+    @property
+    def stable_prefix(self) -> str:
+        """Het herbruikbare deel van de prompt (alle stabiele blokken)."""
+        return "\n\n".join(block.text for block in self.blocks if block.stable)
+
+    def messages(self) -> List[Dict[str, Any]]:
+        """Geef de prompt als user message met cache breakpoints.
+
+        Returns:
+            Lijst met één user message waarvan de content-blokken na elke
+            breakpoint een cache_control markering dragen
+        """
+        content = []
+        for block in self.blocks:
+            part: Dict[str, Any] = {"type": "text", "text": block.text}
+            if block.breakpoint:
+                part["cache_control"] = CACHE_CONTROL
+            content.append(part)
+        return [{"role": "user", "content": content}]
+
+
+class PromptAssembler:
+    """Zet stabiele en variabele promptdelen in een cache-vriendelijke volgorde."""
+
+    def __init__(self, instructions: str, max_breakpoints: int = 3):
+        """Initialize de assembler.
+
+        Args:
+            instructions: Vaste taakinstructies, gelijk voor alle requests van de agent
+            max_breakpoints: Maximaal aantal cache breakpoints per request
+                (Anthropic staat er vier toe, inclusief de system message)
+        """
+        self.instructions = inspect.cleandoc(instructions)
+        self.max_breakpoints = max_breakpoints
+
+    def assemble(self, stable: List[Tuple[str, str]],
+                 volatile: List[Tuple[str, str]]) -> AssembledPrompt:
+        """Bouw een prompt met eerst de instructies, dan stabiele en dan variabele secties.
+
+        Breakpoints komen na de instructies (gedeeld door alle merken) en na het
+        laatste stabiele blok (gedeeld door alle campagnes van hetzelfde merk).
+
+        Args:
+            stable: (kop, tekst) paren die over veel requests gelijk blijven,
+                van meest naar minst gedeeld
+            volatile: (kop, tekst) paren die per request verschillen
+
+        Returns:
+            De opgebouwde prompt
+        """
+        blocks = [PromptBlock(self.instructions, stable=True)]
+        blocks += [PromptBlock(self._section(title, text), stable=True)
+                   for title, text in stable if text]
+        blocks += [PromptBlock(self._section(title, text), stable=False)
+                   for title, text in volatile if text]
+
+        candidates = [0, len([b for b in blocks if b.stable]) - 1]
+        for index in sorted(set(candidates))[:self.max_breakpoints]:
+            if blocks[index].stable and index < len(blocks) - 1:
+                blocks[index].breakpoint = True
+        return AssembledPrompt(blocks)
+
+    @staticmethod
+    def _section(title: str, text: str) -> str:
+        """Formatteer een sectie met kop."""
+        return f"{title}:\n{text.strip()}" if title else text.strip()
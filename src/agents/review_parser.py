@@ -0,0 +1,170 @@
+# Review Parser voor AutoGen Marketing Team
+
+import re
+import json
+import inspect
+from typing import Dict, List, Any, Optional
+
+# Velden die de reviewer in gestructureerde modus teruggeeft
+REVIEW_FIELDS = ("score", "strengths", "improvements", "improved_content", "explanation")
+
+# Instructies voor de gestructureerde outputformaten
+FORMAT_INSTRUCTIONS = {
+    "tags": """Antwoord uitsluitend in de volgende secties, elk tussen de bijbehorende tags:
+        <score>algemene indruk als geheel getal van 1 tot 10</score>
+        <strengths>sterke punten</strengths>
+        <improvements>verbeterpunten</improvements>
+        <improved_content>alleen de verbeterde versie van de content</improved_content>
+        <explanation>uitleg van de wijzigingen</explanation>""",
+    "json": """Antwoord uitsluitend met één JSON-object met de velden:
+        "score" (geheel getal van 1 tot 10), "strengths", "improvements",
+        "improved_content" (alleen de verbeterde versie van de content) en "explanation".""",
+}
+
+_TAG_RE = re.compile(
+    r"<(score|strengths|improvements|improved_content|explanation)>\s*(.*?)\s*</\1>",
+    re.DOTALL | re.IGNORECASE
+)
+_SCORE_RE = re.compile(r"(?<![\d.,])(10|\d)(?:[.,](\d))?\s*(?:/\s*10|van de 10|uit 10)\b", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"(?<![\d.,])(10|\d)(?:[.,](\d))?(?!\d)")
+_SCALE_RE = re.compile(r"\(?schaal\s*1\s*-\s*10\)?", re.IGNORECASE)
+_HEADING_RE = re.compile(
+    r"^\s*(?:#+\s*|\d+[.)]\s*|[-*]\s+)?\**\s*"
+    r"(algemene indruk|score|sterke punten|verbeterpunten|verbeterde (?:versie|content)|uitleg)\b"
+    r"(?:[^:\n]*:)?\**\s*(.*)$",
+    re.IGNORECASE
+)
+_HEADING_FIELDS = {
+    "algemene indruk": "score",
+    "score": "score",
+    "sterke punten": "strengths",
+    "verbeterpunten": "improvements",
+    "verbeterde versie": "improved_content",
+    "verbeterde content": "improved_content",
+    "uitleg": "explanation",
+}
+
+
+def _to_score(whole: str, fraction: Optional[str]) -> Any:
+    """Zet een gematchte score om naar int (of float bij een decimaal) binnen 0-10."""
+    value = float(f"{whole}.{fraction}") if fraction else float(whole)
+    value = max(0.0, min(10.0, value))
+    return int(value) if value.is_integer() else value
+
+
+class ReviewParser:
+    """Single-pass parser voor review responses.
+
+    Probeert eerst het gevraagde gestructureerde formaat (tags of JSON) en valt
+    terug op een robuuste parser voor vrije tekst, zodat een afwijkend
+    antwoord geen nieuwe reviewcall hoeft te kosten.
+    """
+
+    def __init__(self, output_format: str = "tags"):
+        """Initialize de parser.
+
+        Args:
+            output_format: Het formaat dat aan het model gevraagd wordt ("tags", "json" of "text")
+        """
+        if output_format not in ("tags", "json", "text"):
+            raise ValueError(f"Onbekend review formaat: {output_format}")
+        self.output_format = output_format
+
+    def instructions(self) -> str:
+        """Geef de formaat-instructies voor de review prompt (leeg voor vrije tekst)."""
+        return inspect.cleandoc(FORMAT_INSTRUCTIONS.get(self.output_format, ""))
+
+    def parse(self, text: str) -> Dict[str, Any]:
+        """Parse een review response.
+
+        Args:
+            text: De volledige response van de reviewer
+
+        Returns:
+            Dict met score, review, improved_content, strengths, improvements,
+            explanation en het herkende formaat. Bevat "error" als er geen
+            score gevonden kon worden.
+        """
+        fields = None
+        detected = "text"
+        if self.output_format == "json" or text.lstrip().startswith(("{", "```")):
+            fields = self._parse_json(text)
+            detected = "json"
+        if fields is None and "<score>" in text.lower():
+            fields = self._parse_tags(text)
+            detected = "tags"
+        if fields is None:
+            fields = self._parse_text(text)
+            detected = "text"
+
+        result = {
+            "score": fields.get("score"),
+            "review": text,
+            "improved_content": fields.get("improved_content", ""),
+            "strengths": fields.get("strengths", ""),
+            "improvements": fields.get("improvements", ""),
+            "explanation": fields.get("explanation", ""),
+            "format": detected,
+        }
+        if result["score"] is None:
+            result["score"] = 0
+            result["error"] = "Geen score gevonden in de review"
+        return result
+
+    def _parse_json(self, text: str) -> Optional[Dict[str, Any]]:
+        """Parse een JSON-antwoord, eventueel binnen een code block."""
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end <= start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        fields = {key: str(data[key]).strip() for key in REVIEW_FIELDS if key in data and key != "score"}
+        fields["score"] = self._extract_score(str(data.get("score", "")), allow_bare=True)
+        return fields
+
+    def _parse_tags(self, text: str) -> Optional[Dict[str, Any]]:
+        """Parse tagged secties in één regex-pass."""
+        fields: Dict[str, Any] = {}
+        for match in _TAG_RE.finditer(text):
+            fields.setdefault(match.group(1).lower(), match.group(2))
+        if not fields:
+            return None
+        fields["score"] = self._extract_score(fields.get("score", ""), allow_bare=True)
+        return fields
+
+    def _parse_text(self, text: str) -> Dict[str, Any]:
+        """Parse vrije tekst in één pass over de regels op basis van sectiekoppen."""
+        sections: Dict[str, List[str]] = {}
+        current = None
+        for line in text.splitlines():
+            match = _HEADING_RE.match(line)
+            if match:
+                current = _HEADING_FIELDS[match.group(1).lower()]
+                sections.setdefault(current, [])
+                rest = match.group(2).strip("* ")
+                if rest:
+                    sections[current].append(rest)
+            elif current is not None:
+                sections[current].append(line)
+
+        fields: Dict[str, Any] = {key: "\n".join(lines).strip() for key, lines in sections.items()}
+        score = self._extract_score(fields.get("score", ""), allow_bare=True)
+        if score is None:
+            score = self._extract_score(text, allow_bare=False)
+        fields["score"] = score
+        return fields
+
+    def _extract_score(self, text: str, allow_bare: bool) -> Any:
+        """Zoek een score als "8/10" (of een los getal als allow_bare)."""
+        match = _SCORE_RE.search(text)
+        if match is None and allow_bare:
+            # Sla de schaal-aanduiding "1-10" uit de prompt over
+            match = _NUMBER_RE.search(_SCALE_RE.sub("", text))
+        if match is None:
+            return None
+        return _to_score(match.group(1), match.group(2))
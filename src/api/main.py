@@ -0,0 +1,200 @@
+# HTTP API voor AutoGen Marketing Team
+
+import os
+import sys
+import json
+import asyncio
+from contextlib import asynccontextmanager, AsyncExitStack
+from typing import Dict, List, Any, Optional
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+# Voeg de src directory toe aan sys.path zodat de modules importeerbaar zijn
+# (de app wordt gestart als `src.api.main:app` vanuit de projectroot)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from main import get_marketing_team, lease_marketing_team
+from jobs.factory import create_broker
+from jobs.worker import JobWorker
+from orchestration import events
+from orchestration.coalesce import RequestCoalescer, request_key
+from utils.tracing import tracer
+
+CONFIG_PATH = os.environ.get("MARKETING_TEAM_CONFIG", "config/config.json")
+
+
+class CampaignRequest(BaseModel):
+    """Specificatie van één campagne."""
+    prompt: str = Field(min_length=1)
+    campaign_type: str = Field(min_length=1)
+    brand_info: str = Field(min_length=1)
+    target_audience: str = Field(min_length=1)
+
+
+class BatchRequest(BaseModel):
+    """Een batch campagnes die als jobs in de queue worden gezet."""
+    campaigns: List[CampaignRequest] = Field(min_length=1)
+
+
+class Service:
+    """Gedeelde toestand van de API: het team, de broker en de coalescer."""
+
+    def __init__(self, config_path: str):
+        self.config_path = config_path
+        self.coalescer = RequestCoalescer()
+        self.broker = None
+        self.worker: Optional[JobWorker] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._leases = AsyncExitStack()
+
+    @property
+    def team(self):
+        return get_marketing_team(self.config_path)
+
+    async def start(self):
+        """Maak de broker; bij de in-memory broker draait de worker in dit proces."""
+        jobs_config = self.team.config.get("jobs", {})
+        self.broker = create_broker(jobs_config)
+        if jobs_config.get("broker", "sqlite") == "memory":
+            concurrency = jobs_config.get("worker", {}).get("concurrency", 2)
+            # De worker houdt zijn team vast; dat blijft open tot stop(), ook als de config wijzigt
+            team = await self._leases.enter_async_context(lease_marketing_team(self.config_path))
+            self.worker = JobWorker(self.broker, team, concurrency)
+            self._worker_task = asyncio.create_task(self.worker.run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.stop()
+            await self._worker_task
+        await self._leases.aclose()
+        await self.team.aclose()
+        if self.broker is not None:
+            await self.broker.close()
+
+    async def _run(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        async with lease_marketing_team(self.config_path) as team:
+            return await team.run_campaign(**spec)
+
+    async def _stream(self, spec: Dict[str, Any]):
+        async with lease_marketing_team(self.config_path) as team:
+            async for event in team.run_stream(**spec):
+                yield event
+
+    async def run(self, campaign: CampaignRequest) -> Dict[str, Any]:
+        """Run een campagne; identieke gelijktijdige aanvragen delen één generatie."""
+        spec = campaign.model_dump()
+        return await self.coalescer.run(request_key(**spec), lambda: self._run(spec))
+
+    def stream(self, campaign: CampaignRequest):
+        """Stream de events van een campagne; identieke aanvragen lezen mee."""
+        spec = campaign.model_dump()
+        return self.coalescer.stream(request_key(**spec), lambda: self._stream(spec))
+
+
+service = Service(CONFIG_PATH)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await service.start()
+    try:
+        yield
+    finally:
+        await service.stop()
+
+
+app = FastAPI(title="AutoGen Marketing Team", lifespan=lifespan)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Formatteer een event als server-sent event."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def sse_events(campaign: CampaignRequest):
+    """Zet de event stream om naar SSE; een fout wordt een error event."""
+    try:
+        async for event in service.stream(campaign):
+            yield format_sse(event)
+    except Exception as e:
+        yield format_sse(events.make_event(events.ERROR, message=str(e)))
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    return {"status": "ok"}
+
+
+@app.post("/campaigns")
+async def run_campaign(campaign: CampaignRequest) -> Dict[str, Any]:
+    """Genereer en beoordeel één campagne en geef het resultaat terug."""
+    try:
+        return await service.run(campaign)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Generatie mislukt: {e}")
+
+
+@app.post("/campaigns/stream")
+async def stream_campaign(campaign: CampaignRequest) -> StreamingResponse:
+    """Stream de voortgang van één campagne als server-sent events."""
+    return StreamingResponse(sse_events(campaign), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.websocket("/campaigns/ws")
+async def campaign_socket(websocket: WebSocket):
+    """Ontvang campagne-specificaties als JSON en stuur per campagne de events terug."""
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                campaign = CampaignRequest(**await websocket.receive_json())
+            except (ValueError, TypeError) as e:
+                await websocket.send_json(events.make_event(events.ERROR, message=str(e)))
+                continue
+            try:
+                async for event in service.stream(campaign):
+                    await websocket.send_json(event)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json(events.make_event(events.ERROR, message=str(e)))
+    except WebSocketDisconnect:
+        pass
+
+
+@app.post("/batches", status_code=202)
+async def submit_batch(batch: BatchRequest) -> Dict[str, Any]:
+    """Zet een batch campagnes als jobs in de queue (verwerkt door de workers)."""
+    job_ids = [await service.broker.enqueue(campaign.model_dump()) for campaign in batch.campaigns]
+    return {"jobs": job_ids}
+
+
+@app.get("/jobs")
+async def job_stats() -> Dict[str, int]:
+    """Aantal jobs per status."""
+    return await service.broker.stats()
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str) -> Dict[str, Any]:
+    """Status, pogingen, resultaat en fout van een job."""
+    job = await service.broker.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Onbekende job: {job_id}")
+    return job
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, Any]:
+    """Gebruik van het team en de request coalescing."""
+    return {"usage": service.team.usage_stats(), "coalescing": service.coalescer.stats()}
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Latency-, token- en cache-metrics in OpenMetrics-formaat."""
+    return PlainTextResponse(tracer.render_openmetrics(),
+                             media_type="application/openmetrics-text; version=1.0.0; charset=utf-8")
@@ -0,0 +1,319 @@
+# Response Cache voor AutoGen Marketing Team
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+def make_cache_key(llm_config: Dict[str, Any], system_message: str, prompt: str) -> str:
+    """Bouw een stabiele, content-addressed sleutel voor een modelcall.
+
+    Args:
+        llm_config: Model settings (model, temperature, max_tokens, ...)
+        system_message: De system message van de agent
+        prompt: De volledig opgebouwde prompt
+
+    Returns:
+        SHA-256 hexdigest van de genormaliseerde invoer
+    """
+    payload = json.dumps(
+        {"llm_config": llm_config, "system_message": system_message, "prompt": prompt},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRUCache:
+    """In-memory LRU tier met optionele TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        """Initialize de memory tier.
+
+        Args:
+            max_entries: Maximaal aantal entries voordat de oudste wordt verwijderd
+            ttl_seconds: Levensduur van een entry (None = onbeperkt)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Haal een entry op en markeer hem als recent gebruikt."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, value = entry
+            if self.ttl_seconds is not None and time.time() - created > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], created: Optional[float] = None):
+        """Sla een entry op en verwijder zo nodig de minst recent gebruikte."""
+        with self._lock:
+            self._entries[key] = (created or time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk tier in SQLite met TTL en eviction op aantal entries en bytes."""
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None,
+                 max_entries: int = 100000, max_bytes: int = 256 * 1024 * 1024):
+        """Initialize de disk tier.
+
+        Args:
+            path: Pad naar het SQLite-bestand
+            ttl_seconds: Levensduur van een entry (None = onbeperkt)
+            max_entries: Maximaal aantal entries
+            max_bytes: Maximale totale grootte van de opgeslagen responses
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        self._count = count
+        self._bytes = total
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Haal een entry op.
+
+        Returns:
+            Tuple (aanmaaktijd, waarde) of None als de entry ontbreekt of verlopen is
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            now = time.time()
+            if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                self._delete(key)
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return created, json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Sla een entry op en evict de minst recent gebruikte entries indien nodig."""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, data, size, now, now)
+            )
+            self._count += 1
+            self._bytes += size
+            self._evict()
+            self._conn.commit()
+
+    def _delete(self, key: str):
+        """Verwijder één entry en werk de tellers bij (lock moet gehouden worden)."""
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count -= 1
+            self._bytes -= row[0]
+
+    def _evict(self):
+        """Verwijder verlopen en daarna minst recent gebruikte entries tot binnen de limieten."""
+        if self.ttl_seconds is not None:
+            cutoff = time.time() - self.ttl_seconds
+            expired = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE created < ?", (cutoff,)
+            ).fetchone()
+            if expired[0]:
+                self._conn.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+                self._count -= expired[0]
+                self._bytes -= expired[1]
+
+        while self._count > self.max_entries or self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        """Sluit de databaseverbinding."""
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Twee-laags cache (memory LRU + SQLite) voor model responses.
+
+    Houdt hit/miss-tellers bij, plus de latency en (geschatte) tokens die
+    dankzij cache hits niet opnieuw betaald hoefden te worden.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize de cache.
+
+        Args:
+            config: Configuratie met memory_entries, path, ttl_seconds,
+                max_entries en max_bytes. Zonder path is alleen de memory tier actief.
+        """
+        self.config = config
+        ttl_seconds = config.get("ttl_seconds")
+        self.memory = MemoryLRUCache(config.get("memory_entries", 1024), ttl_seconds)
+        self.disk = None
+        if config.get("path"):
+            self.disk = SQLiteCache(
+                config["path"],
+                ttl_seconds=ttl_seconds,
+                max_entries=config.get("max_entries", 100000),
+                max_bytes=config.get("max_bytes", 256 * 1024 * 1024)
+            )
+
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Lees een entry uit de disk tier en zet hem in de memory tier."""
+        entry = self.disk.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        self.memory.set(key, value, created)
+        return value
+
+    def _count(self, value: Optional[Dict[str, Any]], tier: str) -> Optional[str]:
+        """Werk de tellers bij voor een lookup en geef de completion terug."""
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.disk_hits += 1
+            self.saved_seconds += value.get("latency", 0.0)
+            self.saved_tokens += value.get("tokens", 0)
+        return value["content"]
+
+    def get(self, key: str) -> Optional[str]:
+        """Zoek een response op in de memory en daarna de disk tier.
+
+        Args:
+            key: Sleutel uit make_cache_key
+
+        Returns:
+            De gecachte completion of None bij een miss
+        """
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return self._count(value, "memory")
+        return self._count(self._read_disk(key), "disk")
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Zoek een response op zoals get, maar lees de disk tier in een thread.
+
+        Zo wacht de event loop niet op SQLite (inclusief de commit van de
+        toegangstijd); de memory tier wordt direct gelezen.
+        """
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return self._count(value, "memory")
+        return self._count(await asyncio.to_thread(self._read_disk, key), "disk")
+
+    def set(self, key: str, content: str, latency: float = 0.0, tokens: int = 0):
+        """Sla een response op in alle tiers.
+
+        Args:
+            key: Sleutel uit make_cache_key
+            content: De completion
+            latency: Hoe lang de oorspronkelijke call duurde (seconden)
+            tokens: Aantal tokens van de oorspronkelijke call
+        """
+        value = {"content": content, "latency": latency, "tokens": tokens}
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    async def aset(self, key: str, content: str, latency: float = 0.0, tokens: int = 0):
+        """Sla een response op zoals set, maar schrijf de disk tier in een thread."""
+        value = {"content": content, "latency": latency, "tokens": tokens}
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Geef de hit/miss-tellers en besparingen terug.
+
+        Returns:
+            Dict met hits per tier, misses, hit rate en bespaarde latency/tokens
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "saved_tokens": self.saved_tokens,
+                "memory_entries": len(self.memory),
+                "disk_entries": len(self.disk) if self.disk is not None else 0,
+            }
+
+    def close(self):
+        """Sluit de SQLite-laag (indien aanwezig)."""
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,345 @@
+# Web Cache voor AutoGen Marketing Team
+
+import os
+import time
+import zlib
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Iterator, Mapping
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters die niet in de sleutel horen (secrets en tracking)
+IGNORED_PARAMS = frozenset({"key", "apikey", "api_key", "access_token"})
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Standaard levensduur per soort entry (seconden)
+DEFAULT_TTLS = {
+    "search": 7 * 24 * 3600,  # Evergreen zoekresultaten veranderen langzaam
+    "news": 3600,             # Nieuws veroudert snel
+    "page": 24 * 3600,
+}
+
+
+def normalize_query(query: str) -> str:
+    """Normaliseer een zoekopdracht: hoofdletterongevoelig en witruimte samengevoegd."""
+    return " ".join(query.split()).casefold()
+
+
+def normalize_url(url: str) -> str:
+    """Normaliseer een URL voor gebruik als cachesleutel.
+
+    Scheme en host worden lowercase, standaardpoorten en fragmenten vervallen
+    en query parameters worden gesorteerd, zonder secrets en tracking parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    params = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in IGNORED_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(params), ""))
+
+
+def make_web_key(kind: str, url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Bouw de cachesleutel voor een zoekopdracht of opgehaalde pagina.
+
+    Args:
+        kind: Soort entry ("search", "news" of "page")
+        url: Endpoint of pagina-URL
+        params: Query parameters; tekstwaarden worden als zoekopdracht genormaliseerd
+
+    Returns:
+        SHA-256 hexdigest
+    """
+    normalized = sorted(
+        (name, normalize_query(value) if isinstance(value, str) else str(value))
+        for name, value in (params or {}).items()
+        if name.lower() not in IGNORED_PARAMS
+    )
+    payload = f"{kind}\n{normalize_url(url)}\n{urlencode(normalized)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class WebCacheEntry:
+    """Metadata van een gecachte response; de body wordt pas bij gebruik gelezen."""
+
+    def __init__(self, cache: "WebCache", key: str, kind: str, etag: Optional[str],
+                 last_modified: Optional[str], content_type: str, size: int,
+                 raw_size: int, created: float, ttl_seconds: float, truncated: bool = False):
+        self._cache = cache
+        self.key = key
+        self.kind = kind
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+        self.size = size
+        self.raw_size = raw_size
+        self.created = created
+        self.ttl_seconds = ttl_seconds
+        # De body is na raw_size bytes afgekapt (download-limiet, of de lezer stopte eerder)
+        self.truncated = truncated
+
+    @property
+    def fresh(self) -> bool:
+        """Of de entry nog binnen zijn TTL valt."""
+        return time.time() - self.created <= self.ttl_seconds
+
+    @property
+    def revalidatable(self) -> bool:
+        """Of een verlopen entry met een conditional request ververst kan worden."""
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers voor een conditional request (If-None-Match / If-Modified-Since)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def iter_body(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Lees en decomprimeer de body incrementeel."""
+        return self._cache.iter_body(self.key, chunk_size)
+
+    def read(self) -> bytes:
+        """Lees de volledige (gedecomprimeerde) body."""
+        return b"".join(self.iter_body())
+
+
+class WebCache:
+    """Persistente cache voor zoekresultaten en opgehaalde pagina's.
+
+    Bodies worden gecomprimeerd in SQLite opgeslagen en pas gelezen (en
+    incrementeel gedecomprimeerd) als ze nodig zijn; in het geheugen staat
+    alleen metadata. Verlopen entries met een ETag of Last-Modified blijven
+    bewaard zodat ze met een conditional request ververst kunnen worden.
+    Eviction gebeurt op basis van een budget voor de gecomprimeerde bytes.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize de cache.
+
+        Args:
+            config: Configuratie met path, max_bytes, compression_level en
+                search_ttl_seconds, news_ttl_seconds en page_ttl_seconds
+        """
+        self.config = config
+        self.path = config.get("path", ".cache/web.sqlite")
+        self.max_bytes = config.get("max_bytes", 128 * 1024 * 1024)
+        self.compression_level = config.get("compression_level", 6)
+        self.ttls = {kind: config.get(f"{kind}_ttl_seconds", ttl) for kind, ttl in DEFAULT_TTLS.items()}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS web_cache (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                truncated INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_web_cache_accessed ON web_cache (accessed)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM web_cache").fetchone()[0]
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.saved_bytes = 0
+
+    def ttl(self, kind: str) -> float:
+        """Levensduur voor een soort entry."""
+        return self.ttls.get(kind, self.ttls["page"])
+
+    def lookup(self, key: str) -> Optional[WebCacheEntry]:
+        """Zoek de metadata van een entry op (zonder de body te lezen).
+
+        Verlopen entries zonder validator worden direct verwijderd.
+
+        Returns:
+            De entry (vers of revalideerbaar) of None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, etag, last_modified, content_type, size, raw_size, created, truncated "
+                "FROM web_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            kind, etag, last_modified, content_type, size, raw_size, created, truncated = row
+            entry = WebCacheEntry(self, key, kind, etag, last_modified, content_type,
+                                  size, raw_size, created, self.ttl(kind), bool(truncated))
+            if not entry.fresh and not entry.revalidatable:
+                self._delete(key)
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE web_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return entry
+
+    def iter_body(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Lees de gecomprimeerde body in stukken en decomprimeer incrementeel."""
+        decompressor = zlib.decompressobj()
+        with self._lock:
+            row = self._conn.execute("SELECT rowid FROM web_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        if hasattr(self._conn, "blobopen"):
+            offset = 0
+            while True:
+                with self._lock:
+                    try:
+                        with self._conn.blobopen("web_cache", "body", row[0], readonly=True) as blob:
+                            blob.seek(offset)
+                            compressed = blob.read(chunk_size)
+                    except sqlite3.OperationalError:
+                        return  # Entry is tussentijds verwijderd
+                if not compressed:
+                    break
+                offset += len(compressed)
+                data = decompressor.decompress(compressed)
+                if data:
+                    yield data
+        else:
+            with self._lock:
+                row = self._conn.execute("SELECT body FROM web_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            data = decompressor.decompress(row[0])
+            if data:
+                yield data
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+    def store(self, key: str, kind: str, body: bytes, etag: Optional[str] = None,
+              last_modified: Optional[str] = None, content_type: str = ""):
+        """Sla een response gecomprimeerd op en evict zo nodig de minst recent gebruikte.
+
+        Args:
+            key: Sleutel uit make_web_key
+            kind: Soort entry ("search", "news" of "page")
+            body: De ruwe response body
+            etag: ETag header van de response
+            last_modified: Last-Modified header van de response
+            content_type: Content-Type header van de response
+        """
+        self.store_compressed(key, kind, zlib.compress(body, self.compression_level), len(body),
+                              etag, last_modified, content_type)
+
+    def store_compressed(self, key: str, kind: str, compressed: bytes, raw_size: int,
+                         etag: Optional[str] = None, last_modified: Optional[str] = None,
+                         content_type: str = "", truncated: bool = False):
+        """Sla een al gecomprimeerde body op (zie store), bijv. na een streaming download.
+
+        Args:
+            key: Sleutel uit make_web_key
+            kind: Soort entry
+            compressed: zlib-gecomprimeerde body
+            raw_size: Grootte van de ongecomprimeerde body
+            etag: ETag header van de response
+            last_modified: Last-Modified header van de response
+            content_type: Content-Type header van de response
+            truncated: De body is na raw_size bytes afgekapt
+        """
+        if len(compressed) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO web_cache (key, kind, etag, last_modified, content_type, body, size, "
+                "raw_size, created, accessed, truncated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, etag, last_modified, content_type, compressed, len(compressed),
+                 raw_size, now, now, int(truncated))
+            )
+            self._bytes += len(compressed)
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Markeer een entry als weer vers na een 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE web_cache SET created = ?, accessed = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (now, now, etag, last_modified, key)
+            )
+            self._conn.commit()
+
+    def record(self, outcome: str, raw_size: int = 0):
+        """Houd een hit, revalidatie of miss bij.
+
+        Args:
+            outcome: "hit", "revalidated" of "miss"
+            raw_size: Grootte van de body die niet opnieuw gedownload hoefde te worden
+        """
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+                self.saved_bytes += raw_size
+            elif outcome == "revalidated":
+                self.revalidated += 1
+                self.saved_bytes += raw_size
+            else:
+                self.misses += 1
+
+    def _delete(self, key: str):
+        """Verwijder één entry en werk de teller bij (lock moet gehouden worden)."""
+        row = self._conn.execute("SELECT size FROM web_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM web_cache WHERE key = ?", (key,))
+            self._bytes -= row[0]
+
+    def _evict(self):
+        """Verwijder minst recent gebruikte entries tot binnen het bytebudget."""
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM web_cache ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM web_cache WHERE key = ?", (key,))
+                self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Geef hit/miss-tellers, bespaarde downloads en gebruikte opslag terug."""
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM web_cache").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+                "saved_bytes": self.saved_bytes,
+                "entries": entries,
+                "stored_bytes": self._bytes,
+            }
+
+    def close(self):
+        """Sluit de databaseverbinding."""
+        with self._lock:
+            self._conn.close()
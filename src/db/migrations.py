@@ -0,0 +1,77 @@
+# Databasemigraties voor AutoGen Marketing Team
+#
+# Gebruik: python src/db/migrations.py [--url URL]
+# (wordt in de Heroku release-fase uitgevoerd)
+
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+from typing import List, Optional, Callable, Tuple
+
+from sqlalchemy import Connection, MetaData, Table, Column, Integer, DateTime, select, insert
+
+# Voeg de src directory toe aan sys.path als dit bestand als script draait
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db.schema import metadata, runs, drafts, reviews, usage
+from db.store import ResultStore
+
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version", _version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def _initial_schema(connection: Connection):
+    """Versie 1: runs, drafts, reviews en usage met hun indexen."""
+    metadata.create_all(connection, tables=[runs, drafts, reviews, usage])
+
+
+# Migraties in volgorde; een nieuwe migratie krijgt het volgende versienummer
+MIGRATIONS: List[Tuple[int, Callable[[Connection], None]]] = [
+    (1, _initial_schema),
+]
+
+
+def current_version(connection: Connection) -> int:
+    """Geef de hoogste toegepaste migratieversie (0 voor een lege database)."""
+    _version_metadata.create_all(connection)
+    versions = connection.execute(select(schema_version.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def migrate(url: Optional[str] = None) -> int:
+    """Pas alle nog niet toegepaste migraties toe, elk in een eigen transactie.
+
+    Args:
+        url: Database URL (standaard DATABASE_URL of een lokaal SQLite-bestand)
+
+    Returns:
+        De schemaversie na afloop
+    """
+    store = ResultStore({"url": url} if url else {})
+    try:
+        with store.engine.begin() as connection:
+            version = current_version(connection)
+        for number, apply in MIGRATIONS:
+            if number <= version:
+                continue
+            with store.engine.begin() as connection:
+                apply(connection)
+                connection.execute(insert(schema_version),
+                                   {"version": number, "applied_at": datetime.now(timezone.utc)})
+            print(f"Migratie {number} toegepast ({apply.__doc__.splitlines()[0]})")
+            version = number
+    finally:
+        store.close()
+    print(f"Database op schemaversie {version}")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Voer de databasemigraties uit")
+    parser.add_argument("--url", help="Database URL (standaard DATABASE_URL)")
+    migrate(parser.parse_args().url)
@@ -0,0 +1,65 @@
+# Databaseschema voor AutoGen Marketing Team
+
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, BigInteger, String, Text, Float, DateTime,
+    ForeignKey, Index
+)
+
+metadata = MetaData()
+
+# Eén rij per campagne-run. Merk, type, score en tijd staan hier (ook al
+# staan score en content ook in reviews/drafts) zodat de "beste campagnes"
+# queries volledig uit de indexen op deze tabel komen.
+runs = Table(
+    "runs", metadata,
+    Column("id", String(32), primary_key=True),
+    Column("brand", String(200), nullable=False),
+    Column("campaign_type", String(100), nullable=False),
+    Column("score", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("prompt", Text, nullable=False),
+    Column("brand_info", Text, nullable=False),
+    Column("target_audience", Text, nullable=False),
+    Column("latency_seconds", Float),
+    Column("duplicate_of", String(32)),
+    # Beste campagnes per merk en type in een periode, en op score binnen merk en type
+    Index("ix_runs_brand_type_time", "brand", "campaign_type", "created_at", "score"),
+    Index("ix_runs_brand_type_score", "brand", "campaign_type", "score", "created_at"),
+    Index("ix_runs_type_score", "campaign_type", "score"),
+    Index("ix_runs_created_at", "created_at"),
+)
+
+# Originele en verbeterde content van een run
+drafts = Table(
+    "drafts", metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("run_id", String(32), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False),
+    Column("kind", String(16), nullable=False),  # "original" of "improved"
+    Column("content", Text, nullable=False),
+    Index("ix_drafts_run", "run_id", "kind"),
+)
+
+reviews = Table(
+    "reviews", metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("run_id", String(32), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False),
+    Column("score", Integer, nullable=False),
+    Column("review", Text, nullable=False),
+    Index("ix_reviews_run", "run_id"),
+    Index("ix_reviews_score", "score"),
+)
+
+# Token usage per agent; tellers zijn cumulatief per proces op het moment van opslaan
+usage = Table(
+    "usage", metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("label", String(200), nullable=False),
+    Column("agent", String(100), nullable=False),
+    Column("calls", Integer, nullable=False, default=0),
+    Column("input_tokens", BigInteger, nullable=False, default=0),
+    Column("output_tokens", BigInteger, nullable=False, default=0),
+    Column("cache_read_tokens", BigInteger, nullable=False, default=0),
+    Column("cache_write_tokens", BigInteger, nullable=False, default=0),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Index("ix_usage_agent_time", "agent", "created_at"),
+)
@@ -0,0 +1,354 @@
+# Resultaatopslag voor AutoGen Marketing Team
+
+import os
+import re
+import time
+import uuid
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Iterable
+
+from sqlalchemy import create_engine, event, select, insert, delete
+
+from db.schema import metadata, runs, drafts, reviews, usage
+
+DEFAULT_URL = "sqlite:///data/marketing.sqlite"
+
+# Het merk is het deel van brand_info vóór " is ", een komma of een punt
+# ("GreenTech is een duurzaam technologiebedrijf..." -> "GreenTech")
+_BRAND_SPLIT = re.compile(r"\s+(?:is|zijn|was|maakt|biedt)\s+|[,.;:(\n]", re.IGNORECASE)
+
+
+def brand_name(brand_info: str) -> str:
+    """Leid een korte merknaam af uit de merkinformatie.
+
+    Args:
+        brand_info: Informatie over het merk
+
+    Returns:
+        De merknaam (maximaal 200 tekens)
+    """
+    name = _BRAND_SPLIT.split(brand_info.strip(), maxsplit=1)[0].strip()
+    return (name or brand_info.strip())[:200]
+
+
+def database_url(config: Dict[str, Any]) -> str:
+    """Bepaal de database URL: config, dan DATABASE_URL, dan een lokaal SQLite-bestand."""
+    url = config.get("url") or os.environ.get("DATABASE_URL") or DEFAULT_URL
+    # Heroku levert nog postgres:// URLs, SQLAlchemy 2 kent alleen postgresql://
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def _parse_time(value: Any) -> datetime:
+    """Zet een ISO-tijdstip (of datetime) om naar een UTC datetime."""
+    if isinstance(value, datetime):
+        moment = value
+    elif value:
+        moment = datetime.fromisoformat(str(value))
+    else:
+        return datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class ResultStore:
+    """Opslag van runs, drafts, reviews en token usage via SQLAlchemy.
+
+    Werkt lokaal op SQLite (WAL) en in productie op Postgres. Batches worden
+    in één transactie met executemany weggeschreven. Alle methodes zijn
+    synchroon; gebruik ResultWriter (of asyncio.to_thread) vanuit async code.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize de store.
+
+        Args:
+            config: Settings: url (standaard DATABASE_URL of een lokaal
+                SQLite-bestand), echo
+        """
+        config = config or {}
+        self.url = database_url(config)
+        if self.url.startswith("sqlite:///"):
+            directory = os.path.dirname(self.url[len("sqlite:///"):])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.engine = create_engine(self.url, echo=config.get("echo", False), pool_pre_ping=True)
+
+        if self.engine.dialect.name == "sqlite":
+            @event.listens_for(self.engine, "connect")
+            def _sqlite_pragmas(connection, _):
+                cursor = connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA foreign_keys=ON")
+                cursor.close()
+
+    def create_schema(self):
+        """Maak ontbrekende tabellen en indexen aan (zie ook db/migrations.py)."""
+        metadata.create_all(self.engine)
+
+    def save_runs(self, records: Iterable[Dict[str, Any]]) -> List[str]:
+        """Sla runs met hun drafts en reviews in één transactie op.
+
+        Args:
+            records: Dicts met het resultaat van MarketingTeam.run ("result") en
+                de campagne-specificatie ("campaign"); optioneel "id", "brand"
+                en "latency_seconds"
+
+        Returns:
+            De ids van de opgeslagen runs
+        """
+        run_rows, draft_rows, review_rows = [], [], []
+        for record in records:
+            result = record["result"]
+            campaign = record["campaign"]
+            run_id = record.get("id") or uuid.uuid4().hex
+            score = int(result.get("score", 0) or 0)
+            run_rows.append({
+                "id": run_id,
+                "brand": record.get("brand") or campaign.get("brand") or brand_name(campaign["brand_info"]),
+                "campaign_type": result.get("campaign_type") or campaign["campaign_type"],
+                "score": score,
+                "created_at": _parse_time(result.get("timestamp")),
+                "prompt": campaign["prompt"],
+                "brand_info": campaign["brand_info"],
+                "target_audience": campaign["target_audience"],
+                "latency_seconds": record.get("latency_seconds"),
+                "duplicate_of": result.get("duplicate_of"),
+            })
+            draft_rows.append({"run_id": run_id, "kind": "original",
+                               "content": result.get("original_content", "")})
+            if result.get("improved_content"):
+                draft_rows.append({"run_id": run_id, "kind": "improved",
+                                   "content": result["improved_content"]})
+            review_rows.append({"run_id": run_id, "score": score, "review": result.get("review", "")})
+
+        if not run_rows:
+            return []
+        with self.engine.begin() as connection:
+            connection.execute(insert(runs), run_rows)
+            connection.execute(insert(drafts), draft_rows)
+            connection.execute(insert(reviews), review_rows)
+        return [row["id"] for row in run_rows]
+
+    def save_run(self, result: Dict[str, Any], campaign: Dict[str, Any], **extra: Any) -> str:
+        """Sla één run op (zie save_runs)."""
+        return self.save_runs([{"result": result, "campaign": campaign, **extra}])[0]
+
+    def save_usage(self, usage_stats: Dict[str, Any], label: str = "") -> int:
+        """Sla de token usage per agent op (uitvoer van MarketingTeam.usage_stats).
+
+        Args:
+            usage_stats: Dict met per agent de usage-tellers
+            label: Vrij label, bijv. het batch-bestand
+
+        Returns:
+            Aantal opgeslagen rijen
+        """
+        now = datetime.now(timezone.utc)
+        fields = ("calls", "input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")
+        rows = [{"label": label, "agent": agent, "created_at": now,
+                 **{field: int(stats.get(field, 0) or 0) for field in fields}}
+                for agent, stats in usage_stats.items()
+                if isinstance(stats, dict) and "calls" in stats]
+        if rows:
+            with self.engine.begin() as connection:
+                connection.execute(insert(usage), rows)
+        return len(rows)
+
+    def best_runs(self, brand: str, campaign_type: Optional[str] = None,
+                  since: Optional[datetime] = None, days: Optional[float] = None,
+                  min_score: Optional[int] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Geef de best scorende runs van een merk, optioneel per type en periode.
+
+        Bijvoorbeeld de beste Instagram posts van een merk in de afgelopen week:
+        best_runs("GreenTech", "Instagram Post", days=7).
+
+        Args:
+            brand: Merknaam (zie brand_name)
+            campaign_type: Optioneel type campagne
+            since: Alleen runs vanaf dit tijdstip
+            days: Alleen runs van de afgelopen zoveel dagen (alternatief voor since)
+            min_score: Minimale score
+            limit: Maximaal aantal runs
+
+        Returns:
+            Lijst met runs (hoogste score eerst, bij gelijke score de nieuwste),
+            inclusief de verbeterde (of originele) content en de review
+        """
+        query = select(runs.c.id, runs.c.brand, runs.c.campaign_type, runs.c.score,
+                       runs.c.created_at, runs.c.prompt, runs.c.target_audience).where(runs.c.brand == brand)
+        if campaign_type is not None:
+            query = query.where(runs.c.campaign_type == campaign_type)
+        if days is not None:
+            since = datetime.now(timezone.utc) - timedelta(days=days)
+        if since is not None:
+            query = query.where(runs.c.created_at >= _parse_time(since))
+        if min_score is not None:
+            query = query.where(runs.c.score >= min_score)
+        query = query.order_by(runs.c.score.desc(), runs.c.created_at.desc()).limit(limit)
+
+        with self.engine.connect() as connection:
+            top = [dict(row._mapping) for row in connection.execute(query)]
+            if not top:
+                return []
+            ids = [row["id"] for row in top]
+            contents: Dict[str, Dict[str, str]] = {}
+            for run_id, kind, content in connection.execute(
+                select(drafts.c.run_id, drafts.c.kind, drafts.c.content).where(drafts.c.run_id.in_(ids))
+            ):
+                contents.setdefault(run_id, {})[kind] = content
+            review_texts = dict(connection.execute(
+                select(reviews.c.run_id, reviews.c.review).where(reviews.c.run_id.in_(ids))
+            ).all())
+
+        for row in top:
+            content = contents.get(row["id"], {})
+            row["content"] = content.get("improved") or content.get("original", "")
+            row["review"] = review_texts.get(row["id"], "")
+            row["created_at"] = _parse_time(row["created_at"]).isoformat()
+        return top
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Geef één run met drafts en review (None als onbekend)."""
+        with self.engine.connect() as connection:
+            row = connection.execute(select(runs).where(runs.c.id == run_id)).first()
+            if row is None:
+                return None
+            run = dict(row._mapping)
+            for kind, content in connection.execute(
+                select(drafts.c.kind, drafts.c.content).where(drafts.c.run_id == run_id)
+            ):
+                run[f"{kind}_content"] = content
+            run["review"] = connection.execute(
+                select(reviews.c.review).where(reviews.c.run_id == run_id)
+            ).scalar() or ""
+        run["created_at"] = _parse_time(run["created_at"]).isoformat()
+        return run
+
+    def delete_before(self, before: datetime) -> int:
+        """Verwijder runs (met drafts en reviews) van vóór een tijdstip.
+
+        Returns:
+            Aantal verwijderde runs
+        """
+        old = select(runs.c.id).where(runs.c.created_at < _parse_time(before))
+        with self.engine.begin() as connection:
+            connection.execute(delete(drafts).where(drafts.c.run_id.in_(old)))
+            connection.execute(delete(reviews).where(reviews.c.run_id.in_(old)))
+            return connection.execute(delete(runs).where(runs.c.created_at < _parse_time(before))).rowcount
+
+    def close(self):
+        self.engine.dispose()
+
+
+class ResultWriter:
+    """Schrijft resultaten gebundeld weg buiten de event loop (write-behind).
+
+    Resultaten worden gebufferd en door een eigen schrijfthread als bulk
+    insert opgeslagen zodra er batch_size klaarstaan of flush_interval
+    seconden verstreken zijn, zodat een batch-run niet per campagne een
+    transactie kost en de event loop nooit op de database wacht. De writer
+    hangt niet aan een event loop: add en flush werken vanuit elke loop of
+    thread, ook als het team over meerdere asyncio.run-aanroepen gebruikt wordt.
+    """
+
+    def __init__(self, store: ResultStore, batch_size: int = 200, flush_interval: float = 1.0):
+        """Initialize de writer.
+
+        Args:
+            store: De ResultStore
+            batch_size: Aantal resultaten per bulk insert
+            flush_interval: Maximale tijd in seconden dat een resultaat gebufferd blijft
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.saved = 0
+        self.failed = 0
+        self._buffer: List[Dict[str, Any]] = []
+        # Moment waarop het oudste gebufferde resultaat binnenkwam
+        self._oldest: Optional[float] = None
+        # Resultaten in de buffer of in een lopende insert
+        self._pending = 0
+        self._flushers = 0
+        self._closing = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, result: Dict[str, Any], campaign: Dict[str, Any], **extra: Any):
+        """Bied een resultaat aan voor opslag; blokkeert niet."""
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+                self._thread.start()
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append({"result": result, "campaign": campaign, **extra})
+            self._pending += 1
+            self._condition.notify_all()
+
+    def _next_batch(self) -> Optional[List[Dict[str, Any]]]:
+        """Wacht tot er een batch weg moet; None als de writer gesloten wordt."""
+        with self._condition:
+            while True:
+                if self._buffer:
+                    due = self._oldest + self.flush_interval - time.monotonic()
+                    if len(self._buffer) >= self.batch_size or self._flushers or self._closing or due <= 0:
+                        batch = self._buffer[:self.batch_size]
+                        self._buffer = self._buffer[self.batch_size:]
+                        self._oldest = time.monotonic() if self._buffer else None
+                        return batch
+                    self._condition.wait(due)
+                elif self._closing:
+                    return None
+                else:
+                    self._condition.wait()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._save(batch)
+            with self._condition:
+                self._pending -= len(batch)
+                self._condition.notify_all()
+
+    def _save(self, batch: List[Dict[str, Any]]):
+        try:
+            self.store.save_runs(batch)
+            self.saved += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Opslaan van {len(batch)} resultaten mislukt: {e}")
+
+    def flush_now(self):
+        """Schrijf alle gebufferde resultaten weg en blokkeer tot ze opgeslagen zijn."""
+        with self._condition:
+            self._flushers += 1
+            self._condition.notify_all()
+            try:
+                while self._pending:
+                    self._condition.wait()
+            finally:
+                self._flushers -= 1
+
+    async def flush(self):
+        """Schrijf alle gebufferde resultaten weg en wacht tot ze opgeslagen zijn."""
+        await asyncio.to_thread(self.flush_now)
+
+    def close(self):
+        """Schrijf de buffer weg en stop de schrijfthread (een volgende add start hem opnieuw)."""
+        with self._condition:
+            thread, self._closing = self._thread, True
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+        with self._condition:
+            self._thread = None
+            self._closing = False
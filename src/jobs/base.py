@@ -0,0 +1,128 @@
+# Job queue interface voor AutoGen Marketing Team
+
+import random
+from typing import Dict, Any, Optional
+
+# Statussen van een job
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"  # Na max_attempts mislukte pogingen (dead-letter)
+
+
+def retry_delay(attempts: int, base_seconds: float, max_seconds: float = 300.0) -> float:
+    """Wachttijd vóór de volgende poging: exponentieel met jitter.
+
+    Args:
+        attempts: Aantal mislukte pogingen tot nu toe
+        base_seconds: Wachttijd na de eerste mislukte poging
+        max_seconds: Maximale wachttijd
+
+    Returns:
+        Aantal seconden
+    """
+    delay = min(max_seconds, base_seconds * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class Job:
+    """Een uit de queue gehaalde job."""
+
+    def __init__(self, job_id: str, payload: Dict[str, Any], attempts: int,
+                 max_attempts: int, handle: Any = None):
+        """Initialize de job.
+
+        Args:
+            job_id: Unieke id
+            payload: De job-gegevens (bij campagnes de campagne-specificatie)
+            attempts: Aantal pogingen inclusief de huidige
+            max_attempts: Maximaal aantal pogingen voordat de job dead-lettered wordt
+            handle: Broker-specifieke referentie (bijv. het RabbitMQ-bericht)
+        """
+        self.id = job_id
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.handle = handle
+
+    @property
+    def final_attempt(self) -> bool:
+        """Of een mislukking van deze poging de job naar de dead-letter status brengt."""
+        return self.attempts >= self.max_attempts
+
+
+class Broker:
+    """Interface voor een job broker.
+
+    Een job wordt met enqueue aangeboden, door een worker met dequeue
+    opgehaald en daarna met ack (gelukt, resultaat wordt bewaard) of nack
+    (mislukt) afgerond. Na een nack wordt de job met backoff opnieuw
+    aangeboden tot max_attempts, daarna krijgt hij de status "dead".
+    Een job die niet binnen de visibility timeout wordt afgerond (bijv.
+    omdat de worker crashte) wordt opnieuw aangeboden, of dead-lettered als
+    dat de laatste poging was. Een worker die langer bezig is verlengt de
+    lease met extend.
+    """
+
+    visibility_timeout: float = 600.0
+
+    async def enqueue(self, payload: Dict[str, Any], job_id: Optional[str] = None,
+                      max_attempts: Optional[int] = None) -> str:
+        """Zet een job in de queue.
+
+        Args:
+            payload: De job-gegevens (JSON-serialiseerbaar)
+            job_id: Optionele eigen id (standaard een nieuwe UUID)
+            max_attempts: Maximaal aantal pogingen (standaard uit de config)
+
+        Returns:
+            De id van de job
+        """
+        raise NotImplementedError
+
+    async def dequeue(self, timeout: Optional[float] = None) -> Optional[Job]:
+        """Haal de volgende beschikbare job op.
+
+        Args:
+            timeout: Maximale wachttijd in seconden (None = wachten tot er een job is)
+
+        Returns:
+            De job, of None als de timeout verliep
+        """
+        raise NotImplementedError
+
+    async def ack(self, job: Job, result: Dict[str, Any]) -> bool:
+        """Markeer een job als gelukt en bewaar het resultaat.
+
+        Returns:
+            False als de lease niet meer bij deze poging hoort (verlopen en
+            opnieuw aangeboden); het resultaat is dan niet bewaard
+        """
+        raise NotImplementedError
+
+    async def nack(self, job: Job, error: str) -> bool:
+        """Markeer een poging als mislukt: opnieuw aanbieden of dead-letteren.
+
+        Returns:
+            False als de lease niet meer bij deze poging hoort; de job is dan niet gewijzigd
+        """
+        raise NotImplementedError
+
+    async def extend(self, job: Job) -> bool:
+        """Verleng de lease van een lopende job met de visibility timeout.
+
+        Returns:
+            False als de lease al verlopen is en de job opnieuw aangeboden of dead-lettered werd
+        """
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Geef status, pogingen, resultaat en fout van een job (None als onbekend)."""
+        raise NotImplementedError
+
+    async def stats(self) -> Dict[str, int]:
+        """Geef het aantal jobs per status."""
+        raise NotImplementedError
+
+    async def close(self):
+        """Sluit verbindingen van de broker."""
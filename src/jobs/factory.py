@@ -0,0 +1,30 @@
+# Broker-keuze voor de job queue
+
+from typing import Dict, Any
+
+from jobs.base import Broker
+
+BROKER_TYPES = ("memory", "sqlite", "rabbitmq")
+
+
+def create_broker(config: Dict[str, Any]) -> Broker:
+    """Maak de broker volgens de configuratie.
+
+    Args:
+        config: De "jobs" sectie uit de config, met broker ("memory", "sqlite"
+            of "rabbitmq") en de settings van die broker
+
+    Returns:
+        De broker
+    """
+    broker_type = config.get("broker", "sqlite")
+    if broker_type == "memory":
+        from jobs.memory_broker import InMemoryBroker
+        return InMemoryBroker(config)
+    if broker_type == "sqlite":
+        from jobs.sqlite_broker import SQLiteBroker
+        return SQLiteBroker(config)
+    if broker_type == "rabbitmq":
+        from jobs.rabbitmq_broker import RabbitMQBroker
+        return RabbitMQBroker({**config, **config.get("rabbitmq", {})})
+    raise ValueError(f"Onbekend broker type: {broker_type}")
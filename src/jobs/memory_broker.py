@@ -0,0 +1,139 @@
+# In-process job broker voor tests en lokaal gebruik
+
+import time
+import heapq
+import uuid
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple
+
+from jobs.base import Broker, Job, QUEUED, RUNNING, DONE, DEAD, retry_delay
+
+
+class InMemoryBroker(Broker):
+    """Broker binnen één proces en event loop.
+
+    Gedraagt zich als de andere brokers (acks, retries met backoff,
+    dead-lettering en visibility timeout), maar zonder persistentie.
+    Bedoeld voor tests en voor een worker die in hetzelfde proces draait.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize de broker.
+
+        Args:
+            config: Settings: max_attempts, retry_backoff_seconds, visibility_timeout
+        """
+        config = config or {}
+        self.max_attempts = config.get("max_attempts", 3)
+        self.retry_backoff = config.get("retry_backoff_seconds", 5.0)
+        self.visibility_timeout = config.get("visibility_timeout", 600.0)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # (beschikbaar vanaf, volgnummer, job id)
+        self._ready: List[Tuple[float, int, str]] = []
+        self._sequence = 0
+        self._changed = asyncio.Event()
+
+    def _push(self, job_id: str, available_at: float):
+        """Bied een job (opnieuw) aan vanaf een tijdstip."""
+        self._sequence += 1
+        heapq.heappush(self._ready, (available_at, self._sequence, job_id))
+        self._changed.set()
+
+    async def enqueue(self, payload: Dict[str, Any], job_id: Optional[str] = None,
+                      max_attempts: Optional[int] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        self._jobs[job_id] = {
+            "id": job_id, "payload": payload, "status": QUEUED, "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts, "result": None, "error": None,
+            "created": now, "updated": now, "lease_until": None,
+        }
+        self._push(job_id, now)
+        return job_id
+
+    def _requeue_expired(self, now: float):
+        """Bied jobs opnieuw aan waarvan de worker niet op tijd reageerde.
+
+        Was dat de laatste poging, dan gaat de job naar de dead-letter status.
+        """
+        for job in self._jobs.values():
+            if job["status"] != RUNNING or job["lease_until"] >= now:
+                continue
+            if job["attempts"] >= job["max_attempts"]:
+                job.update(status=DEAD, error=f"Lease verlopen na {job['attempts']} pogingen",
+                           lease_until=None, updated=now)
+                continue
+            job.update(status=QUEUED, lease_until=None, updated=now)
+            self._push(job["id"], now)
+
+    async def dequeue(self, timeout: Optional[float] = None) -> Optional[Job]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.time()
+            self._requeue_expired(now)
+            while self._ready and self._ready[0][0] <= now:
+                _, _, job_id = heapq.heappop(self._ready)
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] != QUEUED:
+                    continue
+                job["attempts"] += 1
+                job.update(status=RUNNING, lease_until=now + self.visibility_timeout, updated=now)
+                return Job(job_id, job["payload"], job["attempts"], job["max_attempts"])
+
+            # Wacht op een nieuwe job, de volgende retry of de timeout
+            wait = self._ready[0][0] - now if self._ready else None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                wait = remaining if wait is None else min(wait, remaining)
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _owns(self, job: Job) -> bool:
+        """Of de lease van de job nog bij deze poging hoort."""
+        entry = self._jobs[job.id]
+        return entry["status"] == RUNNING and entry["attempts"] == job.attempts
+
+    async def ack(self, job: Job, result: Dict[str, Any]) -> bool:
+        if not self._owns(job):
+            return False
+        self._jobs[job.id].update(status=DONE, result=result, error=None,
+                                  lease_until=None, updated=time.time())
+        return True
+
+    async def nack(self, job: Job, error: str) -> bool:
+        if not self._owns(job):
+            return False
+        entry = self._jobs[job.id]
+        now = time.time()
+        if job.final_attempt:
+            entry.update(status=DEAD, error=error, lease_until=None, updated=now)
+            return True
+        entry.update(status=QUEUED, error=error, lease_until=None, updated=now)
+        self._push(job.id, now + retry_delay(job.attempts, self.retry_backoff))
+        return True
+
+    async def extend(self, job: Job) -> bool:
+        entry = self._jobs[job.id]
+        now = time.time()
+        if not self._owns(job) or entry["lease_until"] < now:
+            return False
+        entry.update(lease_until=now + self.visibility_timeout, updated=now)
+        return True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {key: job[key] for key in ("id", "status", "attempts", "max_attempts",
+                                          "result", "error", "created", "updated")}
+
+    async def stats(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, DEAD: 0}
+        for job in self._jobs.values():
+            counts[job["status"]] += 1
+        return counts
@@ -0,0 +1,205 @@
+# SQLite job broker voor AutoGen Marketing Team
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+from typing import Dict, Any, Optional
+
+from jobs.base import Broker, Job, QUEUED, RUNNING, DONE, DEAD, retry_delay
+
+
+class SQLiteBroker(Broker):
+    """Persistente broker op één SQLite-bestand.
+
+    Meerdere worker-processen kunnen hetzelfde bestand delen: een job wordt
+    in één `BEGIN IMMEDIATE` transactie geclaimd, zodat hij maar door één
+    worker tegelijk wordt opgepakt. Resultaten en fouten blijven in dezelfde
+    tabel bewaard. Alle databasewerk draait in een thread, buiten de event loop.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize de broker.
+
+        Args:
+            config: Settings: path, max_attempts, retry_backoff_seconds,
+                visibility_timeout, poll_interval
+        """
+        config = config or {}
+        self.path = config.get("path", ".cache/jobs.sqlite")
+        self.max_attempts = config.get("max_attempts", 3)
+        self.retry_backoff = config.get("retry_backoff_seconds", 5.0)
+        self.visibility_timeout = config.get("visibility_timeout", 600.0)
+        self.poll_interval = config.get("poll_interval", 0.5)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                                     timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_until REAL,
+                result TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_until)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        """Voer één statement uit onder de lock en geef de rijen terug."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def enqueue(self, payload: Dict[str, Any], job_id: Optional[str] = None,
+                      max_attempts: Optional[int] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO jobs (id, payload, status, max_attempts, available_at, created, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, json.dumps(payload, ensure_ascii=False), QUEUED,
+             max_attempts or self.max_attempts, now, now, now)
+        )
+        return job_id
+
+    def _claim(self) -> Optional[Job]:
+        """Claim atomair de oudste beschikbare job.
+
+        Verlopen leases worden eerst vrijgegeven; was dat de laatste poging,
+        dan gaat de job naar de dead-letter status.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = 'Lease verlopen na ' || attempts || ' pogingen', "
+                    "lease_until = NULL, updated = ? "
+                    "WHERE status = ? AND lease_until < ? AND attempts >= max_attempts",
+                    (DEAD, now, RUNNING, now)
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, lease_until = NULL, updated = ? "
+                    "WHERE status = ? AND lease_until < ?",
+                    (QUEUED, now, RUNNING, now)
+                )
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts, max_attempts FROM jobs "
+                    "WHERE status = ? AND available_at <= ? ORDER BY available_at LIMIT 1",
+                    (QUEUED, now)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, "
+                        "updated = ? WHERE id = ?",
+                        (RUNNING, now + self.visibility_timeout, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, payload, attempts, max_attempts = row
+        return Job(job_id, json.loads(payload), attempts + 1, max_attempts)
+
+    async def dequeue(self, timeout: Optional[float] = None) -> Optional[Job]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is not None:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    def _update(self, sql: str, params: tuple = ()) -> bool:
+        """Voer één UPDATE uit onder de lock en geef terug of er een rij veranderde."""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount > 0
+
+    async def ack(self, job: Job, result: Dict[str, Any]) -> bool:
+        return await asyncio.to_thread(
+            self._update,
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_until = NULL, updated = ? "
+            "WHERE id = ? AND status = ? AND attempts = ?",
+            (DONE, json.dumps(result, ensure_ascii=False), time.time(), job.id, RUNNING, job.attempts)
+        )
+
+    async def nack(self, job: Job, error: str) -> bool:
+        now = time.time()
+        if job.final_attempt:
+            return await asyncio.to_thread(
+                self._update,
+                "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated = ? "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (DEAD, error, now, job.id, RUNNING, job.attempts)
+            )
+        return await asyncio.to_thread(
+            self._update,
+            "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, available_at = ?, updated = ? "
+            "WHERE id = ? AND status = ? AND attempts = ?",
+            (QUEUED, error, now + retry_delay(job.attempts, self.retry_backoff), now, job.id,
+             RUNNING, job.attempts)
+        )
+
+    def _extend(self, job: Job) -> bool:
+        now = time.time()
+        return self._update(
+            "UPDATE jobs SET lease_until = ?, updated = ? "
+            "WHERE id = ? AND status = ? AND attempts = ? AND lease_until >= ?",
+            (now + self.visibility_timeout, now, job.id, RUNNING, job.attempts, now)
+        )
+
+    async def extend(self, job: Job) -> bool:
+        return await asyncio.to_thread(self._extend, job)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT id, status, attempts, max_attempts, result, error, created, updated "
+            "FROM jobs WHERE id = ?", (job_id,)
+        )
+        if not rows:
+            return None
+        job_id, status, attempts, max_attempts, result, error, created, updated = rows[0]
+        return {"id": job_id, "status": status, "attempts": attempts, "max_attempts": max_attempts,
+                "result": json.loads(result) if result else None, "error": error,
+                "created": created, "updated": updated}
+
+    async def stats(self) -> Dict[str, int]:
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        )
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, DEAD: 0}
+        counts.update(dict(rows))
+        return counts
+
+    async def mark_running(self, job: Job):
+        """Registreer dat een elders (bijv. via RabbitMQ) afgeleverde job loopt."""
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET status = ?, attempts = ?, lease_until = ?, updated = ? WHERE id = ?",
+            (RUNNING, job.attempts, now + self.visibility_timeout, now, job.id)
+        )
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
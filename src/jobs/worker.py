@@ -0,0 +1,109 @@
+# Job worker voor AutoGen Marketing Team
+
+import time
+import asyncio
+import traceback
+from typing import Dict, Any, Optional
+
+from jobs.base import Broker, Job
+from orchestration.batch import REQUIRED_FIELDS
+
+
+class JobWorker:
+    """Verwerkt campagne-jobs uit een broker met een vaste concurrency.
+
+    Elke job is een campagne-specificatie die met `team.run_campaign` wordt
+    uitgevoerd (met refinement.enabled dus via de verfijningsloop).
+    Een gelukt resultaat wordt ge-ackt (en zo bewaard), een exception leidt
+    tot een nack zodat de broker de job opnieuw aanbiedt of dead-lettert.
+    Een job met een ongeldige specificatie gaat meteen naar de dead-letter
+    status, omdat opnieuw proberen niet helpt. Zolang een job loopt wordt
+    zijn lease periodiek verlengd, zodat een run die langer duurt dan de
+    visibility timeout niet door een tweede worker opnieuw wordt uitgevoerd.
+    Verliep de lease toch, dan vervalt het resultaat van deze poging.
+    """
+
+    def __init__(self, broker: Broker, team, concurrency: int = 2,
+                 poll_timeout: float = 1.0, heartbeat_interval: Optional[float] = None):
+        """Initialize de worker.
+
+        Args:
+            broker: De broker waaruit jobs komen
+            team: Object met een async run_campaign(prompt, campaign_type, brand_info, target_audience)
+            concurrency: Maximaal aantal gelijktijdige jobs in deze worker
+            poll_timeout: Wachttijd per dequeue, bepaalt hoe snel stop() reageert
+            heartbeat_interval: Interval voor het verlengen van de lease
+                (standaard een derde van de visibility timeout van de broker)
+        """
+        self.broker = broker
+        self.team = team
+        self.concurrency = max(1, concurrency)
+        self.poll_timeout = poll_timeout
+        self.heartbeat_interval = heartbeat_interval or broker.visibility_timeout / 3
+        self.processed = 0
+        self.failed = 0
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Stop met nieuwe jobs ophalen; lopende jobs worden nog afgerond."""
+        self._stopping.set()
+
+    async def _keep_lease(self, job: Job):
+        """Verleng de lease van een lopende job tot hij afgerond is."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not await self.broker.extend(job):
+                print(f"Lease van job {job.id} verlopen; de job kan elders opnieuw draaien")
+                return
+
+    async def handle(self, job: Job):
+        """Voer één job uit en rond hem af bij de broker."""
+        campaign = job.payload
+        missing = [field for field in REQUIRED_FIELDS if not campaign.get(field)]
+        if missing:
+            job.max_attempts = job.attempts
+            await self.broker.nack(job, f"Ontbrekende velden: {', '.join(missing)}")
+            self.failed += 1
+            return
+
+        start = time.perf_counter()
+        heartbeat = asyncio.ensure_future(self._keep_lease(job))
+        try:
+            result = await self.team.run_campaign(**{field: campaign[field] for field in REQUIRED_FIELDS})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Job {job.id} mislukt (poging {job.attempts}/{job.max_attempts}): {e}")
+            await self.broker.nack(job, f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+            self.failed += 1
+            return
+        finally:
+            heartbeat.cancel()
+
+        result["latency_seconds"] = round(time.perf_counter() - start, 3)
+        if not await self.broker.ack(job, result):
+            # Een andere worker heeft de job intussen opnieuw opgepakt; zijn resultaat telt
+            print(f"Lease van job {job.id} verlopen; resultaat van poging {job.attempts} vervalt")
+            return
+        self.processed += 1
+
+    async def _loop(self, max_jobs: Optional[int]):
+        """Haal jobs op en verwerk ze tot stop() wordt aangeroepen."""
+        while not self._stopping.is_set():
+            job = await self.broker.dequeue(timeout=self.poll_timeout)
+            if job is not None:
+                await self.handle(job)
+            if max_jobs is not None and self.processed + self.failed >= max_jobs:
+                self.stop()
+
+    async def run(self, max_jobs: Optional[int] = None) -> Dict[str, Any]:
+        """Draai de worker.
+
+        Args:
+            max_jobs: Stop zodra er zoveel jobs zijn afgerond (None = tot stop())
+
+        Returns:
+            Dict met aantallen verwerkte en mislukte jobs
+        """
+        await asyncio.gather(*(self._loop(max_jobs) for _ in range(self.concurrency)))
+        return {"processed": self.processed, "failed": self.failed}
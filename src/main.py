@@ -2,15 +2,33 @@
 
 import os
 import json
+import time
 import asyncio
+import argparse
 import autogen
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, AsyncIterator
 
 from agents.content_creator import ContentCreator
 from agents.marketing_reviewer import MarketingReviewer
 from tools.search_tools import SearchTools
 from tools.content_tools import ContentTools
 from mcp.server import MCPServer
+from cache.response_cache import ResponseCache
+from orchestration import events
+from orchestration.batch import BatchRunner, load_campaigns
+from orchestration.pipeline import CampaignPipeline
+from orchestration.dedup import NearDuplicateDetector
+from orchestration.registry import TeamRegistry
+from orchestration.research import ResearchStage, research_summary
+from orchestration.routing import ModelRouter
+from orchestration.refinement import RefinementLoop
+from orchestration.chat_history import ChatHistoryManager
+from agents.llm_client import usage_scope
+from retrieval.campaign_index import CampaignIndex
+from db.store import ResultStore, ResultWriter
+from orchestration.results import build_result
+from utils.rate_limiter import RateLimiter
+from utils.tracing import tracer
 
 class MarketingTeam:
     """Hoofdklasse voor het AutoGen Marketing Team."""
@@ -22,15 +40,71 @@ class MarketingTeam:
             config_path: Pad naar het configuratiebestand
         """
         # Laad configuratie
+        started = time.perf_counter()
         self.config = self._load_config(config_path)
+        tracer.configure(self.config.get("tracing", {}))
+        tracer.record("team.config_load", time.perf_counter() - started, path=config_path)
         
         # Initialiseer tools
-        self.search_tools = SearchTools(self.config.get("search_tools", {}))
-        self.content_tools = ContentTools(self.config.get("content_tools", {}))
+        with tracer.span("team.init_tools"):
+            self.search_tools = SearchTools(self.config.get("search_tools", {}))
+            self.content_tools = ContentTools(self.config.get("content_tools", {}))
+        
+            # Optionele research stage die marktcontext verzamelt voor de ContentCreator
+            self.research_stage = None
+            research_config = self.config.get("research", {})
+            if research_config.get("enabled", False):
+                self.research_stage = ResearchStage(self.search_tools, research_config)
+        
+        # Gedeeld request-, token- en concurrency-budget per model voor alle agents
+        self.rate_limiter = RateLimiter(self.config.get("rate_limits", {}))
+        
+        # Caches, campagne-index en resultaatopslag
+        with tracer.span("team.init_stores"):
+            # Gedeelde response cache (indien geconfigureerd)
+            self.response_cache = None
+            cache_config = self.config.get("response_cache", {})
+            if cache_config.get("enabled", False):
+                self.response_cache = ResponseCache(cache_config)
+        
+            # Index met eerdere, goed beoordeelde campagnes voor few-shot voorbeelden
+            self.campaign_index = None
+            retrieval_config = self.config.get("retrieval", {})
+            if retrieval_config.get("enabled", False):
+                self.campaign_index = CampaignIndex(retrieval_config.get("path", "data/campaign_index"),
+                                                    retrieval_config)
+        
+            # Optionele opslag van alle resultaten (SQLite lokaal, Postgres in productie)
+            self.result_writer = None
+            database_config = self.config.get("database", {})
+            if database_config.get("enabled", False):
+                store = ResultStore(database_config)
+                store.create_schema()
+                self.result_writer = ResultWriter(store, database_config.get("batch_size", 200),
+                                                  database_config.get("flush_interval", 1.0))
         
         # Initialiseer agents
-        self.content_creator = ContentCreator(self.config.get("content_creator", {}))
-        self.marketing_reviewer = MarketingReviewer(self.config.get("marketing_reviewer", {}))
+        with tracer.span("team.init_agents"):
+            self.content_creator = ContentCreator(self.config.get("content_creator", {}),
+                                                  rate_limiter=self.rate_limiter,
+                                                  cache=self.response_cache,
+                                                  example_index=self.campaign_index)
+            self.marketing_reviewer = MarketingReviewer(self.config.get("marketing_reviewer", {}),
+                                                        rate_limiter=self.rate_limiter,
+                                                        cache=self.response_cache)
+        
+        # Optionele modelroutering: goedkoop model eerst, groter model bij een lage score
+        self.router = None
+        self._tier_agents: Dict[tuple, Any] = {}
+        routing_config = self.config.get("routing", {})
+        if routing_config.get("enabled", False):
+            self.router = ModelRouter(routing_config)
+        
+        # Statistieken van de laatste batch-run
+        self.last_batch_stats: Dict[str, Any] = {}
+        
+        # Geschiedenisbeheer van de groepschat (zie setup_group_chat)
+        self.chat_history: Optional[ChatHistoryManager] = None
         
         # Initialiseer MCP server (indien geconfigureerd)
         self.mcp_server = None
@@ -58,10 +132,110 @@ class MarketingTeam:
                 },
                 "marketing_reviewer": {
                     "model": "claude-3-5-sonnet",
-                    "temperature": 0.3
+                    "temperature": 0.3,
+                    "review_format": "tags"
+                },
+                "search_tools": {
+                    "cache": {
+                        "enabled": True,
+                        "path": ".cache/web.sqlite",
+                        "search_ttl_seconds": 7 * 24 * 3600,
+                        "news_ttl_seconds": 3600,
+                        "page_ttl_seconds": 24 * 3600,
+                        "max_bytes": 128 * 1024 * 1024
+                    },
+                    "fetch": {
+                        "max_bytes": 2 * 1024 * 1024,
+                        "max_chars": 20000
+                    }
+                },
+                "content_tools": {
+                    "executor": {"type": "thread", "chunk_size": 64}
+                },
+                "retrieval": {
+                    "enabled": False,
+                    "path": "data/campaign_index",
+                    "index_min_score": 8,
+                    "embedder": {"type": "hashing", "dim": 256}
+                },
+                "research": {
+                    "enabled": False,
+                    "deadline_seconds": 6.0,
+                    "fetch_pages": 2,
+                    "max_context_tokens": 800
+                },
+                "rate_limits": {},
+                "routing": {
+                    "enabled": False,
+                    "tiers": [
+                        {"name": "small", "model": "claude-3-5-haiku", "max_tokens": 1000,
+                         "first_token_seconds": 0.6, "tokens_per_second": 120, "cost_per_1k_tokens": 0.004},
+                        {"name": "large", "model": "claude-3-5-sonnet", "max_tokens": 2000,
+                         "first_token_seconds": 1.2, "tokens_per_second": 60, "cost_per_1k_tokens": 0.015}
+                    ],
+                    "campaign_types": {},
+                    "escalate_below_score": 7,
+                    "max_escalations": 1,
+                    "latency_budget_seconds": None,
+                    "cost_budget": None
+                },
+                "refinement": {
+                    "enabled": False,
+                    "target_score": 8,
+                    "min_improvement": 1,
+                    "max_rounds": 3,
+                    "token_budget": None,
+                    "deadline_seconds": None,
+                    "history_tokens": 300
+                },
+                "group_chat": {
+                    "history": {
+                        "enabled": True,
+                        "window": 4,
+                        "summary_tokens": 300,
+                        "duplicate_threshold": 0.85,
+                        "budgets": {"default": 2000}
+                    }
+                },
+                "response_cache": {
+                    "enabled": False,
+                    "memory_entries": 1024,
+                    "path": ".cache/responses.sqlite",
+                    "ttl_seconds": 7 * 24 * 3600,
+                    "max_entries": 100000,
+                    "max_bytes": 256 * 1024 * 1024
+                },
+                "batch": {
+                    "concurrency": 4
+                },
+                "pipeline": {
+                    "creator": {"workers": 2},
+                    "reviewer": {"workers": 2},
+                    "dedup": {"enabled": True, "threshold": 0.7, "max_entries": 10000}
+                },
+                "database": {
+                    "enabled": False,
+                    "url": os.environ.get("DATABASE_URL", ""),
+                    "batch_size": 200,
+                    "flush_interval": 1.0
+                },
+                "tracing": {
+                    "enabled": False,
+                    "jsonl_path": "logs/traces.jsonl",
+                    "metrics_path": "logs/metrics.prom"
+                },
+                "jobs": {
+                    "broker": "sqlite",
+                    "path": ".cache/jobs.sqlite",
+                    "max_attempts": 3,
+                    "retry_backoff_seconds": 5.0,
+                    "visibility_timeout": 600.0,
+                    "worker": {"processes": 1, "concurrency": 2},
+                    "rabbitmq": {
+                        "url": os.environ.get("RABBITMQ_URL", ""),
+                        "queue": "campaigns"
+                    }
                 },
-                "search_tools": {},
-                "content_tools": {},
                 "use_mcp": False
             }
         
@@ -73,6 +247,10 @@ class MarketingTeam:
                 brand_info: str, target_audience: str) -> Dict[str, Any]:
         """Run het marketing team om content te genereren en te verbeteren.
         
+        Met routering (config "routing") kiest de router het model; bij een
+        score onder de drempel wordt de campagne op een groter model opnieuw
+        gemaakt en telt de poging met de hoogste score.
+        
         Args:
             prompt: Specifieke instructies voor de content
             campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
@@ -81,36 +259,442 @@ class MarketingTeam:
             
         Returns:
             Dict met resultaten, inclusief originele en verbeterde content
+            (en bij routering de pogingen per model)
         """
         print(f"Start marketing team voor {campaign_type}")
         
-        # Stap 1: Content Creator genereert de initiële content
-        print("Stap 1: Content genereren...")
-        original_content = await self.content_creator.create_content(
-            brand_info, campaign_type, target_audience, prompt
-        )
+        with tracer.span("team.run", campaign_type=campaign_type) as span:
+            started = time.monotonic()
+            
+            # Optioneel: marktcontext verzamelen binnen het latencybudget
+            research = await self.research(brand_info, prompt)
+            
+            tier = self.router.select(campaign_type) if self.router is not None else None
+            attempts = []
+            spent = 0.0
+            best = None
+            while True:
+                attempt_started = time.monotonic()
+                content_creator, marketing_reviewer = self._agents_for(tier)
+                
+                # Stap 1: Content Creator genereert de initiële content
+                print("Stap 1: Content genereren...")
+                with tracer.span("creator.create", model=content_creator.llm_config["model"]):
+                    original_content = await content_creator.create_content(
+                        brand_info, campaign_type, target_audience, prompt,
+                        research_context=research["context"] if research else None
+                    )
+                
+                # Stap 2: Marketing Reviewer beoordeelt en verbetert de content
+                print("Stap 2: Content beoordelen en verbeteren...")
+                with tracer.span("reviewer.review", model=marketing_reviewer.llm_config["model"]):
+                    review_results = await marketing_reviewer.review_content(
+                        original_content, brand_info, campaign_type, target_audience
+                    )
+                
+                score = review_results.get("score", 0)
+                if best is None or score > best[1].get("score", 0):
+                    best = (original_content, review_results)
+                if tier is None:
+                    break
+                
+                # Bij een te lage score: opnieuw op een groter model, binnen het budget
+                self.router.observe(tier, campaign_type, time.monotonic() - attempt_started)
+                attempts.append({"tier": tier.name, "model": tier.model, "score": score})
+                spent += self.router.estimate_cost(tier, campaign_type)
+                next_tier = self.router.escalate(tier, score, campaign_type, len(attempts) - 1,
+                                                 time.monotonic() - started, spent)
+                if next_tier is None:
+                    break
+                print(f"Score {score} onder de drempel, opnieuw met {next_tier.model}")
+                tier = next_tier
+            
+            # Verzamel resultaten
+            with tracer.span("team.finish"):
+                results = build_result(best[0], best[1], campaign_type)
+                if research:
+                    results["research"] = research_summary(research)
+                if attempts:
+                    results["routing"] = {"attempts": attempts, "escalations": len(attempts) - 1}
+                await self.remember(results, prompt, brand_info, target_audience)
+            span.set(score=results["score"], attempts=max(1, len(attempts)))
+        
+        print("Marketing team klaar")
+        return results
+    
+    async def run_refined(self, prompt: str, campaign_type: str,
+                          brand_info: str, target_audience: str) -> Dict[str, Any]:
+        """Run het team als create→review→revise loop met een numerieke stopregel.
+        
+        De loop stopt bij de eerste van: score boven refinement.target_score,
+        minder verbetering dan min_improvement, max_rounds, het tokenbudget of
+        een ronde die niet meer voor de deadline klaar zou zijn. Revisies
+        krijgen een samenvatting van eerdere rondes in plaats van het volledige
+        transcript.
+        
+        Args:
+            prompt: Specifieke instructies voor de content
+            campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
+            brand_info: Informatie over het merk
+            target_audience: Beschrijving van de doelgroep
+            
+        Returns:
+            Dict met resultaten zoals run (voor de best scorende ronde), plus
+            de rondes en de stopreden onder "refinement"
+        """
+        print(f"Start verfijning voor {campaign_type}")
         
-        # Stap 2: Marketing Reviewer beoordeelt en verbetert de content
-        print("Stap 2: Content beoordelen en verbeteren...")
-        review_results = await self.marketing_reviewer.review_content(
-            original_content, brand_info, campaign_type, target_audience
+        with tracer.span("team.run_refined", campaign_type=campaign_type) as span, usage_scope() as usage:
+            research = await self.research(brand_info, prompt)
+            tier = self.router.select(campaign_type) if self.router is not None else None
+            content_creator, marketing_reviewer = self._agents_for(tier)
+            loop = RefinementLoop(content_creator, marketing_reviewer, self.config.get("refinement", {}))
+            outcome = await loop.run(prompt, campaign_type, brand_info, target_audience,
+                                     research_context=research["context"] if research else None,
+                                     usage=usage)
+            
+            with tracer.span("team.finish"):
+                results = build_result(outcome["draft"], outcome["review"], campaign_type)
+                if research:
+                    results["research"] = research_summary(research)
+                results["refinement"] = {k: outcome[k] for k in ("rounds", "stop_reason", "history_tokens",
+                                                                  "transcript_tokens")}
+                await self.remember(results, prompt, brand_info, target_audience)
+            span.set(score=results["score"], rounds=len(outcome["rounds"]), stop_reason=outcome["stop_reason"])
+        
+        print(f"Verfijning klaar na {len(outcome['rounds'])} ronde(s): {outcome['stop_reason']}")
+        return results
+    
+    async def run_campaign(self, prompt: str, campaign_type: str,
+                           brand_info: str, target_audience: str) -> Dict[str, Any]:
+        """Run één campagne zoals de config voorschrijft.
+        
+        Met refinement.enabled via run_refined, anders via run. Batches,
+        workers en de API gebruiken deze methode.
+        
+        Returns:
+            Het resultaat van run of run_refined
+        """
+        if self.config.get("refinement", {}).get("enabled", False):
+            return await self.run_refined(prompt, campaign_type, brand_info, target_audience)
+        return await self.run(prompt, campaign_type, brand_info, target_audience)
+    
+    async def remember(self, results: Dict[str, Any], prompt: str, brand_info: str,
+                       target_audience: str) -> bool:
+        """Sla een resultaat op en voeg een goed beoordeelde campagne toe aan de campagne-index.
+        
+        Het embedden en wegschrijven naar de index gebeurt in een thread,
+        buiten de event loop.
+        
+        Args:
+            results: Resultaat van run (met score, content en campaign_type)
+            prompt: Specifieke instructies voor de content
+            brand_info: Informatie over het merk
+            target_audience: Beschrijving van de doelgroep
+            
+        Returns:
+            True als de campagne aan de index is toegevoegd
+        """
+        if self.result_writer is not None:
+            self.result_writer.add(results, {
+                "prompt": prompt, "campaign_type": results["campaign_type"],
+                "brand_info": brand_info, "target_audience": target_audience
+            })
+        if self.campaign_index is None:
+            return False
+        min_score = self.config.get("retrieval", {}).get("index_min_score", 8)
+        if results.get("score", 0) < min_score:
+            return False
+        await asyncio.to_thread(
+            self.campaign_index.add,
+            results.get("improved_content") or results["original_content"],
+            results["score"], results["campaign_type"], target_audience, prompt, brand_info
         )
+        return True
+    
+    async def research(self, brand_info: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Voer de research stage uit als die geconfigureerd is.
         
-        # Verzamel resultaten
-        results = {
-            "original_content": original_content,
-            "review": review_results.get("review", ""),
-            "score": review_results.get("score", 0),
-            "improved_content": review_results.get("improved_content", ""),
-            "campaign_type": campaign_type,
-            "timestamp": "2025-06-02",  # In werkelijkheid zou je datetime.now() gebruiken
-        }
+        Args:
+            brand_info: Informatie over het merk
+            prompt: Specifieke instructies voor de content
+            
+        Returns:
+            Uitkomst van ResearchStage.research, of None zonder research stage
+        """
+        if self.research_stage is None:
+            return None
+        with tracer.span("team.research") as span:
+            research = await self.research_stage.research(brand_info, prompt)
+            span.set(sources=len(research["sources"]), timed_out=len(research["timed_out"]))
+        if research["timed_out"]:
+            print(f"Research: {len(research['timed_out'])} bron(nen) te traag, gedeeltelijke context gebruikt")
+        return research
+    
+    async def review_revision(self, content: str, campaign_type: str,
+                              brand_info: str, target_audience: str) -> Dict[str, Any]:
+        """Beoordeel een bijgewerkte versie van eerder gereviewde content.
         
-        print("Marketing team klaar")
+        Alleen gewijzigde secties worden opnieuw naar de reviewer gestuurd; de
+        rest komt uit de sectiecache van de MarketingReviewer.
+        
+        Args:
+            content: De (aangepaste) content
+            campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
+            brand_info: Informatie over het merk
+            target_audience: Beschrijving van de doelgroep
+            
+        Returns:
+            Dict met resultaten in hetzelfde formaat als run, plus sectie-informatie
+        """
+        review_results = await self.marketing_reviewer.review_content_incremental(
+            content, brand_info, campaign_type, target_audience
+        )
+        results = build_result(content, review_results, campaign_type)
+        results["sections"] = review_results.get("sections", [])
+        results["reviewed_sections"] = review_results.get("reviewed_sections", 0)
         return results
     
+    async def run_stream(self, prompt: str, campaign_type: str,
+                         brand_info: str, target_audience: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run het marketing team en stream de voortgang als getypeerde events.
+        
+        Volgorde: draft_chunk events tijdens het schrijven, review_chunk events
+        tijdens de review, één score event en tot slot een done event met het
+        volledige resultaat (zelfde vorm als run) en de time-to-first-token.
+        
+        Args:
+            prompt: Specifieke instructies voor de content
+            campaign_type: Type campagne (bijv. Instagram Post, Email Campaign)
+            brand_info: Informatie over het merk
+            target_audience: Beschrijving van de doelgroep
+            
+        Returns:
+            Async iterator met events (zie orchestration.events)
+        """
+        with tracer.span("team.run_stream", campaign_type=campaign_type) as span:
+            started = time.monotonic()
+            first_token = None
+        
+            research = await self.research(brand_info, prompt)
+        
+            # Bij routering kiest de router het model; escaleren kan niet meer na het streamen
+            tier = self.router.select(campaign_type) if self.router is not None else None
+            content_creator, marketing_reviewer = self._agents_for(tier)
+        
+            draft_chunks = []
+            async for chunk in content_creator.create_content_stream(
+                brand_info, campaign_type, target_audience, prompt,
+                research_context=research["context"] if research else None
+            ):
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                draft_chunks.append(chunk)
+                yield events.make_event(events.DRAFT_CHUNK, text=chunk)
+            original_content = "".join(draft_chunks)
+        
+            review_chunks = []
+            async for chunk in marketing_reviewer.review_content_stream(
+                original_content, brand_info, campaign_type, target_audience
+            ):
+                review_chunks.append(chunk)
+                yield events.make_event(events.REVIEW_CHUNK, text=chunk)
+            review_results = marketing_reviewer.parse_review("".join(review_chunks))
+        
+            yield events.make_event(events.SCORE, score=review_results.get("score", 0))
+        
+            results = build_result(original_content, review_results, campaign_type)
+            if research:
+                results["research"] = research_summary(research)
+            if tier is not None:
+                results["routing"] = {"attempts": [{"tier": tier.name, "model": tier.model,
+                                                    "score": results["score"]}], "escalations": 0}
+            await self.remember(results, prompt, brand_info, target_audience)
+            span.set(score=results["score"], time_to_first_token=round(first_token or 0.0, 3))
+            yield events.make_event(
+                events.DONE,
+                result=results,
+                time_to_first_token=round(first_token or 0.0, 3),
+                total_seconds=round(time.monotonic() - started, 3)
+            )
+    
+    async def run_many(self, campaigns: Iterable[Dict[str, Any]],
+                       concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Run het marketing team voor veel campagnes tegelijk.
+        
+        Resultaten worden teruggegeven zodra een campagne klaar is. Na afloop
+        staan latency en doorvoer van de batch in `last_batch_stats`.
+        
+        Args:
+            campaigns: Iterable met campagne-specificaties (prompt, campaign_type,
+                brand_info, target_audience)
+            concurrency: Maximaal aantal gelijktijdige campagnes (standaard uit config)
+            
+        Returns:
+            Async iterator met per campagne index, status, resultaat en latency
+            (met refinement.enabled via run_refined in plaats van run)
+        """
+        if concurrency is None:
+            concurrency = self.config.get("batch", {}).get("concurrency", 4)
+        
+        runner = BatchRunner(self.run_campaign, concurrency=concurrency)
+        try:
+            async for item in runner.run(campaigns):
+                self.last_batch_stats = runner.stats.summary()
+                yield item
+        finally:
+            self.last_batch_stats = runner.stats.summary()
+    
+    def _agents_for(self, tier) -> tuple:
+        """Geef de ContentCreator en MarketingReviewer voor een tier van de router.
+        
+        Zonder tier (geen routering) zijn dat de agents van het team. Een tier
+        met hetzelfde model als de agentconfig hergebruikt de agent van het
+        team; voor andere modellen wordt eenmalig een eigen agent gemaakt.
+        """
+        if tier is None:
+            return self.content_creator, self.marketing_reviewer
+        return (self._tier_agent(ContentCreator, "content_creator", tier),
+                self._tier_agent(MarketingReviewer, "marketing_reviewer", self.router.reviewer_tier(tier)))
+    
+    def _tier_agent(self, agent_cls, base_key: str, tier):
+        base = self.content_creator if agent_cls is ContentCreator else self.marketing_reviewer
+        if base.llm_config["model"] == tier.model:
+            return base
+        key = (base_key, tier.name)
+        if key not in self._tier_agents:
+            extra = {"example_index": self.campaign_index} if agent_cls is ContentCreator else {}
+            self._tier_agents[key] = agent_cls({**self.config.get(base_key, {}), **tier.agent_config()},
+                                               rate_limiter=self.rate_limiter, cache=self.response_cache,
+                                               **extra)
+        return self._tier_agents[key]
+    
+    def _stage_agent(self, agent_cls, base_key: str, stage_config: Dict[str, Any]):
+        """Geef de agent voor een pipeline-stage terug.
+        
+        Bevat de stage-configuratie eigen model settings (naast "workers"), dan
+        krijgt de stage een eigen agent; anders wordt de agent van het team hergebruikt.
+        """
+        overrides = {k: v for k, v in stage_config.items() if k != "workers"}
+        if not overrides:
+            return self.content_creator if base_key == "content_creator" else self.marketing_reviewer
+        extra = {"example_index": self.campaign_index} if agent_cls is ContentCreator else {}
+        return agent_cls({**self.config.get(base_key, {}), **overrides},
+                         rate_limiter=self.rate_limiter, cache=self.response_cache, **extra)
+    
+    async def run_pipelined(self, campaigns: Iterable[Dict[str, Any]],
+                            creator_workers: Optional[int] = None,
+                            reviewer_workers: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Run veel campagnes via een create/review pipeline met aparte workers per stage.
+        
+        Reviews van de ene campagne overlappen met het schrijven van de volgende.
+        Met pipeline.dedup wordt van bijna-identieke drafts alleen één gereviewd.
+        Na afloop staan de statistieken (inclusief tijden per stage en de
+        dedup-ratio) in `last_batch_stats`.
+        
+        Args:
+            campaigns: Iterable met campagne-specificaties
+            creator_workers: Aantal creator-workers (standaard uit config)
+            reviewer_workers: Aantal reviewer-workers (standaard uit config)
+            
+        Returns:
+            Async iterator met per campagne index, status, resultaat en latency
+        """
+        pipeline_config = self.config.get("pipeline", {})
+        creator_config = pipeline_config.get("creator", {})
+        reviewer_config = pipeline_config.get("reviewer", {})
+        
+        dedup_config = pipeline_config.get("dedup", {})
+        dedup = None
+        if dedup_config.get("enabled", False):
+            dedup = NearDuplicateDetector(**{k: v for k, v in dedup_config.items() if k != "enabled"})
+        
+        pipeline = CampaignPipeline(
+            self._stage_agent(ContentCreator, "content_creator", creator_config),
+            self._stage_agent(MarketingReviewer, "marketing_reviewer", reviewer_config),
+            creator_workers=creator_workers or creator_config.get("workers", 2),
+            reviewer_workers=reviewer_workers or reviewer_config.get("workers", 2),
+            queue_size=pipeline_config.get("queue_size"),
+            research_stage=self.research_stage,
+            dedup=dedup
+        )
+        try:
+            async for item in pipeline.run(campaigns):
+                self.last_batch_stats = pipeline.stats.summary()
+                if item["status"] == "ok":
+                    campaign = item["campaign"]
+                    await self.remember(item["result"], campaign["prompt"], campaign["brand_info"],
+                                        campaign["target_audience"])
+                yield item
+        finally:
+            self.last_batch_stats = pipeline.stats.summary()
+    
+    async def flush_results(self, usage_label: Optional[str] = None):
+        """Schrijf gebufferde resultaten en de metrics weg en sla optioneel de token usage op.
+        
+        Args:
+            usage_label: Label voor een momentopname van usage_stats (None = niet opslaan)
+        """
+        tracer.write_openmetrics()
+        if self.result_writer is None:
+            return
+        await self.result_writer.flush()
+        if usage_label is not None:
+            await asyncio.to_thread(self.result_writer.store.save_usage, self.usage_stats(), usage_label)
+    
+    async def aclose(self):
+        """Geef de resources van het team vrij.
+        
+        Schrijft eerst de gebufferde resultaten weg en sluit daarna de executor
+        van ContentTools, de SQLite-verbindingen (response cache, web cache,
+        resultaatopslag), de campagne-index en de HTTP clients.
+        """
+        await self.flush_results()
+        await asyncio.to_thread(self.content_tools.close)
+        await self.search_tools.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.campaign_index is not None:
+            self.campaign_index.close()
+        if self.result_writer is not None:
+            await asyncio.to_thread(self.result_writer.close)
+            await asyncio.to_thread(self.result_writer.store.close)
+    
+    def close(self):
+        """Synchrone variant van aclose, voor code zonder draaiende event loop."""
+        asyncio.run(self.aclose())
+    
+    def usage_stats(self) -> Dict[str, Any]:
+        """Geef de token usage per agent, inclusief prompt-cache reads en writes.
+        
+        Returns:
+            Dict met usage per agent (ook per tier van de router) en, indien actief,
+            de routering, de groepschatgeschiedenis, de response cache en de rate limiter statistieken
+        """
+        stats = {
+            "content_creator": self.content_creator.llm.usage_stats(),
+            "marketing_reviewer": self.marketing_reviewer.llm.usage_stats(),
+        }
+        for (base_key, tier_name), agent in self._tier_agents.items():
+            stats[f"{base_key}:{tier_name}"] = agent.llm.usage_stats()
+        if self.router is not None:
+            stats["routing"] = self.router.stats()
+        if self.chat_history is not None:
+            stats["chat_history"] = self.chat_history.stats()
+        rate_limits = self.rate_limiter.stats()
+        if rate_limits:
+            stats["rate_limits"] = rate_limits
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.stats()
+        return stats
+    
     async def setup_group_chat(self):
-        """Configureer een groepschat tussen agents voor meer complexe taken."""
+        """Configureer een groepschat tussen agents voor meer complexe taken.
+        
+        Met group_chat.history (standaard aan) krijgt elke agent per reply een
+        begrensde geschiedenis (zie ChatHistoryManager) in plaats van het
+        volledige transcript; de besparing staat in usage_stats()["chat_history"].
+        """
         # Haal de agent-instanties op
         content_creator_agent = self.content_creator.get_agent()
         marketing_reviewer_agent = self.marketing_reviewer.get_agent()
@@ -131,12 +715,53 @@ class MarketingTeam:
         # Maak een manager voor de groepschat
         manager = autogen.GroupChatManager(groupchat=groupchat)
         
+        # Begrens de geschiedenis die de agents per ronde meekrijgen
+        history_config = self.config.get("group_chat", {}).get("history", {})
+        if history_config.get("enabled", True):
+            self.chat_history = ChatHistoryManager(history_config)
+            self.chat_history.attach([content_creator_agent, marketing_reviewer_agent])
+        
         return {
             "user_proxy": user_proxy,
             "manager": manager,
-            "groupchat": groupchat
+            "groupchat": groupchat,
+            "history": self.chat_history
         }
 
+# Process-brede registry zodat alle entry points dezelfde teaminstantie delen
+_team_registry = TeamRegistry(MarketingTeam)
+
+def get_marketing_team(config_path: str = "config/config.json") -> MarketingTeam:
+    """Haal het gedeelde MarketingTeam voor een configuratiebestand op.
+    
+    Het team wordt één keer per inhoud van het configuratiebestand gebouwd en
+    opnieuw gebouwd zodra de config op disk wijzigt. Een vervangen team zonder
+    lopende leases wordt direct gesloten; wie het team langer vasthoudt
+    gebruikt lease_marketing_team.
+    
+    Args:
+        config_path: Pad naar het configuratiebestand
+        
+    Returns:
+        De gedeelde MarketingTeam instantie
+    """
+    return _team_registry.get(config_path)
+
+def lease_marketing_team(config_path: str = "config/config.json"):
+    """Lease het gedeelde MarketingTeam voor de duur van een async with blok.
+    
+    Gebruik dit als het team langer vastgehouden wordt (een run, een batch,
+    een worker): een team dat door een configwijziging vervangen wordt, wordt
+    pas gesloten als de laatste lease afloopt.
+    
+    Args:
+        config_path: Pad naar het configuratiebestand
+        
+    Returns:
+        Async context manager die de gedeelde MarketingTeam instantie oplevert
+    """
+    return _team_registry.lease(config_path)
+
 async def deploy_mcp():
     """Deploy het systeem naar MCP (Cloudflare/Heroku)."""
     # Laad MCP-specifieke configuratie
@@ -163,27 +788,136 @@ async def deploy_mcp():
 async def main():
     """Hoofdfunctie voor het starten van het systeem."""
     # Initialiseer het marketing team
-    marketing_team = MarketingTeam()
-    
-    # Voorbeeld van het runnen van het team
-    results = await marketing_team.run(
-        prompt="Creëer een Instagram post die onze nieuwe eco-vriendelijke productlijn promoot",
-        campaign_type="Instagram Post",
-        brand_info="GreenTech is een duurzaam technologiebedrijf dat focust op milieuvriendelijke gadgets",
-        target_audience="Milieubewuste consumenten tussen 25-40 jaar die geïnteresseerd zijn in technologie"
-    )
-    
-    # Print resultaten
-    print("\nOriginele Content:")
-    print(results["original_content"])
-    print("\nBeoordeling:")
-    print(results["review"])
-    print("\nVerbeterde Content:")
-    print(results["improved_content"])
+    async with lease_marketing_team() as marketing_team:
+        # Voorbeeld van het runnen van het team
+        results = await marketing_team.run_campaign(
+            prompt="Creëer een Instagram post die onze nieuwe eco-vriendelijke productlijn promoot",
+            campaign_type="Instagram Post",
+            brand_info="GreenTech is een duurzaam technologiebedrijf dat focust op milieuvriendelijke gadgets",
+            target_audience="Milieubewuste consumenten tussen 25-40 jaar die geïnteresseerd zijn in technologie"
+        )
+        
+        # Print resultaten
+        print("\nOriginele Content:")
+        print(results["original_content"])
+        print("\nBeoordeling:")
+        print(results["review"])
+        print("\nVerbeterde Content:")
+        print(results["improved_content"])
+        await marketing_team.flush_results()
     
     # Deploy MCP als omgevingsvariabelen zijn ingesteld
     if os.environ.get("DEPLOY_MCP", "").lower() == "true":
         await deploy_mcp()
 
+async def run_batch(input_path: str, output_path: Optional[str] = None,
+                    concurrency: Optional[int] = None,
+                    config_path: str = "config/config.json",
+                    pipelined: bool = False):
+    """Voer een batch campagnes uit een JSONL-bestand uit.
+    
+    Args:
+        input_path: JSONL-bestand met één campagne-specificatie per regel
+        output_path: Optioneel JSONL-bestand voor de resultaten
+        concurrency: Maximaal aantal gelijktijdige campagnes
+        config_path: Pad naar het configuratiebestand
+        pipelined: Gebruik de create/review pipeline in plaats van run_many
+    """
+    async with lease_marketing_team(config_path) as marketing_team:
+        output = open(output_path, "w", encoding="utf-8") if output_path else None
+        
+        if pipelined:
+            items = marketing_team.run_pipelined(load_campaigns(input_path))
+        else:
+            items = marketing_team.run_many(load_campaigns(input_path), concurrency)
+        
+        try:
+            async for item in items:
+                print(f"[{item['index']}] {item['status']} in {item['latency_seconds']:.2f}s")
+                if output:
+                    output.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    output.flush()
+        finally:
+            if output:
+                output.close()
+        
+        await marketing_team.flush_results(usage_label=f"batch:{input_path}")
+        print(f"Usage: {json.dumps(marketing_team.usage_stats())}")
+        
+        stats = marketing_team.last_batch_stats
+        print(f"\nBatch klaar: {stats['completed']} gelukt, {stats['failed']} mislukt "
+              f"in {stats['elapsed_seconds']:.1f}s")
+        print(f"Doorvoer: {stats['throughput_per_minute']} campagnes/minuut, "
+              f"latency p50 {stats['latency_p50']}s, p95 {stats['latency_p95']}s")
+        if pipelined:
+            print(f"Stages: create p50 {stats['create_p50']}s, review p50 {stats['review_p50']}s, "
+                  f"review-wachttijd p50 {stats['review_queue_wait_p50']}s")
+            if "dedup" in stats:
+                print(f"Dedup: {stats['dedup']['duplicates']} van {stats['dedup']['seen']} drafts "
+                      f"hergebruikten een review (ratio {stats['dedup']['dedup_ratio']})")
+        if tracer.enabled:
+            print("Tijd per stap (aantal, gemiddeld, totaal):")
+            for name, span_stats in tracer.summary().items():
+                print(f"  {name}: {span_stats['count']}x, {span_stats['mean_seconds']}s, "
+                      f"{span_stats['total_seconds']}s")
+
+def index_results(results_path: str, config_path: str = "config/config.json") -> int:
+    """Voeg de goed beoordeelde campagnes uit een batch-resultaatbestand toe aan de campagne-index.
+    
+    Args:
+        results_path: JSONL-bestand met batch-resultaten (uitvoer van --batch --output)
+        config_path: Pad naar het configuratiebestand (sectie "retrieval")
+        
+    Returns:
+        Aantal toegevoegde campagnes
+    """
+    config = {}
+    if os.path.exists(config_path):
+        with open(config_path, "r") as f:
+            config = json.load(f)
+    retrieval_config = config.get("retrieval", {})
+    min_score = retrieval_config.get("index_min_score", 8)
+    index = CampaignIndex(retrieval_config.get("path", "data/campaign_index"), retrieval_config)
+    
+    def items():
+        for item in load_campaigns(results_path):
+            result = item.get("result") or {}
+            if item.get("status") != "ok" or result.get("score", 0) < min_score:
+                continue
+            campaign = item.get("campaign", {})
+            yield {
+                "content": result.get("improved_content") or result.get("original_content", ""),
+                "score": result["score"],
+                "campaign_type": result.get("campaign_type", ""),
+                "target_audience": campaign.get("target_audience", ""),
+                "prompt": campaign.get("prompt", ""),
+                "brand_info": campaign.get("brand_info", ""),
+            }
+    
+    added = index.add_many(items())
+    index.close()
+    print(f"{added} campagnes toegevoegd aan de index ({len(index)} totaal)")
+    return added
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse de command-line argumenten."""
+    parser = argparse.ArgumentParser(description="AutoGen Marketing Team")
+    parser.add_argument("--batch", help="JSONL-bestand met campagnes voor een batch-run")
+    parser.add_argument("--output", help="JSONL-bestand voor de batch-resultaten")
+    parser.add_argument("--concurrency", type=int, help="Aantal gelijktijdige campagnes")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Gebruik de create/review pipeline (workers per stage uit config)")
+    parser.add_argument("--index-results",
+                        help="JSONL-bestand met batch-resultaten om aan de campagne-index toe te voegen")
+    parser.add_argument("--config", default="config/config.json", help="Pad naar configuratiebestand")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    if args.index_results:
+        index_results(args.index_results, args.config)
+    elif args.batch:
+        asyncio.run(run_batch(args.batch, args.output, args.concurrency, args.config,
+                              args.pipelined))
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -4,6 +4,8 @@ import os
 import json
 from typing import Dict, List, Any, Optional
 
+from utils.tracing import tracer
+
 class MCPServer:
     """Model Context Protocol server voor AutoGen Marketing Team."""
     
@@ -35,11 +37,13 @@ class MCPServer:
         
         # Cloudflare Workers registratie (placeholder)
         if self.cloudflare_config:
-            await self._register_with_cloudflare()
+            with tracer.span("mcp.register", target="cloudflare"):
+                await self._register_with_cloudflare()
         
         # Heroku MCP registratie (placeholder)
         if self.heroku_config:
-            await self._register_with_heroku()
+            with tracer.span("mcp.register", target="heroku"):
+                await self._register_with_heroku()
     
     async def _register_with_cloudflare(self):
         """Registreer bij Cloudflare Workers."""
@@ -59,12 +63,14 @@ class MCPServer:
         
         # Cloudflare deployment (placeholder)
         if self.cloudflare_config:
-            cloudflare_url = await self._deploy_to_cloudflare()
+            with tracer.span("mcp.deploy", target="cloudflare"):
+                cloudflare_url = await self._deploy_to_cloudflare()
             print(f"Deployed naar Cloudflare: {cloudflare_url}")
         
         # Heroku deployment (placeholder)
         if self.heroku_config:
-            heroku_url = await self._deploy_to_heroku()
+            with tracer.span("mcp.deploy", target="heroku"):
+                heroku_url = await self._deploy_to_heroku()
             print(f"Deployed naar Heroku: {heroku_url}")
     
     async def _deploy_to_cloudflare(self) -> str:
@@ -0,0 +1,159 @@
+# Batch Runner voor AutoGen Marketing Team
+
+import json
+import math
+import time
+import asyncio
+from typing import Dict, List, Any, Optional, Iterable, Iterator, AsyncIterator, Callable, Awaitable
+
+# Velden die elke campagne-specificatie moet bevatten
+REQUIRED_FIELDS = ("prompt", "campaign_type", "brand_info", "target_audience")
+
+
+def load_campaigns(path: str) -> Iterator[Dict[str, Any]]:
+    """Lees campagne-specificaties regel voor regel uit een JSONL-bestand.
+
+    Args:
+        path: Pad naar het JSONL-bestand
+
+    Returns:
+        Iterator met campagne-specificaties
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Bereken een percentiel (nearest-rank) van een lijst waarden.
+
+    Args:
+        values: De waarden
+        pct: Percentiel tussen 0 en 100
+
+    Returns:
+        De waarde op het gevraagde percentiel, of 0.0 voor een lege lijst
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class BatchStats:
+    """Houdt latency en doorvoer van een batch-run bij."""
+
+    def __init__(self):
+        """Initialize lege statistieken."""
+        self.started = time.monotonic()
+        self.latencies: List[float] = []
+        self.completed = 0
+        self.failed = 0
+
+    def record(self, latency: float, ok: bool):
+        """Registreer een afgerond item.
+
+        Args:
+            latency: Doorlooptijd van het item in seconden
+            ok: Of het item succesvol was
+        """
+        self.latencies.append(latency)
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Geef een samenvatting van de batch tot nu toe.
+
+        Returns:
+            Dict met aantallen, latency-percentielen en doorvoer
+        """
+        elapsed = time.monotonic() - self.started
+        total = self.completed + self.failed
+        return {
+            "items": total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_minute": round(total / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "latency_p50": round(percentile(self.latencies, 50), 3),
+            "latency_p95": round(percentile(self.latencies, 95), 3),
+            "latency_max": round(max(self.latencies), 3) if self.latencies else 0.0,
+        }
+
+
+class BatchRunner:
+    """Voert veel campagnes gelijktijdig uit met een begrensde concurrency.
+
+    Er staan nooit meer dan `concurrency` campagnes tegelijk open, ook niet bij
+    een zeer grote (of lazy ingelezen) invoer. Resultaten worden teruggegeven
+    zodra ze klaar zijn, niet pas aan het eind van de batch.
+    """
+
+    def __init__(self, run_fn: Callable[..., Awaitable[Dict[str, Any]]], concurrency: int = 4):
+        """Initialize de batch runner.
+
+        Args:
+            run_fn: Coroutine-functie die één campagne uitvoert (bijv. MarketingTeam.run)
+            concurrency: Maximaal aantal gelijktijdige campagnes
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency moet minimaal 1 zijn")
+        self.run_fn = run_fn
+        self.concurrency = concurrency
+        self.stats = BatchStats()
+
+    async def _run_one(self, index: int, campaign: Dict[str, Any]) -> Dict[str, Any]:
+        """Voer één campagne uit en vang fouten per item af."""
+        started = time.monotonic()
+        try:
+            missing = [field for field in REQUIRED_FIELDS if not campaign.get(field)]
+            if missing:
+                raise ValueError(f"Ontbrekende velden: {', '.join(missing)}")
+
+            result = await self.run_fn(**{field: campaign[field] for field in REQUIRED_FIELDS})
+            item = {"index": index, "status": "ok", "result": result}
+        except Exception as e:
+            item = {"index": index, "status": "error", "error": str(e)}
+
+        item["latency_seconds"] = round(time.monotonic() - started, 3)
+        item["campaign"] = campaign
+        self.stats.record(item["latency_seconds"], item["status"] == "ok")
+        return item
+
+    async def run(self, campaigns: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Voer alle campagnes uit en geef resultaten terug zodra ze klaar zijn.
+
+        Args:
+            campaigns: Iterable met campagne-specificaties
+
+        Returns:
+            Async iterator met per campagne een dict met index, status, resultaat
+            (of fout) en latency
+        """
+        self.stats = BatchStats()
+        source = iter(enumerate(campaigns))
+        pending = set()
+
+        def fill():
+            for index, campaign in source:
+                pending.add(asyncio.ensure_future(self._run_one(index, campaign)))
+                if len(pending) >= self.concurrency:
+                    break
+
+        fill()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    yield task.result()
+                fill()
+        finally:
+            # Ruim openstaande taken op als de consument eerder stopt
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,206 @@
+# Begrensde groepschatgeschiedenis voor AutoGen Marketing Team
+
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set
+
+from agents.llm_client import estimate_tokens
+from tools.analysis.text import tokenize
+
+_SCORE_RE = re.compile(r"<score>\s*(\d+(?:[.,]\d)?)\s*</score>|(?<![\d.,])(10|\d)\s*/\s*10\b", re.IGNORECASE)
+_SCORE_TAG_RE = re.compile(r"<score>.*?</score>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"</?[a-z_]+>", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+SUMMARY_HEADER = "SAMENVATTING EERDERE BERICHTEN:"
+
+
+def _content(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    return content if isinstance(content, str) else str(content or "")
+
+
+def _shingles(text: str) -> Set[str]:
+    words = tokenize(text)
+    if len(words) < 3:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / (len(a | b) or 1)
+
+
+class ChatHistoryManager:
+    """Houdt de berichten die een agent in de groepschat te zien krijgt begrensd.
+
+    Zonder beperking stuurt elke ronde het volledige transcript naar elke
+    agent, waardoor tokens en latency kwadratisch met het aantal rondes
+    groeien. Per reply krijgt een agent hier:
+
+    - de taak (het eerste bericht) ongewijzigd;
+    - een rolling samenvatting van oudere berichten (per bericht de afzender,
+      een eventuele score en de eerste zin, gecachet per bericht);
+    - een sliding window met de laatste berichten letterlijk.
+
+    Drafts die (bijna) gelijk zijn aan een later bericht worden vervangen door
+    een verwijzing, en het geheel blijft binnen het contextbudget van de agent:
+    eerst vallen de oudste samenvattingsregels weg, daarna de oudste berichten
+    uit het window. Het laatste bericht blijft altijd staan.
+
+    Configuratie voorbeeld::
+
+        {
+            "enabled": true,
+            "window": 4,
+            "summary_tokens": 300,
+            "duplicate_threshold": 0.85,
+            "budgets": {"default": 2000, "marketing_reviewer": 1500}
+        }
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize de manager.
+
+        Args:
+            config: Settings: window, summary_tokens, summary_chars (per bericht),
+                duplicate_threshold, budgets (tokens per agentnaam, met "default")
+        """
+        config = config or {}
+        self.window = max(1, config.get("window", 4))
+        self.summary_tokens = config.get("summary_tokens", 300)
+        self.summary_chars = config.get("summary_chars", 160)
+        self.duplicate_threshold = config.get("duplicate_threshold", 0.85)
+        self.budgets = {"default": 2000, **config.get("budgets", {})}
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._max_summaries = config.get("max_cached_summaries", 4096)
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, agent_name: str) -> int:
+        return self.budgets.get(agent_name, self.budgets["default"])
+
+    def _summarize(self, message: Dict[str, Any]) -> str:
+        """Eén regel per bericht: afzender, score (indien aanwezig) en de eerste zin."""
+        text = _content(message)
+        key = hashlib.sha1(f"{message.get('name', '')}\0{text}".encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._summaries.get(key)
+            if cached is not None:
+                self._summaries.move_to_end(key)
+                return cached
+        match = _SCORE_RE.search(text)
+        plain = " ".join(_TAG_RE.sub(" ", _SCORE_TAG_RE.sub(" ", text)).split())
+        first = _SENTENCE_RE.split(plain, 1)[0] if plain else ""
+        if len(first) > self.summary_chars:
+            first = first[:self.summary_chars].rsplit(" ", 1)[0] + "..."
+        score = f" (score {match.group(1) or match.group(2)}/10)" if match else ""
+        line = f"- {message.get('name') or message.get('role', '?')}{score}: {first}"
+        with self._lock:
+            self._summaries[key] = line
+            if len(self._summaries) > self._max_summaries:
+                self._summaries.popitem(last=False)
+        return line
+
+    def _deduplicate(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vervang drafts in het window die later (bijna) letterlijk terugkomen door een verwijzing."""
+        shingles = [_shingles(_content(message)) for message in messages]
+        result = []
+        for index, message in enumerate(messages):
+            later = next((other for other in range(len(messages) - 1, index, -1)
+                          if _similarity(shingles[index], shingles[other]) >= self.duplicate_threshold), None)
+            if later is None or estimate_tokens(_content(message)) < 20:
+                result.append(message)
+            else:
+                name = messages[later].get("name") or "later bericht"
+                result.append({**message, "content": f"[Draft weggelaten: (bijna) gelijk aan het bericht van {name} verderop]"})
+        return result
+
+    def compact(self, messages: List[Dict[str, Any]], agent_name: str = "") -> List[Dict[str, Any]]:
+        """Geef de begrensde berichtenlijst voor een agent.
+
+        Args:
+            messages: Het volledige transcript (oudste eerst)
+            agent_name: Naam van de agent die gaat antwoorden (bepaalt het budget)
+
+        Returns:
+            De berichten die de agent te zien krijgt
+        """
+        raw_tokens = sum(estimate_tokens(_content(message)) for message in messages)
+        if len(messages) <= self.window + 1:
+            compacted = list(messages)
+        else:
+            task, older, recent = messages[0], messages[1:-self.window], messages[-self.window:]
+            recent = self._deduplicate(recent)
+            lines = [self._summarize(message) for message in older]
+            compacted = self._fit(task, lines, recent, self.budget(agent_name))
+        sent_tokens = sum(estimate_tokens(_content(message)) for message in compacted)
+        with self._lock:
+            stats = self._stats.setdefault(agent_name or "?", {"replies": 0, "raw_tokens": 0, "sent_tokens": 0})
+            stats["replies"] += 1
+            stats["raw_tokens"] += raw_tokens
+            stats["sent_tokens"] += sent_tokens
+        return compacted
+
+    def _fit(self, task: Dict[str, Any], lines: List[str], recent: List[Dict[str, Any]],
+             budget: int) -> List[Dict[str, Any]]:
+        """Zet taak, samenvatting en window samen binnen het budget."""
+        # De samenvatting heeft een eigen plafond; de oudste regels vallen eerst weg
+        while lines and estimate_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        fixed = estimate_tokens(_content(task))
+        window_tokens = [estimate_tokens(_content(message)) for message in recent]
+        while lines and fixed + estimate_tokens("\n".join(lines)) + sum(window_tokens) > budget:
+            lines.pop(0)
+        while len(recent) > 1 and fixed + sum(window_tokens) > budget:
+            recent, window_tokens = recent[1:], window_tokens[1:]
+        compacted = [task]
+        if lines:
+            compacted.append({"role": "user", "name": "history_manager",
+                              "content": SUMMARY_HEADER + "\n" + "\n".join(lines)})
+        return compacted + recent
+
+    def hook(self, agent_name: str):
+        """Hook voor AutoGen's process_all_messages_before_reply van een agent."""
+        def process(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return self.compact(messages, agent_name)
+        return process
+
+    def attach(self, agents: List[Any]) -> List[str]:
+        """Registreer de hook op alle agents die hooks ondersteunen.
+
+        Returns:
+            Namen van de agents waarop de hook geregistreerd is
+        """
+        attached = []
+        for agent in agents:
+            register = getattr(agent, "register_hook", None)
+            if register is None:
+                continue
+            try:
+                register(hookable_method="process_all_messages_before_reply", hook=self.hook(agent.name))
+            except (AssertionError, KeyError, ValueError, TypeError) as e:
+                print(f"Geschiedenisbeheer niet actief voor {agent.name}: {e}")
+                continue
+            attached.append(agent.name)
+        return attached
+
+    def stats(self) -> Dict[str, Any]:
+        """Geef per agent en in totaal de tokens van het transcript versus wat er verstuurd is.
+
+        Returns:
+            Dict met replies, raw_tokens, sent_tokens, saved_tokens en saved_ratio,
+            in totaal en per agent onder "agents"
+        """
+        with self._lock:
+            per_agent = {name: dict(values) for name, values in self._stats.items()}
+        totals = {"replies": 0, "raw_tokens": 0, "sent_tokens": 0}
+        for values in per_agent.values():
+            for key in totals:
+                totals[key] += values[key]
+        for values in list(per_agent.values()) + [totals]:
+            values["saved_tokens"] = values["raw_tokens"] - values["sent_tokens"]
+            values["saved_ratio"] = round(values["saved_tokens"] / values["raw_tokens"], 3) if values["raw_tokens"] else 0.0
+        return {"agents": per_agent, **totals}
@@ -0,0 +1,145 @@
+# Request Coalescing voor AutoGen Marketing Team
+
+import json
+import asyncio
+import hashlib
+from typing import Dict, List, Set, Any, Callable, Awaitable, AsyncIterator, Optional
+
+
+def request_key(**fields: Any) -> str:
+    """Bepaal een stabiele sleutel voor een aanvraag.
+
+    Args:
+        **fields: De velden die de aanvraag bepalen (bijv. de campagne-specificatie)
+
+    Returns:
+        SHA-256 hex digest van de velden als canonieke JSON
+    """
+    canonical = json.dumps(fields, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Broadcast:
+    """Eén lopende event stream met meerdere lezers.
+
+    Alle events worden bewaard zolang de stream loopt, zodat een lezer die
+    later aansluit vanaf het begin meeleest.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+
+    async def publish(self, event: Dict[str, Any]):
+        async with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None):
+        async with self.changed:
+            self.finished = True
+            self.error = error
+            self.changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        position = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: position < len(self.events) or self.finished)
+                pending = self.events[position:]
+                finished, error = self.finished, self.error
+            position += len(pending)
+            for event in pending:
+                yield event
+            if finished and position >= len(self.events):
+                if error is not None:
+                    raise error
+                return
+
+
+class RequestCoalescer:
+    """Laat identieke gelijktijdige aanvragen één generatie delen.
+
+    De eerste aanvraag voor een sleutel start het werk als losse task; elke
+    volgende aanvraag met dezelfde sleutel wacht op die task zolang hij loopt.
+    Afgebroken aanvragen (bijv. een verbroken client) annuleren het gedeelde
+    werk niet. Na afloop wordt de sleutel vergeten: dit is geen cache.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._producers: Set[asyncio.Task] = set()
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Voer werk uit, of sluit aan bij lopend werk met dezelfde sleutel.
+
+        Args:
+            key: Sleutel van de aanvraag (zie request_key)
+            factory: Functie die de coroutine voor het werk maakt
+
+        Returns:
+            Het (gedeelde) resultaat
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def stream(self, key: str,
+                     factory: Callable[[], AsyncIterator[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream events, of lees mee met een lopende stream met dezelfde sleutel.
+
+        Args:
+            key: Sleutel van de aanvraag (zie request_key)
+            factory: Functie die de async iterator met events maakt
+
+        Returns:
+            Async iterator met alle events van de (gedeelde) stream
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.started += 1
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+
+            async def produce():
+                error = None
+                try:
+                    async for event in factory():
+                        await broadcast.publish(event)
+                except Exception as e:
+                    error = e
+                except BaseException as e:
+                    # Ook bij annulering moeten de lezers een einde zien, anders wachten ze eeuwig
+                    error = RuntimeError(f"Stream afgebroken ({type(e).__name__})")
+                    raise
+                finally:
+                    self._streams.pop(key, None)
+                    await broadcast.finish(error)
+
+            producer = asyncio.ensure_future(produce())
+            self._producers.add(producer)
+            producer.add_done_callback(self._producers.discard)
+        else:
+            self.coalesced += 1
+
+        async for event in broadcast.subscribe():
+            yield event
+
+    def stats(self) -> Dict[str, int]:
+        """Geef aantallen gestarte en gedeelde aanvragen en het aantal lopende."""
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls) + len(self._streams),
+        }
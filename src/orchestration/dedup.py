@@ -0,0 +1,155 @@
+# Near-duplicate detectie voor gegenereerde drafts
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Hashable, Tuple
+
+import numpy as np
+
+from tools.analysis.text import tokenize
+
+# Mersenne-priem voor de universele hashfuncties van MinHash
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _hash64(value: str) -> int:
+    """Stabiele 64-bit hash."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """Berekent MinHash-signaturen van woord-shingles."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 2, seed: int = 1):
+        """Initialize de hasher.
+
+        Args:
+            num_perm: Aantal hashfuncties (lengte van de signatuur)
+            shingle_size: Aantal woorden per shingle
+            seed: Seed voor de hashfuncties
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a < 2^31 en x < 2^32 houdt a*x + b binnen uint64
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        """Woord-shingles van een tekst (korte teksten als één shingle)."""
+        words = tokenize(text)
+        size = self.shingle_size
+        if len(words) <= size:
+            return [" ".join(words)] if words else []
+        return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash-signatuur (uint32 array van lengte num_perm)."""
+        shingles = set(self.shingles(text))
+        if not shingles:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        hashes = np.fromiter((_hash64(shingle) & 0xFFFFFFFF for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateDetector:
+    """Groepeert bijna-identieke teksten met MinHash en LSH banding.
+
+    Werkt streaming: elke tekst wordt bij binnenkomst vergeleken met de
+    eerder geziene representanten en óf aan een bestaand cluster toegevoegd
+    óf zelf representant van een nieuw cluster. Alleen representanten worden
+    bewaard, en maximaal max_entries (de oudste vallen af), zodat het
+    geheugen begrensd blijft bij een onbegrensde batch.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 128, bands: int = 32,
+                 shingle_size: int = 2, max_entries: int = 10000):
+        """Initialize de detector.
+
+        Args:
+            threshold: Minimale geschatte Jaccard-gelijkenis voor een duplicaat
+            num_perm: Lengte van de MinHash-signatuur
+            bands: Aantal LSH-banden (num_perm moet er deelbaar door zijn)
+            shingle_size: Aantal woorden per shingle
+            max_entries: Maximaal aantal bewaarde representanten
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm moet deelbaar zijn door bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self._signatures: "OrderedDict[Hashable, Tuple[np.ndarray, List[Tuple[str, bytes]]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, bytes], List[Hashable]] = {}
+        self.seen = 0
+        self.duplicates = 0
+
+    def _band_keys(self, signature: np.ndarray, context: str) -> List[Tuple[str, bytes]]:
+        """LSH-sleutels per band, gescheiden per context."""
+        return [(f"{context}\x00{band}", signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+
+    def add(self, doc_id: Hashable, text: str, context: str = "") -> Optional[Hashable]:
+        """Verwerk een tekst.
+
+        Args:
+            doc_id: Id van de tekst
+            text: De tekst
+            context: Alleen teksten met dezelfde context (bijv. merk en kanaal) kunnen duplicaten zijn
+
+        Returns:
+            Id van de representant als de tekst een duplicaat is, anders None
+            (de tekst is dan zelf representant van een nieuw cluster)
+        """
+        self.seen += 1
+        signature = self.hasher.signature(text)
+        keys = self._band_keys(signature, context)
+
+        best, best_similarity = None, 0.0
+        checked = set()
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate][0] == signature))
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+        if best is not None and best_similarity >= self.threshold:
+            self.duplicates += 1
+            self._signatures.move_to_end(best)
+            return best
+
+        self._signatures[doc_id] = (signature, keys)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(doc_id)
+        while len(self._signatures) > self.max_entries:
+            self._evict()
+        return None
+
+    def _evict(self):
+        """Verwijder de minst recent gebruikte representant."""
+        doc_id, (_, keys) = self._signatures.popitem(last=False)
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.remove(doc_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._signatures
+
+    def stats(self) -> Dict[str, Any]:
+        """Geef het aantal verwerkte teksten, duplicaten, clusters en de dedup-ratio."""
+        return {
+            "seen": self.seen,
+            "duplicates": self.duplicates,
+            "clusters": self.seen - self.duplicates,
+            "dedup_ratio": round(self.duplicates / self.seen, 3) if self.seen else 0.0,
+        }
@@ -0,0 +1,24 @@
+# Stream Events voor AutoGen Marketing Team
+
+import time
+from typing import Dict, Any
+
+# Event types die MarketingTeam.run_stream uitzendt
+DRAFT_CHUNK = "draft_chunk"
+REVIEW_CHUNK = "review_chunk"
+SCORE = "score"
+DONE = "done"
+ERROR = "error"
+
+
+def make_event(event_type: str, **data: Any) -> Dict[str, Any]:
+    """Maak een getypeerd stream event.
+
+    Args:
+        event_type: Een van de event types uit deze module
+        **data: Event-specifieke velden
+
+    Returns:
+        Dict met "type", "time" en de opgegeven velden
+    """
+    return {"type": event_type, "time": time.time(), **data}
@@ -0,0 +1,266 @@
+# Create/Review Pipeline voor AutoGen Marketing Team
+
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set, Iterable, AsyncIterator
+
+from orchestration.batch import BatchStats, REQUIRED_FIELDS, percentile
+from orchestration.dedup import NearDuplicateDetector
+from orchestration.results import build_result
+from utils.tracing import tracer
+
+# Markeert het einde van de invoer in een stage-queue
+_STOP = object()
+
+
+class PipelineStats(BatchStats):
+    """Batch-statistieken aangevuld met tijden per pipeline-stage."""
+
+    def __init__(self):
+        """Initialize lege statistieken."""
+        super().__init__()
+        self.create_latencies: List[float] = []
+        self.review_latencies: List[float] = []
+        self.review_queue_waits: List[float] = []
+        self.dedup: Dict[str, Any] = {}
+
+    def summary(self) -> Dict[str, Any]:
+        """Geef een samenvatting inclusief stage-latencies.
+
+        Een oplopende review-wachttijd betekent dat de reviewer-stage de
+        bottleneck is en meer workers kan gebruiken.
+
+        Returns:
+            Dict met batch-statistieken en p50/p95 per stage
+        """
+        summary = super().summary()
+        for name, values in (("create", self.create_latencies),
+                             ("review", self.review_latencies),
+                             ("review_queue_wait", self.review_queue_waits)):
+            summary[f"{name}_p50"] = round(percentile(values, 50), 3)
+            summary[f"{name}_p95"] = round(percentile(values, 95), 3)
+        if self.dedup:
+            summary["dedup"] = self.dedup
+        return summary
+
+
+class CampaignPipeline:
+    """Twee-staps producer/consumer pipeline voor content creatie en review.
+
+    Creator-workers zetten drafts in een begrensde queue die door
+    reviewer-workers wordt geleegd. Zo overlapt de review van campagne N met
+    het schrijven van campagne N+1 en kan elke stage apart geschaald worden.
+    Is de review-queue vol, dan wachten de creators (backpressure).
+
+    Met een NearDuplicateDetector wordt alleen de representant van een groep
+    bijna-identieke drafts gereviewd; de duplicaten krijgen diens review.
+    """
+
+    def __init__(self, content_creator, marketing_reviewer,
+                 creator_workers: int = 2, reviewer_workers: int = 2,
+                 queue_size: Optional[int] = None, research_stage=None,
+                 dedup: Optional[NearDuplicateDetector] = None):
+        """Initialize de pipeline.
+
+        Args:
+            content_creator: ContentCreator die de drafts schrijft
+            marketing_reviewer: MarketingReviewer die de drafts beoordeelt
+            creator_workers: Aantal gelijktijdige creator-workers
+            reviewer_workers: Aantal gelijktijdige reviewer-workers
+            queue_size: Maximale lengte van de review-queue (standaard 2x reviewer_workers)
+            research_stage: Optionele ResearchStage die vóór het schrijven marktcontext verzamelt
+            dedup: Optionele near-duplicate detector tussen de creator- en reviewer-stage
+        """
+        if creator_workers < 1 or reviewer_workers < 1:
+            raise ValueError("Elke stage heeft minimaal 1 worker nodig")
+        self.content_creator = content_creator
+        self.marketing_reviewer = marketing_reviewer
+        self.creator_workers = creator_workers
+        self.reviewer_workers = reviewer_workers
+        self.queue_size = queue_size or reviewer_workers * 2
+        self.research_stage = research_stage
+        self.dedup = dedup
+        self.stats = PipelineStats()
+        # Review-uitkomst per representant; volgt de LRU-volgorde en grens van de detector
+        self._reviews: "OrderedDict[int, asyncio.Future]" = OrderedDict()
+        self._reuse_tasks: Set[asyncio.Task] = set()
+
+    def _finish(self, item: Dict[str, Any], results: asyncio.Queue):
+        """Rond een item af: latency vastleggen en doorzetten naar de uitvoer."""
+        item["latency_seconds"] = round(time.monotonic() - item.pop("_started"), 3)
+        self.stats.record(item["latency_seconds"], item["status"] == "ok")
+        results.put_nowait(item)
+
+    async def _feed(self, campaigns: Iterable[Dict[str, Any]], create_queue: asyncio.Queue):
+        """Zet de campagnes in de create-queue."""
+        for index, campaign in enumerate(campaigns):
+            await create_queue.put({"index": index, "campaign": campaign,
+                                    "_started": time.monotonic()})
+        for _ in range(self.creator_workers):
+            await create_queue.put(_STOP)
+
+    async def _create_worker(self, create_queue: asyncio.Queue, review_queue: asyncio.Queue,
+                             results: asyncio.Queue):
+        """Creator-stage: schrijf drafts en zet ze door naar de review-queue."""
+        while True:
+            item = await create_queue.get()
+            if item is _STOP:
+                return
+
+            campaign = item["campaign"]
+            try:
+                missing = [field for field in REQUIRED_FIELDS if not campaign.get(field)]
+                if missing:
+                    raise ValueError(f"Ontbrekende velden: {', '.join(missing)}")
+
+                started = time.monotonic()
+                with tracer.span("pipeline.create", campaign_type=campaign["campaign_type"]):
+                    research_context = None
+                    if self.research_stage is not None:
+                        research = await self.research_stage.research(campaign["brand_info"],
+                                                                      campaign["prompt"])
+                        research_context = research["context"]
+                    item["draft"] = await self.content_creator.create_content(
+                        campaign["brand_info"], campaign["campaign_type"],
+                        campaign["target_audience"], campaign["prompt"],
+                        research_context=research_context
+                    )
+                self.stats.create_latencies.append(time.monotonic() - started)
+            except Exception as e:
+                item.update(status="error", stage="create", error=str(e))
+                self._finish(item, results)
+                continue
+
+            if self.dedup is not None:
+                context = "\n".join(campaign[field] for field in
+                                    ("brand_info", "campaign_type", "target_audience"))
+                representative = self.dedup.add(item["index"], item["draft"], context)
+                self.stats.dedup = self.dedup.stats()
+                review = self._reviews.get(representative) if representative is not None else None
+                if review is not None:
+                    # Zelfde LRU-update als in de detector, zodat beide dezelfde representanten bewaren
+                    self._reviews.move_to_end(representative)
+                    task = asyncio.ensure_future(self._reuse_review(item, representative, review, results))
+                    self._reuse_tasks.add(task)
+                    task.add_done_callback(self._reuse_tasks.discard)
+                    continue
+                # De future reist mee met het item, zodat de reviewer hem altijd afrondt,
+                # ook als de representant intussen uit _reviews verdwenen is
+                item["_review"] = asyncio.get_running_loop().create_future()
+                self._reviews[item["index"]] = item["_review"]
+                while len(self._reviews) > self.dedup.max_entries:
+                    self._reviews.popitem(last=False)
+
+            item["_queued"] = time.monotonic()
+            await review_queue.put(item)
+
+    async def _review(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Review de draft van een item met de MarketingReviewer."""
+        campaign = item["campaign"]
+        return await self.marketing_reviewer.review_content(
+            item["draft"], campaign["brand_info"],
+            campaign["campaign_type"], campaign["target_audience"]
+        )
+
+    async def _reuse_review(self, item: Dict[str, Any], representative: int,
+                            review: asyncio.Future, results: asyncio.Queue):
+        """Rond een duplicaat af met de review van zijn representant.
+
+        Mislukt de review van de representant, dan wordt het duplicaat alsnog zelf gereviewd.
+        """
+        campaign = item["campaign"]
+        try:
+            review_results = await asyncio.shield(review)
+        except Exception:
+            try:
+                review_results = await self._review(item)
+            except Exception as e:
+                item.pop("draft", None)
+                item.update(status="error", stage="review", error=str(e))
+                self._finish(item, results)
+                return
+            representative = None
+        item.update(status="ok", duplicate_of=representative, result=build_result(
+            item.pop("draft"), review_results, campaign["campaign_type"]
+        ))
+        self._finish(item, results)
+
+    async def _review_worker(self, review_queue: asyncio.Queue, results: asyncio.Queue):
+        """Reviewer-stage: beoordeel drafts uit de review-queue."""
+        while True:
+            item = await review_queue.get()
+            if item is _STOP:
+                return
+
+            campaign = item["campaign"]
+            started = time.monotonic()
+            queue_wait = started - item.pop("_queued")
+            self.stats.review_queue_waits.append(queue_wait)
+            review = item.pop("_review", None)
+            try:
+                with tracer.span("pipeline.review", campaign_type=campaign["campaign_type"],
+                                 queue_wait_seconds=round(queue_wait, 6)):
+                    review_results = await self._review(item)
+                self.stats.review_latencies.append(time.monotonic() - started)
+                if review is not None:
+                    review.set_result(review_results)
+                item.update(status="ok", result=build_result(
+                    item.pop("draft"), review_results, campaign["campaign_type"]
+                ))
+            except Exception as e:
+                if review is not None:
+                    review.set_exception(e)
+                    review.exception()  # Voorkom een "never retrieved" waarschuwing zonder duplicaten
+                item.pop("draft", None)
+                item.update(status="error", stage="review", error=str(e))
+            self._finish(item, results)
+
+    async def _run_stages(self, campaigns: Iterable[Dict[str, Any]], results: asyncio.Queue):
+        """Start alle stages en sluit de uitvoer af als alles verwerkt is."""
+        create_queue: asyncio.Queue = asyncio.Queue(maxsize=self.creator_workers * 2)
+        review_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        feeder = asyncio.ensure_future(self._feed(campaigns, create_queue))
+        creators = [asyncio.ensure_future(self._create_worker(create_queue, review_queue, results))
+                    for _ in range(self.creator_workers)]
+        reviewers = [asyncio.ensure_future(self._review_worker(review_queue, results))
+                     for _ in range(self.reviewer_workers)]
+        try:
+            await asyncio.gather(feeder, *creators)
+            for _ in range(self.reviewer_workers):
+                await review_queue.put(_STOP)
+            await asyncio.gather(*reviewers)
+            while self._reuse_tasks:
+                await asyncio.gather(*self._reuse_tasks)
+        finally:
+            for task in [feeder, *creators, *reviewers, *self._reuse_tasks]:
+                task.cancel()
+            results.put_nowait(_STOP)
+
+    async def run(self, campaigns: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Voer alle campagnes door de pipeline en geef resultaten terug zodra ze klaar zijn.
+
+        Args:
+            campaigns: Iterable met campagne-specificaties
+
+        Returns:
+            Async iterator met per campagne een dict met index, status, resultaat
+            (of fout) en latency, in dezelfde vorm als BatchRunner
+        """
+        self.stats = PipelineStats()
+        self._reviews.clear()
+        self._reuse_tasks = set()
+        results: asyncio.Queue = asyncio.Queue()
+        stages = asyncio.ensure_future(self._run_stages(campaigns, results))
+
+        try:
+            while True:
+                item = await results.get()
+                if item is _STOP:
+                    break
+                yield item
+            # Geef eventuele fouten in de stages zelf door aan de aanroeper
+            await stages
+        finally:
+            stages.cancel()
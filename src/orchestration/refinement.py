@@ -0,0 +1,180 @@
+# Iteratieve verfijning voor AutoGen Marketing Team
+
+import time
+from typing import Dict, List, Any, Optional
+
+from agents.llm_client import estimate_tokens
+
+# Redenen waarom de verfijning stopt
+STOP_SCORE = "score"
+STOP_PLATEAU = "plateau"
+STOP_TOKENS = "token_budget"
+STOP_DEADLINE = "deadline"
+STOP_ROUNDS = "max_rounds"
+
+
+class StoppingRule:
+    """Numerieke stopregel voor de create→review→revise loop.
+
+    Na elke ronde wordt gestopt zodra de score de drempel haalt, de score
+    minder dan min_improvement stijgt ten opzichte van de beste eerdere
+    ronde, het tokenbudget op is, of een volgende ronde (geschat op de duur
+    van de vorige) niet meer voor de deadline klaar zou zijn.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize de stopregel.
+
+        Args:
+            config: De "refinement" sectie: target_score, min_improvement,
+                max_rounds, token_budget en deadline_seconds (None = geen limiet)
+        """
+        self.target_score = config.get("target_score", 8)
+        self.min_improvement = config.get("min_improvement", 1)
+        self.max_rounds = max(1, config.get("max_rounds", 3))
+        self.token_budget = config.get("token_budget")
+        self.deadline_seconds = config.get("deadline_seconds")
+
+    def check(self, scores: List[float], tokens_used: int, elapsed_seconds: float,
+              last_round_seconds: float) -> Optional[str]:
+        """Bepaal of de loop na de laatste ronde moet stoppen.
+
+        Args:
+            scores: Score per ronde tot nu toe
+            tokens_used: Tokens van alle modelcalls tot nu toe
+            elapsed_seconds: Tijd sinds de start van de loop
+            last_round_seconds: Duur van de laatste ronde
+
+        Returns:
+            De stopreden, of None om nog een ronde te doen
+        """
+        if scores[-1] >= self.target_score:
+            return STOP_SCORE
+        if len(scores) > 1 and scores[-1] - max(scores[:-1]) < self.min_improvement:
+            return STOP_PLATEAU
+        if len(scores) >= self.max_rounds:
+            return STOP_ROUNDS
+        if self.token_budget is not None and tokens_used >= self.token_budget:
+            return STOP_TOKENS
+        if self.deadline_seconds is not None and elapsed_seconds + last_round_seconds > self.deadline_seconds:
+            return STOP_DEADLINE
+        return None
+
+
+class RevisionHistory:
+    """Samengevatte geschiedenis van de rondes, in plaats van het volledige transcript.
+
+    Per ronde blijven alleen de score en de (ingekorte) verbeterpunten
+    bewaard; de drafts zelf niet. De revisieprompt krijgt deze samenvatting
+    plus alleen de huidige beste versie, zodat de prompt per ronde niet groeit
+    met alle eerdere drafts en reviews.
+    """
+
+    def __init__(self, max_tokens: int = 300, recent_rounds: int = 2):
+        """Initialize de geschiedenis.
+
+        Args:
+            max_tokens: Maximale lengte van de samenvatting in (geschatte) tokens
+            recent_rounds: Aantal laatste rondes met verbeterpunten; oudere
+                rondes worden samengevat tot alleen hun score
+        """
+        self.max_tokens = max_tokens
+        self.recent_rounds = recent_rounds
+        self.rounds: List[Dict[str, Any]] = []
+        self.transcript_tokens = 0
+
+    def add(self, draft: str, review: Dict[str, Any]):
+        """Leg een ronde vast (de draft telt alleen mee voor de transcriptgrootte)."""
+        self.rounds.append({"score": review.get("score", 0), "improvements": review.get("improvements", "")})
+        self.transcript_tokens += estimate_tokens(draft) + estimate_tokens(review.get("review", ""))
+
+    def summary(self) -> str:
+        """Geef de geschiedenis als korte tekst, binnen max_tokens."""
+        lines = []
+        older = self.rounds[:-self.recent_rounds] if self.recent_rounds else self.rounds
+        if older:
+            scores = ", ".join(str(item["score"]) for item in older)
+            lines.append(f"Ronde 1-{len(older)}: scores {scores}")
+        recent = self.rounds[len(older):]
+        if recent:
+            # Verdeel het budget over de recente rondes; de laatste ronde staat achteraan
+            per_round = max(20, (self.max_tokens - estimate_tokens("\n".join(lines))) // len(recent))
+            for number, item in enumerate(recent, len(older) + 1):
+                improvements = " ".join(item["improvements"].split())
+                max_chars = per_round * 4
+                if len(improvements) > max_chars:
+                    improvements = improvements[:max_chars].rsplit(" ", 1)[0] + "..."
+                lines.append(f"Ronde {number}: score {item['score']}/10. Verbeterpunten: {improvements or '-'}")
+        return "\n".join(lines)
+
+
+class RefinementLoop:
+    """Voert create→review→revise uit tot de stopregel ingrijpt."""
+
+    def __init__(self, content_creator, marketing_reviewer, config: Dict[str, Any]):
+        """Initialize de loop.
+
+        Args:
+            content_creator: ContentCreator voor de eerste versie en de revisies
+            marketing_reviewer: MarketingReviewer die elke versie beoordeelt
+            config: De "refinement" sectie (zie StoppingRule), plus
+                history_tokens en recent_rounds voor de samenvatting
+        """
+        self.content_creator = content_creator
+        self.marketing_reviewer = marketing_reviewer
+        self.config = config
+        self.rule = StoppingRule(config)
+
+    async def run(self, prompt: str, campaign_type: str, brand_info: str, target_audience: str,
+                  research_context: Optional[str] = None, usage: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Verfijn een campagne.
+
+        Args:
+            prompt: Specifieke instructies voor de content
+            campaign_type: Type campagne
+            brand_info: Informatie over het merk
+            target_audience: Beschrijving van de doelgroep
+            research_context: Optionele marktcontext
+            usage: Tokentellers van de modelcalls (zie llm_client.usage_scope)
+
+        Returns:
+            Dict met de beste draft, de review daarvan, de rondes en de stopreden
+        """
+        history = RevisionHistory(self.config.get("history_tokens", 300), self.config.get("recent_rounds", 2))
+        started = time.monotonic()
+        rounds: List[Dict[str, Any]] = []
+        best: Optional[Dict[str, Any]] = None
+        stop_reason = None
+        while stop_reason is None:
+            round_started = time.monotonic()
+            if best is None:
+                draft = await self.content_creator.create_content(
+                    brand_info, campaign_type, target_audience, prompt, research_context=research_context
+                )
+            else:
+                # Reviseer de beste versie tot nu toe (de verbeterde versie van de reviewer als die er is)
+                current = best["review"].get("improved_content") or best["draft"]
+                draft = await self.content_creator.revise_content(
+                    brand_info, campaign_type, target_audience, prompt, current,
+                    best["review"].get("improvements", ""), history.summary()
+                )
+            review = await self.marketing_reviewer.review_content(draft, brand_info, campaign_type, target_audience)
+            history.add(draft, review)
+
+            round_seconds = time.monotonic() - round_started
+            tokens_used = sum(usage.values()) if usage else 0
+            rounds.append({"round": len(rounds) + 1, "score": review.get("score", 0),
+                           "seconds": round(round_seconds, 3), "tokens": tokens_used})
+            if best is None or review.get("score", 0) > best["review"].get("score", 0):
+                best = {"draft": draft, "review": review}
+            stop_reason = self.rule.check([item["score"] for item in rounds], tokens_used,
+                                          time.monotonic() - started, round_seconds)
+
+        return {
+            "draft": best["draft"],
+            "review": best["review"],
+            "rounds": rounds,
+            "stop_reason": stop_reason,
+            "history_tokens": estimate_tokens(history.summary()),
+            "transcript_tokens": history.transcript_tokens,
+        }
@@ -0,0 +1,179 @@
+# Team Registry voor AutoGen Marketing Team
+
+import os
+import asyncio
+import hashlib
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Callable, Optional, Set, Tuple
+
+# Fingerprint voor een configuratiepad dat (nog) niet bestaat
+DEFAULT_FINGERPRINT = "default"
+
+
+class TeamRegistry:
+    """Process-brede, thread-safe cache van teams per configuratiebestand.
+
+    Teams worden gecachet op de SHA-256 van de inhoud van het configuratiebestand,
+    zodat een gewijzigde config op disk automatisch een nieuw team oplevert en
+    paden met dezelfde inhoud één instantie delen. Om niet bij elke aanvraag het
+    bestand te hoeven hashen, wordt eerst goedkoop op mtime en grootte gecontroleerd.
+
+    Gebruikers die een team (langer) vasthouden doen dat met lease. Een team
+    dat niet meer uitgedeeld wordt, wordt gesloten zodra de laatste lease
+    afloopt, op de event loop van die laatste gebruiker. Zonder lopende
+    leases wordt het direct gesloten.
+    """
+
+    def __init__(self, factory: Callable[[str], Any]):
+        """Initialize de registry.
+
+        Args:
+            factory: Functie die een team bouwt op basis van een configuratiepad
+                (bijv. de MarketingTeam class)
+        """
+        self.factory = factory
+        self._teams: Dict[str, Any] = {}
+        self._fingerprints: Dict[str, Tuple[Optional[Tuple[int, int]], str]] = {}
+        # Aantal lopende leases per team (op id) en vervangen teams die op hun laatste lease wachten
+        self._leases: Dict[int, int] = {}
+        self._retired: Set[int] = set()
+        self._closing: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, path: str) -> str:
+        """Bepaal de content-hash van een configuratiebestand (lock moet gehouden worden)."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._fingerprints[path] = (None, DEFAULT_FINGERPRINT)
+            return DEFAULT_FINGERPRINT
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        known = self._fingerprints.get(path)
+        if known is not None and known[0] == signature:
+            return known[1]
+
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._fingerprints[path] = (signature, digest)
+        return digest
+
+    def get(self, config_path: str = "config/config.json") -> Any:
+        """Haal het gedeelde team voor een configuratiebestand op (of bouw het).
+
+        Args:
+            config_path: Pad naar het configuratiebestand
+
+        Returns:
+            De gedeelde teaminstantie
+        """
+        with self._lock:
+            team, dropped = self._get(config_path)
+        self._close(dropped)
+        return team
+
+    @asynccontextmanager
+    async def lease(self, config_path: str = "config/config.json") -> AsyncIterator[Any]:
+        """Gebruik het gedeelde team voor een configuratiebestand.
+
+        Zolang de lease loopt wordt het team niet gesloten, ook niet als de
+        config intussen wijzigt; de laatste lease van een vervangen team
+        sluit het op de eigen event loop.
+
+        Args:
+            config_path: Pad naar het configuratiebestand
+
+        Yields:
+            De gedeelde teaminstantie
+        """
+        with self._lock:
+            team, dropped = self._get(config_path)
+            self._leases[id(team)] = self._leases.get(id(team), 0) + 1
+        self._close(dropped)
+        try:
+            yield team
+        finally:
+            with self._lock:
+                remaining = self._leases.pop(id(team)) - 1
+                if remaining:
+                    self._leases[id(team)] = remaining
+                last = not remaining and id(team) in self._retired
+                if last:
+                    self._retired.discard(id(team))
+            if last:
+                await self._aclose(team)
+
+    def _get(self, config_path: str) -> Tuple[Any, Optional[Any]]:
+        """Haal het team op (lock moet gehouden worden).
+
+        Returns:
+            Het team en een vervangen team dat nu gesloten moet worden (of None)
+        """
+        path = os.path.abspath(config_path)
+        previous = self._fingerprints.get(path, (None, None))[1]
+        fingerprint = self._fingerprint(path)
+        team = self._teams.get(fingerprint)
+        if team is None:
+            team = self.factory(config_path)
+            self._teams[fingerprint] = team
+        dropped = None
+        if previous is not None and previous != fingerprint:
+            dropped = self._retire(self._drop_unused(previous))
+        return team, dropped
+
+    def _drop_unused(self, fingerprint: str) -> Optional[Any]:
+        """Verwijder een team waar geen enkel pad meer naar verwijst (lock moet gehouden worden).
+
+        Returns:
+            Het verwijderde team, of None als het nog in gebruik is
+        """
+        if all(known[1] != fingerprint for known in self._fingerprints.values()):
+            return self._teams.pop(fingerprint, None)
+        return None
+
+    def _retire(self, team: Optional[Any]) -> Optional[Any]:
+        """Markeer een verwijderd team voor sluiten (lock moet gehouden worden).
+
+        Returns:
+            Het team als het direct gesloten kan worden, None als het nog
+            geleased is (de laatste lease sluit het)
+        """
+        if team is None:
+            return None
+        if self._leases.get(id(team)):
+            self._retired.add(id(team))
+            return None
+        return team
+
+    def _close(self, team: Optional[Any]):
+        """Sluit een ongebruikt team: op de huidige event loop, of synchroon zonder loop."""
+        if team is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            close = getattr(team, "close", None)
+            if close is not None:
+                close()
+            return
+        task = loop.create_task(self._aclose(team))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _aclose(team: Any):
+        aclose = getattr(team, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        elif getattr(team, "close", None) is not None:
+            await asyncio.to_thread(team.close)
+
+    def clear(self):
+        """Verwijder alle gecachete teams (geleasede teams worden na hun laatste lease gesloten)."""
+        with self._lock:
+            teams = [self._retire(team) for team in self._teams.values()]
+            self._teams.clear()
+            self._fingerprints.clear()
+        for team in teams:
+            self._close(team)
@@ -0,0 +1,239 @@
+# Research stage voor AutoGen Marketing Team
+
+import time
+import asyncio
+from typing import Dict, List, Any, Optional, Set
+
+from agents.llm_client import estimate_tokens
+from tools.analysis.text import tokenize, STOPWORDS
+from tools.search_tools import SearchTools
+
+# Relatief gewicht per bron bij het rangschikken
+SOURCE_WEIGHTS = {"page": 1.2, "news": 1.1, "web": 1.0}
+SOURCE_LABELS = {"page": "Pagina", "news": "Nieuws", "web": "Web"}
+
+
+def build_query(brand_info: str, prompt: str, max_terms: int = 8) -> List[str]:
+    """Kies zoektermen uit het verzoek en de merkinformatie (verzoek eerst).
+
+    Args:
+        brand_info: Informatie over het merk
+        prompt: Specifieke instructies voor de content
+        max_terms: Maximaal aantal termen
+
+    Returns:
+        Unieke inhoudswoorden in volgorde van voorkomen
+    """
+    terms: List[str] = []
+    for word in tokenize(prompt) + tokenize(brand_info):
+        if len(word) > 2 and word not in STOPWORDS and word not in terms:
+            terms.append(word)
+            if len(terms) == max_terms:
+                break
+    return terms
+
+
+def _shingles(tokens: List[str]) -> Set[str]:
+    """Woordparen voor een goedkope gelijkenismaat tussen snippets."""
+    if len(tokens) < 2:
+        return set(tokens)
+    return {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def rank_snippets(snippets: List[Dict[str, Any]], terms: List[str],
+                  duplicate_threshold: float = 0.6) -> List[Dict[str, Any]]:
+    """Rangschik snippets op relevantie en verwijder (bijna-)duplicaten.
+
+    De score combineert de dekking van de zoektermen, het brongewicht en de
+    positie in de oorspronkelijke resultatenlijst. Een snippet met dezelfde
+    URL of met een Jaccard-overlap van woordparen boven de drempel ten
+    opzichte van een hoger gerangschikte snippet valt af.
+
+    Args:
+        snippets: Dicts met source, title, url, text en rank (positie bij de bron)
+        terms: Zoektermen
+        duplicate_threshold: Overlap waarboven een snippet als duplicaat geldt
+
+    Returns:
+        Gerangschikte, ontdubbelde snippets met een score
+    """
+    term_set = set(terms)
+    for snippet in snippets:
+        tokens = tokenize(f"{snippet['title']} {snippet['text']}")
+        coverage = len(term_set.intersection(tokens)) / len(term_set) if term_set else 0.0
+        position = 1.0 / (1 + snippet.get("rank", 0))
+        snippet["score"] = (0.7 * coverage + 0.3 * position) * SOURCE_WEIGHTS.get(snippet["source"], 1.0)
+        snippet["_shingles"] = _shingles(tokens)
+
+    kept: List[Dict[str, Any]] = []
+    seen_urls: Set[str] = set()
+    for snippet in sorted(snippets, key=lambda item: item["score"], reverse=True):
+        if not snippet["text"].strip():
+            continue
+        if snippet["url"] and snippet["url"] in seen_urls and snippet["source"] != "page":
+            continue
+        shingles = snippet["_shingles"]
+        duplicate = any(
+            len(shingles & other["_shingles"]) / (len(shingles | other["_shingles"]) or 1)
+            > duplicate_threshold
+            for other in kept
+        )
+        if duplicate:
+            continue
+        kept.append(snippet)
+        if snippet["url"]:
+            seen_urls.add(snippet["url"])
+
+    for snippet in kept:
+        del snippet["_shingles"]
+    return kept
+
+
+def compress_context(snippets: List[Dict[str, Any]], max_tokens: int,
+                     max_snippet_chars: int = 600) -> str:
+    """Bundel gerangschikte snippets tot een contextblok binnen het tokenbudget.
+
+    Args:
+        snippets: Gerangschikte snippets (zie rank_snippets)
+        max_tokens: Tokenbudget voor het hele blok
+        max_snippet_chars: Maximale lengte van één snippet
+
+    Returns:
+        Het contextblok (leeg als er niets past)
+    """
+    lines = []
+    used = 0
+    for snippet in snippets:
+        text = " ".join(snippet["text"].split())
+        if len(text) > max_snippet_chars:
+            text = text[:max_snippet_chars].rsplit(" ", 1)[0] + "..."
+        line = f"- [{SOURCE_LABELS.get(snippet['source'], snippet['source'])}] {snippet['title']}: {text}"
+        if snippet["url"]:
+            line += f" ({snippet['url']})"
+        tokens = estimate_tokens(line)
+        if used + tokens > max_tokens:
+            continue  # Een kortere snippet verderop past misschien nog wel
+        lines.append(line)
+        used += tokens
+    return "\n".join(lines)
+
+
+def research_summary(research: Dict[str, Any]) -> Dict[str, Any]:
+    """Compacte samenvatting van een research-uitkomst voor in het campagneresultaat."""
+    return {
+        "query": research["query"],
+        "sources": len(research["sources"]),
+        "context_tokens": estimate_tokens(research["context"]) if research["context"] else 0,
+        "timed_out": research["timed_out"],
+        "failed": research["failed"],
+        "elapsed_seconds": research["elapsed_seconds"],
+    }
+
+
+class ResearchStage:
+    """Verzamelt marktcontext voor de ContentCreator binnen een vast latencybudget.
+
+    Web search en news search starten tegelijk; zodra de web resultaten binnen
+    zijn worden de beste pagina's parallel opgehaald. Alles wat vóór de
+    deadline binnen is (ook tekst van half opgehaalde pagina's) wordt gebruikt;
+    trage bronnen worden afgebroken en in het resultaat vermeld.
+    """
+
+    def __init__(self, search_tools: SearchTools, config: Dict[str, Any]):
+        """Initialize de research stage.
+
+        Args:
+            search_tools: De gedeelde SearchTools
+            config: Settings: deadline_seconds, web_results, news_results,
+                fetch_pages, fetch_max_chars, max_context_tokens, max_terms
+        """
+        self.search_tools = search_tools
+        self.deadline_seconds = config.get("deadline_seconds", 6.0)
+        self.web_results = config.get("web_results", 5)
+        self.news_results = config.get("news_results", 5)
+        self.fetch_pages = config.get("fetch_pages", 2)
+        self.fetch_max_chars = config.get("fetch_max_chars", 3000)
+        self.max_context_tokens = config.get("max_context_tokens", 800)
+        self.max_terms = config.get("max_terms", 8)
+
+    async def _fetch_page(self, url: str, title: str, rank: int, terms: List[str],
+                          snippets: List[Dict[str, Any]]):
+        """Haal een pagina op; de tekst staat direct in snippets, ook als de fetch wordt afgebroken."""
+        snippet = {"source": "page", "title": title, "url": url, "text": "", "rank": rank}
+        snippets.append(snippet)
+        async for block in self.search_tools.web_fetch_stream(
+            url, max_chars=self.fetch_max_chars, keywords=terms
+        ):
+            snippet["text"] += (" " if snippet["text"] else "") + block
+
+    async def research(self, brand_info: str, prompt: str) -> Dict[str, Any]:
+        """Voer de research uit en bouw het contextblok.
+
+        Args:
+            brand_info: Informatie over het merk
+            prompt: Specifieke instructies voor de content
+
+        Returns:
+            Dict met context (tekst voor de prompt), sources, query,
+            timed_out (afgebroken bronnen), failed en elapsed_seconds
+        """
+        started = time.monotonic()
+        terms = build_query(brand_info, prompt, self.max_terms)
+        if not terms:
+            return {"context": "", "sources": [], "query": "", "timed_out": [], "failed": [],
+                    "elapsed_seconds": 0.0}
+        query = " ".join(terms)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+
+        snippets: List[Dict[str, Any]] = []
+        names: Dict[asyncio.Task, str] = {
+            asyncio.create_task(self.search_tools.google_search(query, self.web_results)): "web",
+            asyncio.create_task(self.search_tools.news_search(query, self.news_results)): "news",
+        }
+        pending = set(names)
+        failed = []
+
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = names[task]
+                if task.exception() is not None:
+                    failed.append(name)
+                    continue
+                if name in ("web", "news"):
+                    for rank, item in enumerate(task.result()):
+                        snippets.append({"source": name, "title": item.get("title", ""),
+                                         "url": item.get("url", ""), "text": item.get("snippet", ""),
+                                         "rank": rank})
+                if name == "web":
+                    for rank, item in enumerate(task.result()[:self.fetch_pages]):
+                        if not item.get("url"):
+                            continue
+                        fetch = asyncio.create_task(self._fetch_page(
+                            item["url"], item.get("title", ""), rank, terms, snippets
+                        ))
+                        names[fetch] = f"page:{item['url']}"
+                        pending.add(fetch)
+
+        timed_out = [names[task] for task in pending]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        ranked = rank_snippets(snippets, terms)
+        context = compress_context(ranked, self.max_context_tokens)
+        return {
+            "context": context,
+            "sources": [{"source": item["source"], "title": item["title"], "url": item["url"],
+                         "score": round(item["score"], 3)} for item in ranked],
+            "query": query,
+            "timed_out": timed_out,
+            "failed": failed,
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+        }
@@ -0,0 +1,27 @@
+# Resultaatopbouw voor AutoGen Marketing Team
+
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+
+def build_result(original_content: str, review_results: Dict[str, Any],
+                 campaign_type: str) -> Dict[str, Any]:
+    """Verzamel de uitkomst van één campagne in het standaard resultaatformaat.
+
+    Args:
+        original_content: De door de ContentCreator gegenereerde content
+        review_results: De uitkomst van MarketingReviewer.review_content
+        campaign_type: Type campagne
+
+    Returns:
+        Dict met originele content, beoordeling, score, verbeterde content en
+        een UTC-tijdstip in ISO 8601
+    """
+    return {
+        "original_content": original_content,
+        "review": review_results.get("review", ""),
+        "score": review_results.get("score", 0),
+        "improved_content": review_results.get("improved_content", ""),
+        "campaign_type": campaign_type,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
@@ -0,0 +1,201 @@
+# Modelroutering voor AutoGen Marketing Team
+
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+# Verwachte lengte van de content per campagnetype in tokens
+DEFAULT_OUTPUT_TOKENS = {
+    "Tweet": 80,
+    "Instagram Post": 200,
+    "LinkedIn Post": 350,
+    "Email Campaign": 600,
+    "Blog Post": 1500,
+}
+
+# Extra output van de reviewer bovenop de (verbeterde) content: score, sterke punten, uitleg
+REVIEW_OVERHEAD_TOKENS = 250
+
+DEFAULT_TIERS = [
+    {"name": "small", "model": "claude-3-5-haiku", "max_tokens": 1000,
+     "first_token_seconds": 0.6, "tokens_per_second": 120, "cost_per_1k_tokens": 0.004},
+    {"name": "large", "model": "claude-3-5-sonnet", "max_tokens": 2000,
+     "first_token_seconds": 1.2, "tokens_per_second": 60, "cost_per_1k_tokens": 0.015},
+]
+
+
+class ModelTier:
+    """Eén model waartussen de router kiest, met de schattingen voor latency en kosten."""
+
+    def __init__(self, index: int, config: Dict[str, Any]):
+        self.index = index
+        self.name = config.get("name", config["model"])
+        self.model = config["model"]
+        self.max_tokens = config.get("max_tokens", 2000)
+        self.first_token_seconds = config.get("first_token_seconds", 1.0)
+        self.tokens_per_second = config.get("tokens_per_second", 60)
+        self.cost_per_1k_tokens = config.get("cost_per_1k_tokens", 0.0)
+
+    def agent_config(self) -> Dict[str, Any]:
+        """Model settings die over de agentconfig heen gelegd worden."""
+        return {"model": self.model, "max_tokens": self.max_tokens}
+
+
+class ModelRouter:
+    """Kiest per campagne het model voor ContentCreator en MarketingReviewer.
+
+    Tiers staan van goedkoop/snel naar groot. Een campagne start op de
+    goedkoopste tier die de verwachte output aankan (of op de tier die voor
+    het campagnetype vastgezet is). Scoort de review onder de drempel, dan
+    wordt de campagne op de volgende tier opnieuw gemaakt, zolang dat binnen
+    het latency- en kostenbudget past. De latency-schatting per tier en
+    campagnetype gaat over op een voortschrijdend gemiddelde zodra er
+    metingen voor die combinatie zijn (een tweet zegt niets over een blogpost).
+
+    Configuratie voorbeeld::
+
+        {
+            "enabled": true,
+            "tiers": [
+                {"name": "small", "model": "claude-3-5-haiku", "max_tokens": 1000,
+                 "first_token_seconds": 0.6, "tokens_per_second": 120, "cost_per_1k_tokens": 0.004},
+                {"name": "large", "model": "claude-3-5-sonnet", "max_tokens": 2000,
+                 "first_token_seconds": 1.2, "tokens_per_second": 60, "cost_per_1k_tokens": 0.015}
+            ],
+            "output_tokens": {"Tweet": 80, "Blog Post": 1500},
+            "campaign_types": {"Email Campaign": "large"},
+            "escalate_below_score": 7,
+            "max_escalations": 1,
+            "latency_budget_seconds": 20,
+            "cost_budget": 0.05,
+            "review_tier": null
+        }
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize de router.
+
+        Args:
+            config: De "routing" sectie: tiers, output_tokens, default_output_tokens,
+                prompt_tokens, campaign_types, escalate_below_score, max_escalations,
+                latency_budget_seconds, cost_budget, budgets (per campagnetype),
+                review_tier (None = zelfde tier als de creator) en smoothing
+        """
+        self.tiers = [ModelTier(i, tier) for i, tier in enumerate(config.get("tiers", DEFAULT_TIERS))]
+        if not self.tiers:
+            raise ValueError("routing.tiers mag niet leeg zijn")
+        self._by_name = {tier.name: tier for tier in self.tiers}
+        self.output_tokens = {**DEFAULT_OUTPUT_TOKENS, **config.get("output_tokens", {})}
+        self.default_output_tokens = config.get("default_output_tokens", 500)
+        self.prompt_tokens = config.get("prompt_tokens", 800)
+        self.pinned = config.get("campaign_types", {})
+        self.escalate_below_score = config.get("escalate_below_score", 7)
+        self.max_escalations = config.get("max_escalations", 1)
+        self.latency_budget = config.get("latency_budget_seconds")
+        self.cost_budget = config.get("cost_budget")
+        self.budgets = config.get("budgets", {})
+        review_tier = config.get("review_tier")
+        self.review_tier = self.tier(review_tier) if review_tier else None
+        self.smoothing = config.get("smoothing", 0.2)
+        self._observed: Dict[Tuple[str, str], float] = {}
+        self._counts: Dict[str, Dict[str, int]] = {tier.name: {"routed": 0, "escalated": 0} for tier in self.tiers}
+        self._lock = threading.Lock()
+
+    def tier(self, name: str) -> ModelTier:
+        if name not in self._by_name:
+            raise ValueError(f"Onbekende tier: {name}")
+        return self._by_name[name]
+
+    def expected_output_tokens(self, campaign_type: str) -> int:
+        return self.output_tokens.get(campaign_type, self.default_output_tokens)
+
+    def _budget(self, campaign_type: str, key: str, default: Optional[float]) -> Optional[float]:
+        return self.budgets.get(campaign_type, {}).get(key, default)
+
+    def estimate_seconds(self, tier: ModelTier, campaign_type: str) -> float:
+        """Verwachte duur van schrijven plus review op een tier."""
+        with self._lock:
+            observed = self._observed.get((tier.name, campaign_type))
+        if observed is not None:
+            return observed
+        output = self.expected_output_tokens(campaign_type)
+        reviewer = self.review_tier or tier
+        return (tier.first_token_seconds + output / tier.tokens_per_second
+                + reviewer.first_token_seconds + (output + REVIEW_OVERHEAD_TOKENS) / reviewer.tokens_per_second)
+
+    def estimate_cost(self, tier: ModelTier, campaign_type: str) -> float:
+        """Verwachte kosten van schrijven plus review op een tier."""
+        output = self.expected_output_tokens(campaign_type)
+        reviewer = self.review_tier or tier
+        create = (self.prompt_tokens + output) * tier.cost_per_1k_tokens
+        review = (self.prompt_tokens + 2 * output + REVIEW_OVERHEAD_TOKENS) * reviewer.cost_per_1k_tokens
+        return (create + review) / 1000
+
+    def select(self, campaign_type: str) -> ModelTier:
+        """Kies de starttier voor een campagne.
+
+        Returns:
+            De goedkoopste tier die de verwachte output aankan en minstens de
+            vastgezette tier van het campagnetype is (anders de grootste tier)
+        """
+        minimum = self.tier(self.pinned[campaign_type]).index if campaign_type in self.pinned else 0
+        output = self.expected_output_tokens(campaign_type)
+        chosen = next((tier for tier in self.tiers[minimum:] if tier.max_tokens >= output), self.tiers[-1])
+        with self._lock:
+            self._counts[chosen.name]["routed"] += 1
+        return chosen
+
+    def reviewer_tier(self, tier: ModelTier) -> ModelTier:
+        """De tier van de reviewer bij een creator-tier."""
+        return self.review_tier or tier
+
+    def escalate(self, tier: ModelTier, score: int, campaign_type: str, escalations: int,
+                 elapsed_seconds: float, spent: float) -> Optional[ModelTier]:
+        """Bepaal of een campagne op een grotere tier opnieuw gemaakt moet worden.
+
+        Args:
+            tier: De tier van de laatste poging
+            score: Score van de review van die poging
+            campaign_type: Type campagne
+            escalations: Aantal eerdere escalaties voor deze campagne
+            elapsed_seconds: Tijd die de campagne al gekost heeft
+            spent: Geschatte kosten tot nu toe
+
+        Returns:
+            De volgende tier, of None als de score volstaat of het budget op is
+        """
+        if score >= self.escalate_below_score or escalations >= self.max_escalations:
+            return None
+        if tier.index + 1 >= len(self.tiers):
+            return None
+        candidate = self.tiers[tier.index + 1]
+        latency_budget = self._budget(campaign_type, "latency_seconds", self.latency_budget)
+        if latency_budget is not None and elapsed_seconds + self.estimate_seconds(candidate, campaign_type) > latency_budget:
+            return None
+        cost_budget = self._budget(campaign_type, "cost", self.cost_budget)
+        if cost_budget is not None and spent + self.estimate_cost(candidate, campaign_type) > cost_budget:
+            return None
+        with self._lock:
+            self._counts[candidate.name]["escalated"] += 1
+        return candidate
+
+    def observe(self, tier: ModelTier, campaign_type: str, seconds: float):
+        """Verwerk de gemeten duur van een poging in de latency-schatting van tier en campagnetype."""
+        key = (tier.name, campaign_type)
+        with self._lock:
+            previous = self._observed.get(key)
+            self._observed[key] = (seconds if previous is None
+                                   else previous + self.smoothing * (seconds - previous))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Geef per tier het model, aantal routeringen en escalaties en de gemeten duur per campagnetype."""
+        with self._lock:
+            return {
+                tier.name: {
+                    "model": tier.model,
+                    **self._counts[tier.name],
+                    "observed_seconds": {campaign_type: round(seconds, 3)
+                                         for (name, campaign_type), seconds in self._observed.items()
+                                         if name == tier.name},
+                }
+                for tier in self.tiers
+            }
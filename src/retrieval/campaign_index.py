@@ -0,0 +1,406 @@
+# Retrieval-index over eerdere campagnes voor few-shot context
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+from collections import Counter
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: geen lock tussen processen
+    fcntl = None
+
+from tools.analysis.text import tokenize, STOPWORDS
+from tools.analysis.keywords import term_hash
+from retrieval.embedders import create_embedder
+
+INDEX_VERSION = 1
+# Aantal keyword-hashes dat per campagne bewaard wordt voor de hybride score
+TERMS_PER_ENTRY = 16
+# Tot dit aantal entries is een exacte scan sneller dan LSH
+BRUTE_FORCE_LIMIT = 4096
+
+
+def entry_text(campaign_type: str, target_audience: str, prompt: str, content: str = "") -> str:
+    """Tekst die voor een campagne (of zoekvraag) geëmbed wordt."""
+    return "\n".join(part for part in (campaign_type, target_audience, prompt, content) if part)
+
+
+def _top_terms(text: str, limit: int) -> List[int]:
+    """Hashes van de meest voorkomende inhoudswoorden."""
+    counts = Counter(word for word in tokenize(text) if len(word) > 2 and word not in STOPWORDS)
+    return [term_hash(word) for word, _ in counts.most_common(limit)]
+
+
+class CampaignIndex:
+    """Hybride vector/keyword-index over goed beoordeelde campagnes.
+
+    Vectoren, LSH-signaturen, keyword-hashes en scores staan in memory-mapped
+    NumPy-bestanden; de campagnes zelf in een append-only JSONL-bestand dat
+    alleen voor de uiteindelijke top-k gelezen wordt. Zoeken gebruikt
+    random-hyperplane LSH (meerdere tabellen met multi-probe) om kandidaten te
+    vinden en rangschikt die op cosine similarity plus keyword-overlap.
+
+    Nieuwe campagnes worden direct toegevoegd: ze komen in een kleine
+    delta-structuur die periodiek in de gesorteerde LSH-tabellen wordt
+    samengevoegd, zonder de index opnieuw te bouwen. Meerdere processen
+    (workers) kunnen dezelfde index delen: toevoegen gebeurt onder een
+    file lock en elk proces neemt rijen van de anderen over zodra de
+    header verandert.
+    """
+
+    def __init__(self, path: str, config: Optional[Dict[str, Any]] = None):
+        """Open of maak een index.
+
+        Args:
+            path: Directory van de index
+            config: Settings: embedder ({"type": ..., ...}), tables, bits, seed,
+                alpha (gewicht van de vector-score), probe (multi-probe aan/uit),
+                max_candidates (kandidaten die exact gescoord worden)
+
+        Raises:
+            ValueError: Als de bestaande index met een andere embedder gebouwd is
+        """
+        config = config or {}
+        self.path = path
+        self.embedder = create_embedder(config.get("embedder", {}))
+        self.alpha = config.get("alpha", 0.8)
+        self.probe = config.get("probe", True)
+        self.max_candidates = config.get("max_candidates", 512)
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        header_path = os.path.join(path, "index.json")
+        embedder_id = f"{getattr(self.embedder, 'name', type(self.embedder).__name__)}:{self.embedder.dim}"
+        if os.path.exists(header_path):
+            with open(header_path, "r") as f:
+                self.header = json.load(f)
+            if self.header["embedder"] != embedder_id:
+                raise ValueError(f"Index in {path} is gebouwd met embedder {self.header['embedder']}, "
+                                 f"niet {embedder_id}")
+        else:
+            self.header = {
+                "version": INDEX_VERSION,
+                "embedder": embedder_id,
+                "dim": self.embedder.dim,
+                "count": 0,
+                "capacity": 0,
+                "tables": config.get("tables", 8),
+                "bits": config.get("bits", 12),
+                "seed": config.get("seed", 1234),
+            }
+
+        self.dim = self.header["dim"]
+        self.tables = self.header["tables"]
+        self.bits = self.header["bits"]
+        rng = np.random.default_rng(self.header["seed"])
+        self._projection = rng.standard_normal((self.dim, self.tables * self.bits)).astype(np.float32)
+        self._bit_values = (1 << np.arange(self.bits, dtype=np.uint32)).astype(np.uint32)
+
+        self._meta_path = os.path.join(path, "meta.jsonl")
+        self._lock_path = os.path.join(path, "index.lock")
+        self._header_mtime = self._header_stamp()
+        self._open_arrays(max(self.header["capacity"], 1024))
+        self._build_tables()
+
+    # -- opslag --------------------------------------------------------------
+
+    def _array(self, name: str, dtype, shape) -> np.memmap:
+        """Open (of vergroot) een memory-mapped array op disk."""
+        file_path = os.path.join(self.path, name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(file_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(file_path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open_arrays(self, capacity: int):
+        """Open alle arrays met de gegeven capaciteit."""
+        self.header["capacity"] = capacity
+        self._vectors = self._array("vectors.f32", np.float32, (capacity, self.dim))
+        self._signatures = self._array("signatures.u32", np.uint32, (capacity, self.tables))
+        self._terms = self._array("terms.u64", np.uint64, (capacity, TERMS_PER_ENTRY))
+        self._scores = self._array("scores.f32", np.float32, (capacity,))
+        self._offsets = self._array("offsets.u64", np.uint64, (capacity,))
+
+    def _ensure_capacity(self, needed: int):
+        """Verdubbel de capaciteit van de arrays als er te weinig ruimte is."""
+        capacity = self.header["capacity"]
+        if needed <= capacity:
+            return
+        for array in (self._vectors, self._signatures, self._terms, self._scores, self._offsets):
+            array.flush()
+        self._open_arrays(max(capacity * 2, needed))
+
+    def _write_header(self):
+        """Schrijf de header atomair weg."""
+        header_path = os.path.join(self.path, "index.json")
+        tmp_path = f"{header_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.header, f)
+        os.replace(tmp_path, header_path)
+        self._header_mtime = self._header_stamp()
+
+    def _header_stamp(self) -> Optional[tuple]:
+        """Inode en wijzigingstijd van de header (None als die nog niet bestaat).
+
+        De header wordt altijd vervangen, dus elke versie heeft een eigen inode.
+        """
+        try:
+            stat = os.stat(os.path.join(self.path, "index.json"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusieve lock op de index tussen processen."""
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, force: bool = False):
+        """Neem rijen over die een ander proces heeft toegevoegd (onder self._lock).
+
+        Rijen staan op disk voordat de header ze telt, dus alles tot de
+        count in de header is compleet.
+
+        Args:
+            force: Lees de header ook als de stempel niet veranderd lijkt
+                (onder de file lock, waar niemand anders schrijft)
+        """
+        stamp = self._header_stamp()
+        if stamp is None or (stamp == self._header_mtime and not force):
+            return
+        self._header_mtime = stamp
+        with open(os.path.join(self.path, "index.json"), "r") as f:
+            header = json.load(f)
+        start, end = self.header["count"], header["count"]
+        if end <= start:
+            return
+        if header["capacity"] > self.header["capacity"]:
+            self._ensure_capacity(header["capacity"])
+        self.header["count"] = end
+        self._index_rows(start, np.asarray(self._signatures[start:end]))
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    # -- LSH -----------------------------------------------------------------
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        """LSH-codes (één uint32 per tabel) voor genormaliseerde vectoren."""
+        bits = (vectors @ self._projection > 0).reshape(len(vectors), self.tables, self.bits)
+        return (bits.astype(np.uint32) * self._bit_values).sum(axis=2, dtype=np.uint32)
+
+    def _build_tables(self):
+        """Sorteer de signaturen van alle tabellen voor opzoeken met binary search.
+
+        Elke sleutel is (tabel << 32) | code, zodat alle tabellen in één
+        gesorteerde array staan en alle probes in één searchsorted gaan.
+        """
+        count = self.header["count"]
+        keys = (np.arange(self.tables, dtype=np.uint64) << np.uint64(32)) \
+            + np.asarray(self._signatures[:count]).astype(np.uint64)
+        order = np.argsort(keys.T.ravel(), kind="stable")
+        self._sorted_keys = keys.T.ravel()[order]
+        self._sorted_ids = (order % max(count, 1)).astype(np.int64)
+        self._built = count
+        self._delta: Dict[int, List[int]] = {}
+
+    def _keys(self, codes: np.ndarray) -> np.ndarray:
+        """Tabel-sleutels voor de LSH-codes van één vector (rij = tabel)."""
+        return (np.arange(self.tables, dtype=np.uint64) << np.uint64(32)) + codes.astype(np.uint64)
+
+    def _candidates(self, query_codes: np.ndarray) -> np.ndarray:
+        """Verzamel kandidaat-ids uit alle tabellen (met multi-probe).
+
+        Kandidaten die in meer tabellen (en in de exacte bucket in plaats van
+        een naburige) botsen lijken meer op de zoekvraag; alleen de beste
+        max_candidates gaan door naar de exacte scoring.
+        """
+        if self.probe:
+            codes = np.concatenate((query_codes[:, None],
+                                    query_codes[:, None] ^ self._bit_values[None, :]), axis=1)
+        else:
+            codes = query_codes[:, None]
+        probe_keys = (self._keys(np.zeros(self.tables, dtype=np.uint32))[:, None]
+                      + codes.astype(np.uint64)).ravel()
+        probe_weights = np.tile(np.r_[2, np.ones(codes.shape[1] - 1)], self.tables)
+
+        starts = np.searchsorted(self._sorted_keys, probe_keys, side="left")
+        lengths = np.searchsorted(self._sorted_keys, probe_keys, side="right") - starts
+        total = int(lengths.sum())
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        ids = self._sorted_ids[positions]
+        weights = np.repeat(probe_weights, lengths)
+
+        if self._delta:
+            extra_ids, extra_weights = [], []
+            for key, weight in zip(probe_keys.tolist(), probe_weights.tolist()):
+                for row in self._delta.get(key, ()):
+                    extra_ids.append(row)
+                    extra_weights.append(weight)
+            if extra_ids:
+                ids = np.concatenate((ids, np.asarray(extra_ids, dtype=np.int64)))
+                weights = np.concatenate((weights, np.asarray(extra_weights)))
+
+        if len(ids) <= self.max_candidates:
+            return np.unique(ids)
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        if len(unique_ids) <= self.max_candidates:
+            return unique_ids
+        votes = np.bincount(inverse, weights=weights)
+        return unique_ids[np.argpartition(-votes, self.max_candidates - 1)[:self.max_candidates]]
+
+    # -- toevoegen -----------------------------------------------------------
+
+    def add(self, content: str, score: float, campaign_type: str = "", target_audience: str = "",
+            prompt: str = "", brand_info: str = ""):
+        """Voeg één campagne toe (zie add_many)."""
+        self.add_many([{"content": content, "score": score, "campaign_type": campaign_type,
+                        "target_audience": target_audience, "prompt": prompt,
+                        "brand_info": brand_info}])
+
+    def add_many(self, items: Iterable[Dict[str, Any]], batch_size: int = 256) -> int:
+        """Voeg campagnes toe zonder de index opnieuw te bouwen.
+
+        Args:
+            items: Dicts met content, score en optioneel campaign_type,
+                target_audience, prompt en brand_info
+            batch_size: Aantal campagnes dat per keer geëmbed wordt
+
+        Returns:
+            Aantal toegevoegde campagnes
+        """
+        added = 0
+        batch: List[Dict[str, Any]] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == batch_size:
+                added += self._add_batch(batch)
+                batch = []
+        if batch:
+            added += self._add_batch(batch)
+        return added
+
+    def _add_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Embed en schrijf een batch campagnes weg."""
+        texts = [entry_text(item.get("campaign_type", ""), item.get("target_audience", ""),
+                            item.get("prompt", ""), item["content"]) for item in batch]
+        vectors = self.embedder.embed(texts).astype(np.float32)
+        codes = self._codes(vectors)
+
+        with self._lock, self._file_lock():
+            self._refresh(force=True)
+            start = self.header["count"]
+            self._ensure_capacity(start + len(batch))
+            with open(self._meta_path, "ab") as meta:
+                for offset, item in enumerate(batch):
+                    row = start + offset
+                    self._offsets[row] = meta.tell()
+                    meta.write(json.dumps({
+                        "content": item["content"],
+                        "score": item.get("score", 0),
+                        "campaign_type": item.get("campaign_type", ""),
+                        "target_audience": item.get("target_audience", ""),
+                        "prompt": item.get("prompt", ""),
+                        "brand_info": item.get("brand_info", ""),
+                    }, ensure_ascii=False).encode("utf-8") + b"\n")
+                    terms = _top_terms(texts[offset], TERMS_PER_ENTRY)
+                    self._terms[row] = 0
+                    self._terms[row, :len(terms)] = np.asarray(terms, dtype=np.uint64)
+                    self._scores[row] = item.get("score", 0)
+
+            end = start + len(batch)
+            self._vectors[start:end] = vectors
+            self._signatures[start:end] = codes
+            for array in (self._vectors, self._signatures, self._terms, self._scores, self._offsets):
+                array.flush()
+            self.header["count"] = end
+            self._write_header()
+            self._index_rows(start, codes)
+        return len(batch)
+
+    def _index_rows(self, start: int, codes: np.ndarray):
+        """Zet nieuwe rijen in de delta-structuur (onder self._lock)."""
+        for offset in range(len(codes)):
+            for key in self._keys(codes[offset]).tolist():
+                self._delta.setdefault(key, []).append(start + offset)
+        # Delta samenvoegen zodra die groot wordt ten opzichte van de gesorteerde tabellen
+        if start + len(codes) - self._built > max(1024, self._built // 10):
+            self._build_tables()
+
+    # -- zoeken --------------------------------------------------------------
+
+    def _read_meta(self, rows: List[int]) -> List[Dict[str, Any]]:
+        """Lees de campagnes van een aantal rijen uit het JSONL-bestand."""
+        entries = []
+        with open(self._meta_path, "rb") as meta:
+            for row in rows:
+                meta.seek(int(self._offsets[row]))
+                entries.append(json.loads(meta.readline()))
+        return entries
+
+    def search(self, text: str, k: int = 3, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Zoek de campagnes die het meest lijken op een zoekvraag.
+
+        Args:
+            text: Zoekvraag, bijv. entry_text(kanaal, doelgroep, verzoek)
+            k: Aantal resultaten
+            min_score: Minimale reviewer-score van een resultaat
+
+        Returns:
+            Campagnes (content, score, campaign_type, ...) met similarity, beste eerst
+        """
+        if k <= 0:
+            return []
+        query = self.embedder.embed([text]).astype(np.float32)
+        query_terms = np.asarray(_top_terms(text, 32), dtype=np.uint64)
+
+        with self._lock:
+            self._refresh()
+            count = self.header["count"]
+            if not count:
+                return []
+            if count <= BRUTE_FORCE_LIMIT:
+                candidates = np.arange(count)
+            else:
+                candidates = self._candidates(self._codes(query)[0])
+                if len(candidates) < k:
+                    candidates = np.arange(count)
+            if min_score:
+                candidates = candidates[self._scores[candidates] >= min_score]
+            if not len(candidates):
+                return []
+
+            similarity = np.asarray(self._vectors[candidates]) @ query[0]
+            if len(query_terms):
+                overlap = np.isin(np.asarray(self._terms[candidates]), query_terms).sum(axis=1)
+                similarity = self.alpha * similarity + (1 - self.alpha) * overlap / len(query_terms)
+
+            top = min(k, len(candidates))
+            best = np.argpartition(-similarity, top - 1)[:top]
+            best = best[np.argsort(-similarity[best])]
+            results = self._read_meta([int(candidates[position]) for position in best])
+            for entry, position in zip(results, best):
+                entry["similarity"] = round(float(similarity[position]), 4)
+            return results
+
+    def close(self):
+        """Schrijf alles weg en sluit de arrays."""
+        with self._lock, self._file_lock():
+            for array in (self._vectors, self._signatures, self._terms, self._scores, self._offsets):
+                array.flush()
+            # Een ander proces kan intussen rijen hebben toegevoegd; die telling niet terugdraaien
+            self._refresh(force=True)
+            self._write_header()
@@ -0,0 +1,79 @@
+# Embedders voor de campagne-index
+
+import hashlib
+import importlib
+from typing import Dict, List, Any
+
+import numpy as np
+
+from tools.analysis.text import tokenize, STOPWORDS
+
+
+class HashingEmbedder:
+    """Lokale embedder op basis van feature hashing van woorden en woordparen.
+
+    Geen model of netwerk nodig: elke term wordt met een stabiele hash op een
+    dimensie met een teken (+/-) gezet, log-gewogen en L2-genormaliseerd. Goed
+    genoeg om campagnes met overlappend onderwerp en vocabulaire te vinden;
+    voor semantische gelijkenis kan een andere embedder ingeplugd worden.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 256):
+        """Initialize de embedder.
+
+        Args:
+            dim: Aantal dimensies van de vectoren
+        """
+        self.dim = dim
+
+    def _features(self, text: str) -> Dict[int, float]:
+        """Tel gehashte unigrams en bigrams (zonder stopwoorden)."""
+        words = [word for word in tokenize(text) if word not in STOPWORDS]
+        terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        features: Dict[int, float] = {}
+        for term in terms:
+            digest = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+            index = digest % self.dim
+            sign = 1.0 if (digest >> 63) & 1 else -1.0
+            features[index] = features.get(index, 0.0) + sign
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed teksten.
+
+        Args:
+            texts: De teksten
+
+        Returns:
+            float32 matrix (len(texts), dim) met L2-genormaliseerde rijen
+        """
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, count in self._features(text).items():
+                matrix[row, index] = np.sign(count) * np.log1p(abs(count))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+def create_embedder(config: Dict[str, Any]):
+    """Maak de embedder uit de configuratie.
+
+    Args:
+        config: {"type": "hashing", "dim": N} of {"type": "module:Klasse", ...};
+            een eigen embedder heeft een attribuut `dim` en een methode
+            `embed(texts) -> np.ndarray` met genormaliseerde rijen
+
+    Returns:
+        De embedder
+    """
+    embedder_type = config.get("type", "hashing")
+    options = {key: value for key, value in config.items() if key != "type"}
+    if embedder_type == "hashing":
+        return HashingEmbedder(**options)
+    module_name, _, class_name = embedder_type.partition(":")
+    if not class_name:
+        raise ValueError(f"Onbekend embedder type: {embedder_type}")
+    return getattr(importlib.import_module(module_name), class_name)(**options)
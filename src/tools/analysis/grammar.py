@@ -0,0 +1,190 @@
+# Regelgebaseerde grammatica- en stijlcontrole (Nederlands/Engels)
+
+import re
+import bisect
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from tools.analysis.text import SENTENCE_RE, tokenize, detect_language
+
+# Zinnen met meer woorden dan dit worden als te lang gemarkeerd
+MAX_SENTENCE_WORDS = 35
+# Scheidingsteken tussen teksten in een batch; geen enkele regel matcht eroverheen
+BATCH_SEPARATOR = "\n\n\x00\n\n"
+
+
+class GrammarRule:
+    """Eén controle: een gecompileerde regex plus een functie die de suggestie maakt."""
+
+    def __init__(self, name: str, rule_type: str, pattern: str,
+                 suggest: Callable[["re.Match"], str], languages: Tuple[str, ...] = ("nl", "en"),
+                 flags: int = 0):
+        """Initialize de regel.
+
+        Args:
+            name: Naam van de regel
+            rule_type: Soort fout (grammar, spelling, punctuation, style)
+            pattern: Regex die een fout matcht
+            suggest: Functie die van een match de verbeterde tekst maakt
+            languages: Talen waarvoor de regel geldt
+            flags: Regex flags
+        """
+        self.name = name
+        self.rule_type = rule_type
+        self.regex = re.compile(pattern, flags)
+        self.suggest = suggest
+        self.languages = languages
+
+
+def _keep_case(original: str, replacement: str) -> str:
+    """Neem de hoofdletter van het origineel over in de vervanging."""
+    return replacement[:1].upper() + replacement[1:] if original[:1].isupper() else replacement
+
+
+RULES = [
+    GrammarRule("herhaald_woord", "grammar", r"\b(\w+)\s+\1\b",
+                lambda m: m.group(1), flags=re.IGNORECASE),
+    GrammarRule("dubbele_spatie", "punctuation", r"(?<=\S) {2,}(?=\S)", lambda m: " "),
+    GrammarRule("spatie_voor_leesteken", "punctuation", r"\s+([,.;:!?])(?!\S*\d)",
+                lambda m: m.group(1)),
+    GrammarRule("geen_spatie_na_leesteken", "punctuation", r"([,;:])(?=[^\W\d_])",
+                lambda m: m.group(1) + " "),
+    GrammarRule("meerdere_uitroeptekens", "style", r"([!?])\1{1,}", lambda m: m.group(1)),
+    # Nederlandse d/t-fouten bij veelvoorkomende werkwoorden
+    GrammarRule("dt_ik", "spelling", r"\b(ik)\s+(wordt|vindt|houdt|zendt|biedt|bindt)\b",
+                lambda m: f"{m.group(1)} {m.group(2)[:-1]}", ("nl",), re.IGNORECASE),
+    GrammarRule("dt_hij", "spelling", r"\b(hij|zij|ze|het|dit|dat|er)\s+(word|vind|houd|bied|bind)\b",
+                lambda m: f"{m.group(1)} {m.group(2)}t", ("nl",), re.IGNORECASE),
+    GrammarRule("dt_inversie_jij", "spelling", r"\b(wordt|vindt|houdt|biedt)\s+(jij|je)\b",
+                lambda m: f"{m.group(1)[:-1]} {m.group(2)}", ("nl",), re.IGNORECASE),
+    GrammarRule("hun_als_onderwerp", "grammar", r"\b(hun)\s+(hebben|zijn|willen|kunnen|gaan|doen)\b",
+                lambda m: f"{_keep_case(m.group(1), 'zij')} {m.group(2)}", ("nl",), re.IGNORECASE),
+    GrammarRule("groter_als", "grammar", r"\b(groter|kleiner|beter|meer|minder|sneller)\s+als\b",
+                lambda m: f"{m.group(1)} dan", ("nl",), re.IGNORECASE),
+    # Engelse lidwoorden en veelvoorkomende verwarringen
+    GrammarRule("a_an", "grammar", r"\b([Aa])\s+([aeiouAEIOU]\w+)",
+                lambda m: f"{m.group(1)}n {m.group(2)}", ("en",)),
+    GrammarRule("an_a", "grammar", r"\b([Aa]n)\s+([b-df-hj-np-tv-zB-DF-HJ-NP-TV-Z]\w+)",
+                lambda m: f"{m.group(1)[0]} {m.group(2)}", ("en",)),
+    GrammarRule("its_its", "spelling", r"\b([Ii]ts)\s+(a|an|the|not|been|going)\b",
+                lambda m: f"{m.group(1)[0]}t's {m.group(2)}", ("en",)),
+    GrammarRule("could_of", "grammar", r"\b(could|would|should|must)\s+of\b",
+                lambda m: f"{m.group(1)} have", ("en",), re.IGNORECASE),
+]
+
+
+class GrammarChecker:
+    """Regelgebaseerde grammatica- en stijlcontrole zonder netwerk of model."""
+
+    def __init__(self, language: str = "auto", rules: Optional[List[GrammarRule]] = None,
+                 max_sentence_words: int = MAX_SENTENCE_WORDS):
+        """Initialize de checker.
+
+        Args:
+            language: "nl", "en" of "auto" (detecteer per tekst)
+            rules: Te gebruiken regels (standaard RULES)
+            max_sentence_words: Zinslengte waarboven een stijlsuggestie volgt
+        """
+        self.language = language
+        self.rules = rules if rules is not None else RULES
+        self.max_sentence_words = max_sentence_words
+
+    def _language(self, text: str) -> str:
+        """Bepaal de taal van een tekst."""
+        return self.language if self.language != "auto" else detect_language(tokenize(text))
+
+    def _find(self, text: str, language: str) -> List[Dict[str, Any]]:
+        """Pas alle regels toe op een tekst (of een samengevoegde batch)."""
+        suggestions = []
+        for rule in self.rules:
+            if language not in rule.languages:
+                continue
+            for match in rule.regex.finditer(text):
+                suggestions.append({
+                    "original": match.group(0),
+                    "suggestion": rule.suggest(match),
+                    "type": rule.rule_type,
+                    "rule": rule.name,
+                    "offset": match.start(),
+                })
+
+        for match in SENTENCE_RE.finditer(text):
+            sentence = match.group(0).strip()
+            if sentence and sentence[0].islower() and sentence[0].isalpha():
+                suggestions.append({
+                    "original": sentence[:20],
+                    "suggestion": sentence[0].upper() + sentence[1:20],
+                    "type": "grammar",
+                    "rule": "hoofdletter_zinsbegin",
+                    "offset": match.start() + match.group(0).index(sentence[0]),
+                })
+            if len(sentence.split()) > self.max_sentence_words:
+                suggestions.append({
+                    "original": sentence[:40] + "...",
+                    "suggestion": "Splits deze zin op in kortere zinnen",
+                    "type": "style",
+                    "rule": "lange_zin",
+                    "offset": match.start(),
+                })
+        return suggestions
+
+    @staticmethod
+    def _result(suggestions: List[Dict[str, Any]], language: str) -> Dict[str, Any]:
+        """Bouw het resultaat voor één tekst."""
+        suggestions.sort(key=lambda suggestion: suggestion["offset"])
+        errors = sum(1 for suggestion in suggestions if suggestion["type"] != "style")
+        return {
+            "errors": errors,
+            "score": max(0, 10 - errors),
+            "suggestions": suggestions,
+            "language": language,
+        }
+
+    def check(self, text: str) -> Dict[str, Any]:
+        """Controleer één tekst.
+
+        Args:
+            text: De te controleren tekst
+
+        Returns:
+            Dict met aantal fouten, score (0-10) en suggesties met positie
+        """
+        language = self._language(text)
+        return self._result(self._find(text, language), language)
+
+    def check_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Controleer veel teksten in één aanroep.
+
+        Teksten van dezelfde taal worden samengevoegd zodat elke regex maar één
+        keer over de hele batch loopt; de matches worden daarna via hun positie
+        teruggeplaatst bij de juiste tekst.
+
+        Args:
+            texts: De te controleren teksten
+
+        Returns:
+            Lijst met resultaten in dezelfde volgorde als de invoer
+        """
+        groups: Dict[str, List[int]] = {}
+        languages = [self._language(text) for text in texts]
+        for index, language in enumerate(languages):
+            groups.setdefault(language, []).append(index)
+
+        per_text: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        for language, indices in groups.items():
+            starts = []
+            position = 0
+            for index in indices:
+                starts.append(position)
+                position += len(texts[index]) + len(BATCH_SEPARATOR)
+            joined = BATCH_SEPARATOR.join(texts[index] for index in indices)
+
+            for suggestion in self._find(joined, language):
+                slot = bisect.bisect_right(starts, suggestion["offset"]) - 1
+                text_index = indices[slot]
+                if suggestion["offset"] >= starts[slot] + len(texts[text_index]):
+                    continue
+                suggestion["offset"] -= starts[slot]
+                per_text[text_index].append(suggestion)
+
+        return [self._result(suggestions, language)
+                for suggestions, language in zip(per_text, languages)]
@@ -0,0 +1,204 @@
+# RAKE/TF-IDF keyword extractie met een memory-mapped corpusindex
+
+import os
+import re
+import mmap
+import math
+import struct
+import hashlib
+from collections import Counter
+from typing import Dict, List, Any, Optional, Iterable
+
+from tools.analysis.text import tokenize, STOPWORDS
+
+INDEX_MAGIC = b"AGKW1\x00\x00\x00"
+# Header: magic, aantal documenten, aantal termen
+_HEADER = struct.Struct("<8sQQ")
+_PHRASE_SPLIT_RE = re.compile(r"[.,;:!?()\[\]{}\"“”\n\t|/\\]+|\s[-–—]\s")
+
+# Maximale lengte van een kandidaat-keyphrase in woorden
+MAX_PHRASE_WORDS = 3
+
+
+def term_hash(term: str) -> int:
+    """Stabiele 64-bit hash van een term."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class CorpusIndex:
+    """Document-frequenties van termen, één keer gebouwd en daarna memory-mapped.
+
+    Bestandsformaat: een header gevolgd door een gesorteerde array van 64-bit
+    term-hashes en een array van 32-bit document-frequenties. Opzoeken is een
+    binary search direct op de gemapte pagina's, dus laden kost vrijwel geen
+    geheugen en meerdere processen delen dezelfde pagina's.
+    """
+
+    def __init__(self, path: str):
+        """Open een bestaande index.
+
+        Args:
+            path: Pad naar het indexbestand
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.num_docs, self.num_terms = _HEADER.unpack_from(self._mmap, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is geen geldige keyword-index")
+
+        view = memoryview(self._mmap)
+        hashes_start = _HEADER.size
+        dfs_start = hashes_start + 8 * self.num_terms
+        self._hashes = view[hashes_start:dfs_start].cast("Q")
+        self._dfs = view[dfs_start:dfs_start + 4 * self.num_terms].cast("I")
+
+    @staticmethod
+    def build(documents: Iterable[str], path: str) -> "CorpusIndex":
+        """Bouw een index uit een corpus en schrijf hem naar disk.
+
+        Args:
+            documents: De documenten van het corpus (bijv. eerdere campagnes)
+            path: Doelpad van het indexbestand
+
+        Returns:
+            De geopende index
+        """
+        doc_freq: Counter = Counter()
+        num_docs = 0
+        for document in documents:
+            num_docs += 1
+            doc_freq.update({term_hash(token) for token in tokenize(document) if token not in STOPWORDS})
+
+        items = sorted(doc_freq.items())
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(INDEX_MAGIC, num_docs, len(items)))
+            f.write(struct.pack(f"<{len(items)}Q", *(h for h, _ in items)))
+            f.write(struct.pack(f"<{len(items)}I", *(min(df, 0xFFFFFFFF) for _, df in items)))
+        os.replace(tmp_path, path)
+        return CorpusIndex(path)
+
+    def document_frequency(self, term: str) -> int:
+        """Zoek de document-frequentie van een term op (0 als onbekend)."""
+        target = term_hash(term)
+        low, high = 0, self.num_terms
+        hashes = self._hashes
+        while low < high:
+            middle = (low + high) // 2
+            if hashes[middle] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.num_terms and hashes[low] == target:
+            return self._dfs[low]
+        return 0
+
+    def idf(self, term: str) -> float:
+        """Smoothed inverse document frequency van een term."""
+        return math.log((self.num_docs + 1) / (self.document_frequency(term) + 1)) + 1.0
+
+    def close(self):
+        """Sluit de memory map."""
+        self._hashes.release()
+        self._dfs.release()
+        self._mmap.close()
+        self._file.close()
+
+
+class KeywordExtractor:
+    """RAKE-achtige keyphrase-extractie, gewogen met IDF uit een corpusindex.
+
+    Zonder index worden alleen de RAKE-scores (woordgraad / frequentie) gebruikt.
+    """
+
+    def __init__(self, index: Optional[CorpusIndex] = None):
+        """Initialize de extractor.
+
+        Args:
+            index: Optionele corpusindex voor IDF-weging
+        """
+        self.index = index
+        self._idf_cache: Dict[str, float] = {}
+
+    def _idf(self, word: str) -> float:
+        """IDF van een woord (1.0 zonder index), gecachet over aanroepen heen."""
+        if self.index is None:
+            return 1.0
+        value = self._idf_cache.get(word)
+        if value is None:
+            value = self.index.idf(word)
+            if len(self._idf_cache) < 100000:
+                self._idf_cache[word] = value
+        return value
+
+    @staticmethod
+    def _candidates(text: str) -> List[List[str]]:
+        """Splits tekst in kandidaat-phrases op leestekens en stopwoorden."""
+        phrases = []
+        for fragment in _PHRASE_SPLIT_RE.split(text):
+            current: List[str] = []
+            for token in tokenize(fragment):
+                if token in STOPWORDS or len(token) < 2:
+                    if current:
+                        phrases.append(current)
+                    current = []
+                else:
+                    current.append(token)
+                    if len(current) == MAX_PHRASE_WORDS:
+                        phrases.append(current)
+                        current = []
+            if current:
+                phrases.append(current)
+        return phrases
+
+    def extract(self, text: str, max_keywords: int = 10) -> List[Dict[str, Any]]:
+        """Extraheer keywords uit één tekst.
+
+        Args:
+            text: De tekst
+            max_keywords: Maximum aantal keywords om terug te geven
+
+        Returns:
+            Lijst met keywords en hun relevantie (0-1), hoogste eerst
+        """
+        phrases = self._candidates(text)
+        if not phrases:
+            return []
+
+        frequency: Counter = Counter()
+        degree: Counter = Counter()
+        for phrase in phrases:
+            for word in phrase:
+                frequency[word] += 1
+                degree[word] += len(phrase)
+
+        scores: Dict[str, float] = {}
+        for phrase in phrases:
+            key = " ".join(phrase)
+            if key in scores:
+                continue
+            scores[key] = sum(degree[word] / frequency[word] * self._idf(word) for word in phrase)
+
+        top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:max_keywords]
+        best = top[0][1] or 1.0
+        return [{"keyword": keyword, "relevance": round(score / best, 4)} for keyword, score in top]
+
+    def extract_batch(self, texts: List[str], max_keywords: int = 10) -> List[List[Dict[str, Any]]]:
+        """Extraheer keywords uit veel teksten in één aanroep.
+
+        De IDF-cache wordt over de hele batch gedeeld, zodat elke term maar één
+        keer in de index wordt opgezocht.
+
+        Args:
+            texts: De teksten
+            max_keywords: Maximum aantal keywords per tekst
+
+        Returns:
+            Per tekst een lijst met keywords, in dezelfde volgorde als de invoer
+        """
+        extract = self.extract
+        return [extract(text, max_keywords) for text in texts]
@@ -0,0 +1,150 @@
+# Lexicon-gebaseerde sentimentanalyse (Nederlands/Engels)
+
+import math
+from typing import Dict, List, Any, Optional
+
+from tools.analysis.text import tokenize, detect_language
+
+# Valentie per woord op een schaal van -3 tot +3
+LEXICON = {
+    "nl": {
+        "geweldig": 3, "fantastisch": 3, "prachtig": 3, "uitstekend": 3, "perfect": 3, "briljant": 3,
+        "schitterend": 3, "top": 2, "super": 2, "goed": 2, "mooi": 2, "leuk": 2, "fijn": 2, "blij": 2,
+        "gelukkig": 2, "tevreden": 2, "sterk": 1, "handig": 1, "slim": 2, "innovatief": 2, "duurzaam": 1,
+        "betrouwbaar": 2, "veilig": 1, "gratis": 1, "voordelig": 2, "genieten": 2, "geniet": 2,
+        "liefde": 3, "houden": 1, "aanrader": 2, "succes": 2, "succesvol": 2, "winnen": 2, "winnaar": 2,
+        "kwaliteit": 1, "comfortabel": 2, "snel": 1, "eenvoudig": 1, "makkelijk": 1, "inspirerend": 2,
+        "trots": 2, "verrassend": 2, "uniek": 2, "exclusief": 1, "heerlijk": 3, "lekker": 2,
+        "aantrekkelijk": 2, "positief": 2, "waardevol": 2, "vriendelijk": 2, "professioneel": 1,
+        "slecht": -2, "vreselijk": -3, "verschrikkelijk": -3, "waardeloos": -3, "lelijk": -2,
+        "saai": -2, "duur": -1, "traag": -2, "langzaam": -1, "moeilijk": -1, "ingewikkeld": -1,
+        "probleem": -2, "problemen": -2, "fout": -2, "fouten": -2, "kapot": -2, "teleurgesteld": -2,
+        "teleurstellend": -2, "boos": -2, "verdrietig": -2, "ontevreden": -2, "klacht": -2,
+        "klachten": -2, "risico": -1, "gevaarlijk": -2, "onveilig": -2, "helaas": -1, "jammer": -1,
+        "zorgen": -1, "stress": -2, "haat": -3, "negatief": -2, "mislukt": -2, "verlies": -2,
+        "vervuiling": -2, "schadelijk": -2, "irritant": -2, "onbetrouwbaar": -2, "oplichting": -3,
+    },
+    "en": {
+        "amazing": 3, "awesome": 3, "excellent": 3, "fantastic": 3, "perfect": 3, "brilliant": 3,
+        "outstanding": 3, "wonderful": 3, "great": 3, "good": 2, "nice": 2, "beautiful": 2, "happy": 2,
+        "love": 3, "loved": 3, "like": 1, "enjoy": 2, "best": 3, "better": 2, "smart": 2,
+        "innovative": 2, "sustainable": 1, "reliable": 2, "safe": 1, "free": 1, "affordable": 2,
+        "success": 2, "successful": 2, "win": 2, "winner": 2, "quality": 1, "comfortable": 2,
+        "fast": 1, "easy": 1, "simple": 1, "inspiring": 2, "proud": 2, "surprising": 2, "unique": 2,
+        "exclusive": 1, "delicious": 3, "attractive": 2, "positive": 2, "valuable": 2, "friendly": 2,
+        "professional": 1, "recommend": 2, "fresh": 1, "powerful": 2, "trusted": 2,
+        "bad": -2, "terrible": -3, "awful": -3, "horrible": -3, "worthless": -3, "ugly": -2,
+        "boring": -2, "expensive": -1, "slow": -2, "difficult": -1, "complicated": -1,
+        "problem": -2, "problems": -2, "error": -2, "errors": -2, "broken": -2, "disappointed": -2,
+        "disappointing": -2, "angry": -2, "sad": -2, "unhappy": -2, "complaint": -2, "risk": -1,
+        "dangerous": -2, "unsafe": -2, "unfortunately": -1, "worry": -1, "stress": -2, "hate": -3,
+        "negative": -2, "failed": -2, "failure": -2, "loss": -2, "pollution": -2, "harmful": -2,
+        "annoying": -2, "unreliable": -2, "scam": -3, "worst": -3, "worse": -2,
+    },
+}
+
+NEGATIONS = frozenset({
+    "niet", "geen", "nooit", "niets", "nergens", "noch",
+    "not", "no", "never", "nothing", "nobody", "neither", "nor", "don't", "doesn't", "didn't",
+    "isn't", "aren't", "wasn't", "weren't", "won't", "can't", "cannot", "without",
+})
+
+INTENSIFIERS = {
+    "zeer": 1.5, "heel": 1.4, "erg": 1.4, "enorm": 1.6, "ontzettend": 1.6, "echt": 1.2, "super": 1.5,
+    "extreem": 1.7, "bijzonder": 1.3, "best": 1.1, "nogal": 0.8, "beetje": 0.6, "redelijk": 0.8,
+    "very": 1.5, "really": 1.3, "extremely": 1.7, "so": 1.3, "incredibly": 1.7, "truly": 1.3,
+    "quite": 1.1, "slightly": 0.6, "somewhat": 0.8, "barely": 0.5,
+}
+
+# Aantal woorden na een ontkenning dat wordt omgekeerd
+NEGATION_SCOPE = 3
+# Normalisatieconstante (zoals in VADER) om de som naar [-1, 1] te brengen
+NORMALIZATION_ALPHA = 15.0
+
+
+def label_for(score: float) -> str:
+    """Zet een sentimentscore om naar een label."""
+    return "positief" if score > 0.3 else "negatief" if score < -0.3 else "neutraal"
+
+
+class SentimentAnalyzer:
+    """Lexicon-gebaseerde sentimentscorer voor Nederlandse en Engelse tekst.
+
+    Houdt rekening met ontkenningen ("niet goed"), versterkers ("heel goed")
+    en uitroeptekens, zonder netwerk of model.
+    """
+
+    def __init__(self, language: str = "auto",
+                 extra_lexicon: Optional[Dict[str, Dict[str, float]]] = None):
+        """Initialize de analyzer.
+
+        Args:
+            language: "nl", "en" of "auto" (detecteer per tekst)
+            extra_lexicon: Aanvullende of overschrijvende valenties per taal
+        """
+        self.language = language
+        self.lexicon = {lang: dict(words) for lang, words in LEXICON.items()}
+        for lang, words in (extra_lexicon or {}).items():
+            self.lexicon.setdefault(lang, {}).update(words)
+
+    def _score_tokens(self, tokens: List[str], exclamations: int) -> Dict[str, Any]:
+        """Bereken het sentiment van een lijst tokens."""
+        language = self.language if self.language != "auto" else detect_language(tokens)
+        lexicon = self.lexicon.get(language, {})
+
+        total = 0.0
+        hits = 0
+        negate_until = -1
+        boost = 1.0
+        for position, token in enumerate(tokens):
+            if token in NEGATIONS:
+                negate_until = position + NEGATION_SCOPE
+                continue
+            if token in INTENSIFIERS and token not in lexicon:
+                boost = INTENSIFIERS[token]
+                continue
+            valence = lexicon.get(token)
+            if valence is None:
+                boost = 1.0
+                continue
+            value = valence * boost
+            if position <= negate_until:
+                value *= -0.75
+            total += value
+            hits += 1
+            boost = 1.0
+
+        if total:
+            total += math.copysign(min(exclamations, 3) * 0.3, total)
+        score = total / math.sqrt(total * total + NORMALIZATION_ALPHA) if total else 0.0
+        coverage = hits / len(tokens) if tokens else 0.0
+
+        return {
+            "score": round(score, 4),
+            "label": label_for(score),
+            "confidence": round(min(0.99, 0.5 + 0.3 * abs(score) + min(coverage * 2, 0.19)), 4),
+            "language": language,
+        }
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """Analyseer het sentiment van één tekst.
+
+        Args:
+            text: De te analyseren tekst
+
+        Returns:
+            Dict met score (-1 tot 1), label, confidence en taal
+        """
+        return self._score_tokens(tokenize(text), text.count("!"))
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyseer het sentiment van veel teksten in één aanroep.
+
+        Args:
+            texts: De te analyseren teksten
+
+        Returns:
+            Lijst met resultaten in dezelfde volgorde als de invoer
+        """
+        score = self._score_tokens
+        return [score(tokenize(text), text.count("!")) for text in texts]
@@ -0,0 +1,54 @@
+# Tekstverwerking voor de lokale analyse-engines
+
+import re
+from typing import List
+
+# Woorden inclusief letters met accenten en samentrekkingen als "don't" en "zo'n"
+WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)?", re.UNICODE)
+SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+
+DUTCH_STOPWORDS = frozenset("""
+aan al alles als altijd andere ben bij daar dan dat de der deze die dit doch doen door dus een eens
+en er ge geen geweest haar had heb hebben heeft hem het hier hij hoe hun iemand iets ik in is ja je
+jij jouw jullie kan kon kunnen maar me meer men met mij mijn moet na naar niet niets nog nu of om
+omdat onder ons ook op over reeds te tegen toch toen tot u uit uw van veel voor want waren was wat
+we wel werd wezen wie wij wil worden wordt zal ze zelf zich zij zijn zo zonder zou onze ons hen
+""".split())
+
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+""".split())
+
+STOPWORDS = DUTCH_STOPWORDS | ENGLISH_STOPWORDS
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits tekst in woorden (kleine letters).
+
+    Args:
+        text: De tekst
+
+    Returns:
+        Lijst met woorden
+    """
+    return [word.lower().replace("’", "'") for word in WORD_RE.findall(text)]
+
+
+def detect_language(tokens: List[str]) -> str:
+    """Bepaal of tokens Nederlands of Engels zijn op basis van stopwoorden.
+
+    Args:
+        tokens: Woorden in kleine letters
+
+    Returns:
+        "nl" of "en" (Nederlands bij gelijkspel)
+    """
+    dutch = sum(1 for token in tokens if token in DUTCH_STOPWORDS)
+    english = sum(1 for token in tokens if token in ENGLISH_STOPWORDS)
+    return "en" if english > dutch else "nl"
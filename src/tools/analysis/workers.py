@@ -0,0 +1,68 @@
+# Executor-ondersteuning voor CPU-gebonden content analyse
+
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from tools.analysis.sentiment import SentimentAnalyzer
+from tools.analysis.keywords import KeywordExtractor, CorpusIndex
+from tools.analysis.grammar import GrammarChecker
+
+EXECUTOR_TYPES = ("inline", "thread", "process")
+
+# Engines per worker-proces, aangemaakt door _init_worker
+_engines: Dict[str, Any] = {}
+
+
+def _init_worker(language: str, index_path: Optional[str],
+                 lexicon: Optional[Dict[str, Dict[str, float]]]):
+    """Bouw de engines één keer per worker-proces.
+
+    De corpusindex wordt per proces gemapt; het OS deelt de pagina's tussen processen.
+    """
+    index = CorpusIndex(index_path) if index_path and os.path.exists(index_path) else None
+    _engines["sentiment"] = SentimentAnalyzer(language, lexicon)
+    _engines["keywords"] = KeywordExtractor(index)
+    _engines["grammar"] = GrammarChecker(language)
+
+
+def sentiment_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """Analyseer sentiment van een chunk teksten in een worker-proces."""
+    return _engines["sentiment"].analyze_batch(texts)
+
+
+def keywords_chunk(texts: List[str], max_keywords: int) -> List[List[Dict[str, Any]]]:
+    """Extraheer keywords uit een chunk teksten in een worker-proces."""
+    return _engines["keywords"].extract_batch(texts, max_keywords)
+
+
+def grammar_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """Controleer de grammatica van een chunk teksten in een worker-proces."""
+    return _engines["grammar"].check_batch(texts)
+
+
+def create_executor(executor_config: Dict[str, Any], language: str,
+                    index_path: Optional[str],
+                    lexicon: Optional[Dict[str, Dict[str, float]]]) -> Optional[Executor]:
+    """Maak de executor voor content analyse op basis van de configuratie.
+
+    Args:
+        executor_config: Dict met type ("inline", "thread" of "process") en max_workers
+        language: Taal voor de engines in worker-processen
+        index_path: Pad naar de keyword corpusindex
+        lexicon: Aanvullend sentimentlexicon
+
+    Returns:
+        De executor, of None voor inline uitvoering op de event loop
+    """
+    executor_type = executor_config.get("type", "inline")
+    if executor_type not in EXECUTOR_TYPES:
+        raise ValueError(f"Onbekend executor type: {executor_type}")
+    max_workers = executor_config.get("max_workers") or os.cpu_count() or 1
+
+    if executor_type == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="content-analysis")
+    if executor_type == "process":
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                   initargs=(language, index_path, lexicon))
+    return None
@@ -1,90 +1,176 @@
 # Content Tools voor AutoGen Marketing Team
 
-import random
-from typing import Dict, List, Any, Optional
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Iterable, Callable
+
+from tools.analysis.sentiment import SentimentAnalyzer
+from tools.analysis.keywords import KeywordExtractor, CorpusIndex
+from tools.analysis.grammar import GrammarChecker
+from tools.analysis import workers
 
 class ContentTools:
-    """Tools voor het manipuleren en analyseren van content."""
-    
+    """Tools voor het manipuleren en analyseren van content.
+
+    Alle analyses draaien lokaal (lexicons, corpusstatistieken en regels),
+    zonder netwerk of LLM-call. Met een thread- of process-executor
+    (config "executor") wordt het CPU-werk van de event loop gehaald, zodat
+    gelijktijdige campagnes en agent I/O niet blokkeren.
+    """
+
     def __init__(self, config: Dict[str, Any]):
         """Initialize the content tools.
-        
+
         Args:
-            config: Configuratie settings
+            config: Configuratie settings (language, keyword_index_path, sentiment_lexicon,
+                executor: {"type": "inline" | "thread" | "process", "max_workers": N,
+                "chunk_size": N})
         """
         self.config = config
-    
+        self.language = config.get("language", "auto")
+
+        # Corpusindex voor IDF-weging van keywords (optioneel, memory-mapped)
+        self.keyword_index = None
+        self.keyword_index_path = config.get("keyword_index_path")
+        if self.keyword_index_path and os.path.exists(self.keyword_index_path):
+            self.keyword_index = CorpusIndex(self.keyword_index_path)
+
+        self.sentiment_analyzer = SentimentAnalyzer(self.language, config.get("sentiment_lexicon"))
+        self.keyword_extractor = KeywordExtractor(self.keyword_index)
+        self.grammar_checker = GrammarChecker(self.language)
+
+        # Executor voor het CPU-gebonden analysewerk
+        self.executor_config = config.get("executor", {})
+        self.chunk_size = max(1, self.executor_config.get("chunk_size", 64))
+        self.executor = self._create_executor()
+
+    def _create_executor(self):
+        """Maak de executor volgens de configuratie."""
+        return workers.create_executor(self.executor_config, self.language,
+                                       self.keyword_index_path, self.config.get("sentiment_lexicon"))
+
+    def build_keyword_index(self, documents: Iterable[str], path: Optional[str] = None):
+        """Bouw de corpusindex voor keyword extractie en gebruik hem direct.
+
+        Args:
+            documents: Corpus, bijvoorbeeld eerder gegenereerde campagnes
+            path: Doelpad (standaard keyword_index_path uit de config)
+        """
+        path = path or self.keyword_index_path or "data/keyword_index.bin"
+        if self.keyword_index is not None:
+            self.keyword_index.close()
+        self.keyword_index = CorpusIndex.build(documents, path)
+        self.keyword_index_path = path
+        self.keyword_extractor = KeywordExtractor(self.keyword_index)
+
+        # Worker-processen hebben de oude index geladen en moeten opnieuw starten
+        if isinstance(self.executor, ProcessPoolExecutor):
+            self.executor.shutdown(wait=False)
+            self.executor = self._create_executor()
+
+    async def _run_batch(self, local_fn: Callable[..., list], process_fn: Callable[..., list],
+                         texts: List[str], *args: Any) -> list:
+        """Voer een batch-analyse uit, in chunks verdeeld over de executor.
+
+        Args:
+            local_fn: Batch-methode van de engine in dit proces (inline en threads)
+            process_fn: Module-functie voor worker-processen
+            texts: De teksten
+            *args: Extra argumenten voor de analyse
+
+        Returns:
+            Resultaten in de volgorde van de invoer
+        """
+        if self.executor is None:
+            return local_fn(texts, *args)
+
+        fn = process_fn if isinstance(self.executor, ProcessPoolExecutor) else local_fn
+        loop = asyncio.get_running_loop()
+        chunks = [texts[start:start + self.chunk_size]
+                  for start in range(0, len(texts), self.chunk_size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, fn, chunk, *args) for chunk in chunks
+        ))
+        return [item for chunk_results in results for item in chunk_results]
+
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyseer het sentiment van een tekst.
-        
+
         Args:
             text: De te analyseren tekst
-            
+
         Returns:
             Dict met sentiment analyse resultaten
         """
-        # Implementeer hier werkelijke sentiment analyse
-        # Dit is een placeholder
-        print(f"Sentiment analyse van tekst: {text[:50]}...")
-        
-        # Simuleer resultaten voor demo-doeleinden
-        sentiment_score = random.uniform(-1.0, 1.0)
-        
-        return {
-            "score": sentiment_score,
-            "label": "positief" if sentiment_score > 0.3 else 
-                     "negatief" if sentiment_score < -0.3 else "neutraal",
-            "confidence": random.uniform(0.7, 0.95)
-        }
-    
+        return (await self.analyze_sentiment_batch([text]))[0]
+
+    async def analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyseer het sentiment van veel teksten tegelijk.
+
+        Args:
+            texts: De te analyseren teksten
+
+        Returns:
+            Lijst met sentiment analyse resultaten, in de volgorde van de invoer
+        """
+        return await self._run_batch(self.sentiment_analyzer.analyze_batch,
+                                     workers.sentiment_chunk, texts)
+
     async def keyword_extraction(self, text: str, max_keywords: int = 10) -> List[Dict[str, Any]]:
         """Extraheer keywords uit een tekst.
-        
+
         Args:
             text: De tekst om keywords uit te extraheren
             max_keywords: Maximum aantal keywords om terug te geven
-            
+
         Returns:
             Lijst met keywords en hun relevantiescore
         """
-        # Implementeer hier werkelijke keyword extractie
-        # Dit is een placeholder
-        print(f"Keyword extractie uit tekst: {text[:50]}...")
-        
-        # Simuleer resultaten voor demo-doeleinden
-        # In werkelijkheid zou je hier NLP-technieken gebruiken
-        mock_keywords = [
-            "marketing", "content", "strategie", "social media", 
-            "brand", "campagne", "doelgroep", "conversie", 
-            "engagement", "ROI"
-        ]
-        
-        return [
-            {"keyword": keyword, "relevance": random.uniform(0.5, 1.0)}
-            for keyword in random.sample(mock_keywords, min(max_keywords, len(mock_keywords)))
-        ]
-    
+        return (await self.keyword_extraction_batch([text], max_keywords))[0]
+
+    async def keyword_extraction_batch(self, texts: List[str],
+                                       max_keywords: int = 10) -> List[List[Dict[str, Any]]]:
+        """Extraheer keywords uit veel teksten tegelijk.
+
+        Args:
+            texts: De teksten om keywords uit te extraheren
+            max_keywords: Maximum aantal keywords per tekst
+
+        Returns:
+            Per tekst een lijst met keywords en hun relevantiescore
+        """
+        return await self._run_batch(self.keyword_extractor.extract_batch,
+                                     workers.keywords_chunk, texts, max_keywords)
+
     async def grammar_check(self, text: str) -> Dict[str, Any]:
         """Controleer de grammatica van een tekst.
-        
+
         Args:
             text: De te controleren tekst
-            
+
         Returns:
             Dict met grammatica-controleresultaten
         """
-        # Implementeer hier werkelijke grammatica controle
-        # Dit is een placeholder
-        print(f"Grammatica controle van tekst: {text[:50]}...")
-        
-        # Simuleer resultaten voor demo-doeleinden
-        num_errors = random.randint(0, 5)
-        
-        return {
-            "errors": num_errors,
-            "score": 10 - num_errors,
-            "suggestions": [
-                {"original": "incorrecte zin", "suggestion": "correcte zin", "type": "grammar"}
-                for _ in range(num_errors)
-            ] if num_errors > 0 else []
-        }
\ No newline at end of file
+        return (await self.grammar_check_batch([text]))[0]
+
+    async def grammar_check_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Controleer de grammatica van veel teksten tegelijk.
+
+        Args:
+            texts: De te controleren teksten
+
+        Returns:
+            Lijst met grammatica-controleresultaten, in de volgorde van de invoer
+        """
+        return await self._run_batch(self.grammar_checker.check_batch,
+                                     workers.grammar_chunk, texts)
+
+    def close(self):
+        """Stop de executor en sluit de corpusindex."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self.keyword_index is not None:
+            self.keyword_index.close()
+            self.keyword_index = None
@@ -0,0 +1,134 @@
+# Incrementele HTML-naar-tekst extractie voor AutoGen Marketing Team
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Iterable
+
+# Elementen waarvan de inhoud nooit in de tekst hoort
+SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "head", "nav", "footer", "header", "aside", "form", "button", "select",
+})
+# Elementen die een tekstblok afsluiten
+BLOCK_TAGS = frozenset({
+    "p", "div", "section", "article", "main", "br", "li", "ul", "ol", "table", "tr",
+    "td", "th", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "dd", "dt",
+    "figcaption", "hr", "title",
+})
+# Void elements hebben geen end tag en kunnen dus geen overgeslagen regio openen
+VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+                       "meta", "param", "source", "track", "wbr"})
+# Boilerplate herkend aan een los woord in een class- of id-token ("cookie-banner",
+# "share_buttons"); "shared-layout", "promotional" en modifiers als "has-sidebar" tellen niet mee
+BOILERPLATE_RE = re.compile(r"^(?!(?:has|with|no|is)[-_])(?:.*[-_])?(?:cookies?|consent|banners?|newsletter|share|social|sidebar|menus?|"
+                            r"breadcrumbs?|advert\w*|promos?)(?=$|[-_])", re.IGNORECASE)
+# Elementen die de hele pagina of de hoofdinhoud omvatten, nooit boilerplate
+CONTENT_TAGS = frozenset({"html", "body", "main", "article"})
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Zet HTML incrementeel om naar schone tekstblokken.
+
+    Voer de HTML in stukken in met feed(); elk afgesloten tekstblok (alinea,
+    kop, lijstitem, ...) komt direct beschikbaar, zodat de hele pagina nooit
+    in het geheugen hoeft te staan. Scripts, styles, navigatie, footers en
+    boilerplate (cookiebanners, deelknoppen, ...) worden overgeslagen.
+    """
+
+    def __init__(self, min_block_chars: int = 30):
+        """Initialize de extractor.
+
+        Args:
+            min_block_chars: Kortere blokken (menu-items, labels) worden weggelaten
+        """
+        super().__init__(convert_charrefs=True)
+        self.min_block_chars = min_block_chars
+        # Tag die de overgeslagen regio opende en de nesting van die tag daarbinnen;
+        # andere tags tellen niet mee, omdat <li>, <p>, <td> e.d. vaak geen end tag hebben
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        self._parts: List[str] = []
+        self._blocks: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in SKIP_TAGS or (tag not in CONTENT_TAGS and self._is_boilerplate(attrs)):
+            if tag not in VOID_TAGS:
+                self._flush()
+                self._skip_tag = tag
+                self._skip_depth = 1
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if self._skip_depth:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if not self._skip_depth:
+                    self._skip_tag = None
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._parts.append(data)
+
+    @staticmethod
+    def _is_boilerplate(attrs) -> bool:
+        """Herken boilerplate aan een class- of id-token van een element."""
+        for name, value in attrs:
+            if name in ("class", "id") and value:
+                if any(BOILERPLATE_RE.search(token) for token in value.split()):
+                    return True
+        return False
+
+    def _flush(self):
+        """Sluit het huidige tekstblok af."""
+        if not self._parts:
+            return
+        text = WHITESPACE_RE.sub(" ", "".join(self._parts)).strip()
+        self._parts = []
+        if len(text) >= self.min_block_chars:
+            self._blocks.append(text)
+
+    def feed_chunk(self, html: str) -> List[str]:
+        """Verwerk een stuk HTML.
+
+        Args:
+            html: Het volgende stuk van het document
+
+        Returns:
+            De tekstblokken die door dit stuk zijn afgesloten
+        """
+        self.feed(html)
+        blocks, self._blocks = self._blocks, []
+        return blocks
+
+    def finish(self) -> List[str]:
+        """Sluit het document af en geef de resterende tekstblokken terug."""
+        self.close()
+        self._skip_tag = None
+        self._skip_depth = 0
+        self._flush()
+        blocks, self._blocks = self._blocks, []
+        return blocks
+
+
+def html_to_text(html: str, min_block_chars: int = 30) -> str:
+    """Zet een volledig HTML-document om naar tekst (blokken gescheiden door een lege regel)."""
+    extractor = HTMLTextExtractor(min_block_chars)
+    return "\n\n".join(extractor.feed_chunk(html) + extractor.finish())
+
+
+def is_relevant(block: str, keywords: Optional[Iterable[str]]) -> bool:
+    """Of een tekstblok relevant is: zonder keywords altijd, anders bij minstens één treffer."""
+    if not keywords:
+        return True
+    lowered = block.casefold()
+    return any(keyword.casefold() in lowered for keyword in keywords)
@@ -0,0 +1,241 @@
+# Async HTTP Client voor AutoGen Marketing Team
+
+import time
+import random
+import asyncio
+import weakref
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator
+from urllib.parse import urlsplit
+
+import httpx
+
+# Statuscodes waarbij een nieuwe poging zin heeft
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Lees de Retry-After header (seconden of HTTP-datum) uit.
+
+    Args:
+        response: De HTTP response
+
+    Returns:
+        Aantal seconden om te wachten, of None als de header ontbreekt
+    """
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _LoopState:
+    """HTTP client en semaphores die bij één event loop horen."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Taak die de client sluit zodra de loop afsluit (zie AsyncHTTPClient._close_with_loop)
+        self.closer: Optional[asyncio.Task] = None
+
+
+class AsyncHTTPClient:
+    """Gedeelde async HTTP client met connection pooling, retries en limieten per host.
+
+    Er is één `httpx.AsyncClient` per event loop, zodat keep-alive verbindingen
+    hergebruikt worden en de client ook werkt als meerdere threads elk hun eigen
+    loop draaien (bijv. Streamlit sessies met een gedeeld team). De client van
+    een loop wordt gesloten zodra die loop afsluit (asyncio.run) of bij aclose.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """Initialize de client.
+
+        Args:
+            config: Settings: timeout, connect_timeout, max_connections,
+                max_keepalive_connections, keepalive_expiry, per_host_limit,
+                retries, backoff_base, backoff_max, http2, user_agent
+            transport: Optionele httpx transport (bijv. httpx.MockTransport in tests)
+        """
+        config = config or {}
+        self.config = config
+        self.transport = transport
+        self.retries = config.get("retries", 3)
+        self.backoff_base = config.get("backoff_base", 0.5)
+        self.backoff_max = config.get("backoff_max", 10.0)
+        self.per_host_limit = config.get("per_host_limit", 6)
+        # HTTP/2 alleen als de h2 package beschikbaar is
+        self.http2 = config.get("http2", True) and importlib.util.find_spec("h2") is not None
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = \
+            weakref.WeakKeyDictionary()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Maak een nieuwe httpx client met pooling en timeouts."""
+        config = self.config
+        return httpx.AsyncClient(
+            http2=self.http2,
+            transport=self.transport,
+            timeout=httpx.Timeout(config.get("timeout", 15.0),
+                                  connect=config.get("connect_timeout", 5.0)),
+            limits=httpx.Limits(
+                max_connections=config.get("max_connections", 100),
+                max_keepalive_connections=config.get("max_keepalive_connections", 20),
+                keepalive_expiry=config.get("keepalive_expiry", 30.0),
+            ),
+            headers={"User-Agent": config.get("user_agent", "autogen-marketing-team/1.0")},
+            follow_redirects=True,
+        )
+
+    def _state(self) -> _LoopState:
+        """Haal de client-state voor de huidige event loop op (of maak die aan)."""
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None or state.client.is_closed:
+            state = _LoopState(self._build_client())
+            state.closer = loop.create_task(self._close_with_loop(loop, state))
+            self._states[loop] = state
+        return state
+
+    async def _close_with_loop(self, loop: asyncio.AbstractEventLoop, state: _LoopState):
+        """Wacht tot de taak geannuleerd wordt en sluit dan de client van de loop.
+
+        asyncio.run annuleert bij het afsluiten alle openstaande taken, zodat
+        de verbindingen van de client netjes op hun eigen loop dichtgaan.
+        """
+        try:
+            await loop.create_future()
+        finally:
+            if self._states.get(loop) is state:
+                del self._states[loop]
+            await state.client.aclose()
+
+    def _host_semaphore(self, state: _LoopState, url: str) -> asyncio.Semaphore:
+        """Semaphore die het aantal gelijktijdige requests per host begrenst."""
+        host = urlsplit(url).netloc
+        semaphore = state.host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            state.host_semaphores[host] = semaphore
+        return semaphore
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Wachttijd voor een nieuwe poging: Retry-After of exponentieel met full jitter."""
+        if response is not None:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Voer een request uit met retries op netwerkfouten en tijdelijke statuscodes.
+
+        Args:
+            method: HTTP methode
+            url: De URL
+            **kwargs: Extra argumenten voor httpx (params, headers, json, ...)
+
+        Returns:
+            De laatste response (ook bij een foutstatus na de laatste poging)
+
+        Raises:
+            httpx.TransportError: Als ook de laatste poging een netwerkfout gaf
+        """
+        state = self._state()
+        semaphore = self._host_semaphore(state, url)
+        attempt = 0
+        while True:
+            try:
+                async with semaphore:
+                    response = await state.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                await response.aclose()
+                await asyncio.sleep(self._backoff(attempt, response))
+                attempt += 1
+                continue
+            return response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Voer een GET request uit (zie request)."""
+        return await self.request("GET", url, **kwargs)
+
+    async def get_json(self, url: str, **kwargs: Any) -> Any:
+        """Voer een GET request uit en geef de JSON body terug.
+
+        Raises:
+            httpx.HTTPStatusError: Bij een foutstatus
+        """
+        response = await self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Open een streaming response binnen de limiet per host.
+
+        Het opzetten van de verbinding wordt bij netwerkfouten opnieuw geprobeerd;
+        eenmaal gestart wordt de body niet opnieuw opgehaald.
+
+        Args:
+            method: HTTP methode
+            url: De URL
+            **kwargs: Extra argumenten voor httpx
+
+        Returns:
+            Async context manager met de response (body nog niet gelezen)
+        """
+        state = self._state()
+        semaphore = self._host_semaphore(state, url)
+        attempt = 0
+        async with semaphore:
+            while True:
+                try:
+                    request = state.client.build_request(method, url, **kwargs)
+                    response = await state.client.send(request, stream=True)
+                except httpx.TransportError:
+                    if attempt >= self.retries:
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                    await response.aclose()
+                    await asyncio.sleep(self._backoff(attempt, response))
+                    attempt += 1
+                    continue
+                break
+            try:
+                yield response
+            finally:
+                await response.aclose()
+
+    async def aclose(self):
+        """Sluit de clients van alle event loops.
+
+        De client van de huidige loop wordt direct gesloten; die van andere
+        loops wordt op hun eigen loop gesloten zodra die (weer) draait.
+        """
+        current = asyncio.get_running_loop()
+        for loop, state in list(self._states.items()):
+            self._states.pop(loop, None)
+            if loop is current:
+                state.closer.cancel()
+                await state.client.aclose()
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(state.closer.cancel)
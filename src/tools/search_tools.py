@@ -1,83 +1,365 @@
 # Search Tools voor AutoGen Marketing Team
 
-import requests
 import json
-from typing import Dict, List, Any, Optional
+import zlib
+import codecs
+import asyncio
+from contextlib import aclosing
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterable
+
+import httpx
+
+from tools.http_client import AsyncHTTPClient
+from tools.html_text import HTMLTextExtractor, is_relevant
+from cache.web_cache import WebCache, make_web_key
+from utils.tracing import tracer
+
+GOOGLE_SEARCH_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+NEWS_SEARCH_ENDPOINT = "https://newsapi.org/v2/everything"
 
 class SearchTools:
-    """Tools voor het uitvoeren van verschillende soorten zoekopdrachten."""
-    
-    def __init__(self, config: Dict[str, Any]):
+    """Tools voor het uitvoeren van verschillende soorten zoekopdrachten.
+
+    Alle requests lopen via één gedeelde async HTTP client met keep-alive
+    connection pooling, limieten per host, timeouts en retries. Met een
+    geconfigureerde cache worden zoekresultaten en pagina's hergebruikt en
+    na hun TTL met een conditional request (ETag/Last-Modified) gerevalideerd.
+    """
+
+    def __init__(self, config: Dict[str, Any],
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
         """Initialize the search tools.
-        
+
         Args:
-            config: Configuratie met API keys en settings
+            config: Configuratie met API keys en settings (search_api_key,
+                search_engine_id, news_api_key, endpoints, "http" client settings en
+                "cache": {"enabled", "path", "max_bytes", "*_ttl_seconds"} en
+                "fetch": {"max_bytes", "max_chars", "chunk_size", "min_block_chars"})
+            transport: Optionele httpx transport, bijv. een lokale stand-in server in tests
         """
         self.config = config
         self.search_api_key = config.get("search_api_key", "")
-        
+        self.search_engine_id = config.get("search_engine_id", "")
+        self.news_api_key = config.get("news_api_key", "")
+        self.search_endpoint = config.get("search_endpoint", GOOGLE_SEARCH_ENDPOINT)
+        self.news_endpoint = config.get("news_endpoint", NEWS_SEARCH_ENDPOINT)
+        self.http = AsyncHTTPClient(config.get("http", {}), transport=transport)
+
+        cache_config = config.get("cache", {})
+        self.cache = WebCache(cache_config) if cache_config.get("enabled") else None
+
+        fetch_config = config.get("fetch", {})
+        self.fetch_max_bytes = fetch_config.get("max_bytes", 2 * 1024 * 1024)
+        self.fetch_max_chars = fetch_config.get("max_chars", 20000)
+        self.fetch_chunk_size = fetch_config.get("chunk_size", 16 * 1024)
+        self.min_block_chars = fetch_config.get("min_block_chars", 30)
+
+    async def _cached_get(self, kind: str, url: str, params: Optional[Dict[str, Any]] = None,
+                          headers: Optional[Dict[str, str]] = None) -> bytes:
+        """Haal een URL op via de cache, met revalidatie van verlopen entries.
+
+        Args:
+            kind: Soort entry ("search", "news" of "page"), bepaalt de TTL
+            url: Endpoint of pagina-URL
+            params: Query parameters
+            headers: Extra request headers
+
+        Returns:
+            De response body
+
+        Raises:
+            httpx.HTTPStatusError: Bij een foutstatus
+        """
+        with tracer.span("tool.http_get", kind=kind) as span:
+            if self.cache is None:
+                response = await self.http.get(url, params=params, headers=headers)
+                response.raise_for_status()
+                return response.content
+
+            key = make_web_key(kind, url, params)
+            entry = await asyncio.to_thread(self.cache.lookup, key)
+            if entry is not None and entry.fresh:
+                self.cache.record("hit", entry.raw_size)
+                span.set(cache_hit=True, cache="hit")
+                return await asyncio.to_thread(entry.read)
+
+            request_headers = dict(headers or {})
+            if entry is not None:
+                request_headers.update(entry.conditional_headers())
+            response = await self.http.get(url, params=params, headers=request_headers)
+
+            if response.status_code == 304 and entry is not None:
+                await asyncio.to_thread(self.cache.refresh, key, response.headers.get("etag"),
+                                        response.headers.get("last-modified"))
+                self.cache.record("revalidated", entry.raw_size)
+                span.set(cache_hit=True, cache="revalidated")
+                return await asyncio.to_thread(entry.read)
+
+            response.raise_for_status()
+            self.cache.record("miss")
+            span.set(cache_hit=False, cache="miss", bytes=len(response.content))
+            if "no-store" not in response.headers.get("cache-control", ""):
+                await asyncio.to_thread(self.cache.store, key, kind, response.content,
+                                        etag=response.headers.get("etag"),
+                                        last_modified=response.headers.get("last-modified"),
+                                        content_type=response.headers.get("content-type", ""))
+            return response.content
+
     async def google_search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         """Voer een Google-zoekopdracht uit.
-        
+
         Args:
             query: De zoekopdracht
             num_results: Aantal resultaten om terug te geven
-            
+
         Returns:
             Lijst met zoekresultaten
         """
-        # Implementeer hier de werkelijke Google Search API-integratie
-        # Dit is een placeholder
-        print(f"Zoeken naar: {query}")
-        
-        # Simuleer resultaten voor demo-doeleinden
-        mock_results = [
-            {"title": f"Resultaat {i+1} voor {query}", 
-             "url": f"https://example.com/result-{i+1}", 
-             "snippet": f"Dit is een voorbeeld zoekresultaat voor {query}..."} 
-            for i in range(num_results)
+        if not self.search_api_key:
+            # Zonder API key: gesimuleerde resultaten voor demo-doeleinden
+            return [
+                {"title": f"Resultaat {i+1} voor {query}",
+                 "url": f"https://example.com/result-{i+1}",
+                 "snippet": f"Dit is een voorbeeld zoekresultaat voor {query}..."}
+                for i in range(num_results)
+            ]
+
+        data = json.loads(await self._cached_get("search", self.search_endpoint, params={
+            "key": self.search_api_key,
+            "cx": self.search_engine_id,
+            "q": " ".join(query.split()),
+            "num": min(num_results, 10),
+        }))
+        return [
+            {"title": item.get("title", ""),
+             "url": item.get("link", ""),
+             "snippet": item.get("snippet", "")}
+            for item in data.get("items", [])[:num_results]
         ]
-        
-        return mock_results
-    
+
     async def web_fetch(self, url: str) -> str:
-        """Haal de inhoud van een webpagina op.
-        
+        """Haal de tekst van een webpagina op.
+
+        Args:
+            url: De URL om op te halen
+
+        Returns:
+            De schone tekst van de pagina (alinea's gescheiden door een lege regel),
+            begrensd door fetch.max_bytes en fetch.max_chars
+        """
+        return "\n\n".join([block async for block in self.web_fetch_stream(url)])
+
+    async def web_fetch_stream(self, url: str, max_bytes: Optional[int] = None,
+                               max_chars: Optional[int] = None,
+                               keywords: Optional[Iterable[str]] = None) -> AsyncIterator[str]:
+        """Haal een webpagina streaming op en geef de tekst per blok terug.
+
+        De body wordt incrementeel gelezen en geparsed; scripts, styles en
+        boilerplate worden onderweg verwijderd. Er wordt nooit meer dan
+        max_bytes gedownload en er wordt gestopt zodra max_chars relevante
+        tekst verzameld is.
+
         Args:
             url: De URL om op te halen
-            
+            max_bytes: Harde limiet op de gelezen body (standaard fetch.max_bytes)
+            max_chars: Stop na zoveel tekens relevante tekst (standaard fetch.max_chars, 0 = geen limiet)
+            keywords: Alleen blokken met minstens één van deze woorden zijn relevant
+
         Returns:
-            De inhoud van de webpagina als tekst
+            Async iterator over schone tekstblokken
         """
-        # Implementeer hier de werkelijke web fetch functionaliteit
-        # Dit is een placeholder
-        print(f"Ophalen van: {url}")
-        
-        # Simuleer een resultaat voor demo-doeleinden
-        return f"Dit is de gesimuleerde inhoud van {url}. In werkelijkheid zou dit de HTML of tekstinhoud van de pagina zijn."
-    
+        max_bytes = max_bytes or self.fetch_max_bytes
+        max_chars = self.fetch_max_chars if max_chars is None else max_chars
+        keywords = list(keywords) if keywords else None
+        extractor = HTMLTextExtractor(self.min_block_chars)
+        collected = 0
+
+        with tracer.span("tool.web_fetch") as span:
+            async with aclosing(self._stream_page(url, max_bytes)) as chunks:
+                async for html in chunks:
+                    for block in extractor.feed_chunk(html):
+                        if not is_relevant(block, keywords):
+                            continue
+                        yield block
+                        collected += len(block)
+                        span.set(chars=collected)
+                        if max_chars and collected >= max_chars:
+                            return
+
+            for block in extractor.finish():
+                if is_relevant(block, keywords):
+                    yield block
+                    collected += len(block)
+                    span.set(chars=collected)
+                    if max_chars and collected >= max_chars:
+                        return
+
+    async def _stream_page(self, url: str, max_bytes: int) -> AsyncIterator[str]:
+        """Lees een pagina als gedecodeerde tekststukken, uit de cache of van het netwerk.
+
+        De gelezen body (tot max_bytes) wordt gecomprimeerd in de cache opgeslagen;
+        de ruwe body staat nooit in zijn geheel in het geheugen. Stopt de lezer
+        eerder (max_chars), dan wordt alleen het gelezen deel als afgekapte entry
+        opgeslagen. Een volgende lezer krijgt dat begin uit de cache en leest
+        alleen van het netwerk verder als hij meer nodig heeft.
+        """
+        entry = None
+        prefix = None
+        key = make_web_key("page", url) if self.cache is not None else None
+        if self.cache is not None:
+            entry = await asyncio.to_thread(self.cache.lookup, key)
+            if entry is not None and entry.truncated and entry.raw_size < max_bytes:
+                # Alleen het begin van de pagina staat in de cache
+                prefix = entry if entry.fresh else None
+                entry = None
+            if entry is not None and entry.fresh:
+                self.cache.record("hit", entry.raw_size)
+                tracer.annotate(cache_hit=True, cache="hit")
+                async for text in self._read_cached(entry, max_bytes):
+                    yield text
+                return
+
+        skip = 0
+        if prefix is not None:
+            self.cache.record("hit", prefix.raw_size)
+            tracer.annotate(cache_hit=True, cache="prefix")
+            async for text in self._read_cached(prefix, max_bytes, final=False):
+                yield text
+            skip = prefix.raw_size
+
+        headers = entry.conditional_headers() if entry is not None else {}
+        async with self.http.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and entry is not None:
+                await asyncio.to_thread(self.cache.refresh, key, response.headers.get("etag"),
+                                        response.headers.get("last-modified"))
+                self.cache.record("revalidated", entry.raw_size)
+                tracer.annotate(cache_hit=True, cache="revalidated")
+                async for text in self._read_cached(entry, max_bytes):
+                    yield text
+                return
+
+            response.raise_for_status()
+            decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+            compressor = zlib.compressobj(self.cache.compression_level) if self.cache is not None else None
+            compressed = []
+            total = 0
+            truncated = False
+            try:
+                async for raw in response.aiter_bytes(self.fetch_chunk_size):
+                    if total + len(raw) > max_bytes:
+                        raw = raw[:max_bytes - total]
+                        truncated = True
+                    if compressor is not None:
+                        compressed.append(compressor.compress(raw))
+                    seen = max(0, min(len(raw), skip - total))
+                    total += len(raw)
+                    if seen:
+                        # Dit deel kreeg de lezer al uit de cache; alleen de decoder bijwerken
+                        decoder.decode(raw[:seen])
+                    yield decoder.decode(raw[seen:])
+                    if truncated:
+                        break
+                yield decoder.decode(b"", final=True)
+            except GeneratorExit:
+                # De lezer heeft genoeg; de rest wordt niet meer gedownload
+                if total > skip:
+                    await self._store_page(key, response, compressor, compressed, total, True)
+                raise
+            await self._store_page(key, response, compressor, compressed, total, truncated)
+
+    async def _store_page(self, key: Optional[str], response: httpx.Response, compressor, compressed: List[bytes],
+                    total: int, truncated: bool):
+        """Leg een gedownloade pagina vast in de trace en (gecomprimeerd) in de cache."""
+        tracer.annotate(bytes=total, truncated=truncated)
+        if self.cache is None:
+            return
+        self.cache.record("miss")
+        tracer.annotate(cache_hit=False, cache="miss")
+        if "no-store" not in response.headers.get("cache-control", ""):
+            compressed.append(compressor.flush())
+            await asyncio.to_thread(self.cache.store_compressed, key, "page", b"".join(compressed), total,
+                                    etag=response.headers.get("etag"),
+                                    last_modified=response.headers.get("last-modified"),
+                                    content_type=response.headers.get("content-type", ""),
+                                    truncated=truncated)
+
+    async def _read_cached(self, entry, max_bytes: int, final: bool = True) -> AsyncIterator[str]:
+        """Geef een gecachte body stuk voor stuk terug; elk stuk wordt in een thread gelezen."""
+        chunks = self._decode_cached(entry, max_bytes, final)
+        while True:
+            text = await asyncio.to_thread(next, chunks, None)
+            if text is None:
+                return
+            yield text
+
+    def _decode_cached(self, entry, max_bytes: int, final: bool = True) -> Iterable[str]:
+        """Decodeer een gecachte body incrementeel, begrensd door max_bytes.
+
+        Met final=False blijft een half teken aan het eind staan, zodat het
+        netwerk de body daarna kan afmaken.
+        """
+        charset = "utf-8"
+        for param in entry.content_type.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "charset" and value:
+                charset = value.strip('"')
+        try:
+            decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        total = 0
+        for raw in entry.iter_body(self.fetch_chunk_size):
+            raw = raw[:max_bytes - total]
+            total += len(raw)
+            yield decoder.decode(raw)
+            if total >= max_bytes:
+                break
+        if final:
+            yield decoder.decode(b"", final=True)
+
     async def news_search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         """Zoek naar nieuws over een bepaald onderwerp.
-        
+
         Args:
             query: De zoekopdracht
             num_results: Aantal resultaten om terug te geven
-            
+
         Returns:
             Lijst met nieuwsresultaten
         """
-        # Implementeer hier de werkelijke nieuws-API-integratie
-        # Dit is een placeholder
-        print(f"Zoeken naar nieuws over: {query}")
-        
-        # Simuleer resultaten voor demo-doeleinden
-        mock_results = [
-            {"title": f"Nieuws {i+1} over {query}", 
-             "source": f"Nieuwsbron {i+1}", 
-             "published_date": "2025-06-02", 
-             "url": f"https://news-example.com/news-{i+1}", 
-             "snippet": f"Dit is een voorbeeld nieuwsartikel over {query}..."} 
-            for i in range(num_results)
+        if not self.news_api_key:
+            # Zonder API key: gesimuleerde resultaten voor demo-doeleinden
+            return [
+                {"title": f"Nieuws {i+1} over {query}",
+                 "source": f"Nieuwsbron {i+1}",
+                 "published_date": "2025-06-02",
+                 "url": f"https://news-example.com/news-{i+1}",
+                 "snippet": f"Dit is een voorbeeld nieuwsartikel over {query}..."}
+                for i in range(num_results)
+            ]
+
+        data = json.loads(await self._cached_get(
+            "news",
+            self.news_endpoint,
+            params={"q": " ".join(query.split()), "pageSize": num_results, "sortBy": "publishedAt"},
+            headers={"X-Api-Key": self.news_api_key}
+        ))
+        return [
+            {"title": article.get("title", ""),
+             "source": (article.get("source") or {}).get("name", ""),
+             "published_date": (article.get("publishedAt") or "")[:10],
+             "url": article.get("url", ""),
+             "snippet": article.get("description") or ""}
+            for article in data.get("articles", [])[:num_results]
         ]
-        
-        return mock_results
\ No newline at end of file
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Geef de statistieken van de search/fetch cache terug (leeg zonder cache)."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    async def close(self):
+        """Sluit de HTTP client (en daarmee de open verbindingen) en de cache."""
+        await self.http.aclose()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,367 @@
+# Rate Limiter voor AutoGen Marketing Team
+
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, AsyncIterator
+
+# HTTP-statussen waarmee een provider aangeeft dat we te hard gaan (rate limit of overbelasting)
+OVERLOAD_STATUSES = (429, 503, 529)
+
+
+class TokenBucket:
+    """Eenvoudige token bucket met reserveringen.
+
+    Aanvragers reserveren direct een token (het saldo mag negatief worden) en
+    wachten daarna buiten de lock tot hun reservering gedekt is. Zo worden
+    wachtende aanvragen in volgorde bediend zonder aan een event loop vast te zitten.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        """Initialize de bucket.
+
+        Args:
+            rate_per_second: Aantal tokens dat per seconde wordt aangevuld
+            capacity: Maximaal aantal tokens (burst)
+        """
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Reserveer tokens en geef de benodigde wachttijd terug.
+
+        Args:
+            amount: Aantal te reserveren tokens
+
+        Returns:
+            Wachttijd in seconden voordat de reservering gedekt is
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """Geef (een deel van) een reservering terug; negatief trekt extra tokens af."""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def overload_status(error: BaseException) -> Optional[int]:
+    """Geef de HTTP-status van een fout als die op rate limiting of overbelasting wijst.
+
+    Herkent een status_code op de fout zelf (ModelCallError, SDK-fouten) of op
+    een bijgevoegde response (httpx).
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if status in OVERLOAD_STATUSES else None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Lees de door de provider gevraagde wachttijd uit een fout.
+
+    Kijkt naar een retry_after attribuut en anders naar de retry-after-ms en
+    retry-after headers van de response (seconden of een HTTP-datum).
+
+    Returns:
+        Wachttijd in seconden, of None als de provider niets opgeeft
+    """
+    value = getattr(error, "retry_after", None)
+    if value is not None:
+        return max(0.0, float(value))
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrency:
+    """AIMD-limiet op het aantal gelijktijdige calls naar een model.
+
+    De limiet start laag en groeit eerst met +1 per geslaagde call bij een
+    volle limiet (slow start: ongeveer een verdubbeling per ronde). Na de
+    eerste rate limit of overbelasting groeit hij nog maar met 1/limiet per
+    geslaagde call (ongeveer +1 per volle ronde), en elke nieuwe overbelasting
+    halveert hem. Meerdere fouten uit dezelfde golf tellen binnen de cooldown
+    maar één keer. Zo blijft het aantal calls net onder wat de provider
+    toelaat, in plaats van te wisselen tussen stilstand en throttling.
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float,
+                 decrease_factor: float = 0.5, cooldown_seconds: float = 1.0):
+        """Initialize de limiet.
+
+        Args:
+            initial: Startwaarde van de limiet
+            minimum: Ondergrens
+            maximum: Bovengrens
+            decrease_factor: Vermenigvuldiging bij een rate limit of overbelasting
+            cooldown_seconds: Minimale tijd tussen twee verlagingen
+        """
+        self.minimum = max(1.0, float(minimum))
+        self.maximum = max(self.minimum, float(maximum))
+        self.limit = min(self.maximum, max(self.minimum, float(initial)))
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self.active = 0
+        self.waiters: deque = deque()
+        self.slow_start = True
+        self._last_decrease = float("-inf")
+
+    def try_acquire(self) -> bool:
+        if self.active < int(self.limit):
+            self.active += 1
+            return True
+        return False
+
+    def free_slots(self) -> int:
+        return max(0, int(self.limit) - self.active)
+
+    def on_success(self):
+        # Alleen verhogen als de limiet ook werkelijk benut wordt
+        if self.active + 1 >= int(self.limit) or self.waiters:
+            step = 1.0 if self.slow_start else 1.0 / self.limit
+            self.limit = min(self.maximum, self.limit + step)
+
+    def on_overload(self) -> bool:
+        """Verlaag de limiet; geeft False als dat binnen de cooldown al gebeurde."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return False
+        self._last_decrease = now
+        self.slow_start = False
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        return True
+
+
+class _ModelLimit:
+    """Budget en concurrency van één model."""
+
+    def __init__(self, limit: Dict[str, Any]):
+        rpm = limit.get("requests_per_minute")
+        tpm = limit.get("tokens_per_minute")
+        self.requests = (TokenBucket(float(rpm) / 60, float(limit.get("burst", max(1.0, float(rpm) / 60))))
+                         if rpm else None)
+        self.tokens = (TokenBucket(float(tpm) / 60, float(limit.get("token_burst", float(tpm) / 6)))
+                       if tpm else None)
+        maximum = limit.get("max_concurrency", 32)
+        minimum = limit.get("min_concurrency", 1)
+        self.concurrency = AdaptiveConcurrency(limit.get("concurrency", minimum), minimum, maximum,
+                                               limit.get("decrease_factor", 0.5),
+                                               limit.get("cooldown_seconds", 1.0))
+        self.max_retries = limit.get("max_retries", 3)
+        self.backoff_seconds = limit.get("backoff_seconds", 1.0)
+        self.max_backoff_seconds = limit.get("max_backoff_seconds", 30.0)
+        self.paused_until = 0.0
+        self.throttled = 0
+
+
+class RateLimiter:
+    """Request-, token- en concurrency-budget per model (provider), gedeeld door alle agents.
+
+    Per model gelden een requests/minuut en een tokens/minuut bucket plus een
+    adaptieve (AIMD) limiet op het aantal gelijktijdige calls, die vanaf
+    min_concurrency (of "concurrency") opschaalt. Een 429 of overbelasting
+    (zie report_overload) verlaagt die limiet; alleen als de provider een
+    retry-after meegeeft wordt het model voor alle agents tegelijk gepauzeerd.
+
+    Configuratie voorbeeld::
+
+        {
+            "default": {"requests_per_minute": 60},
+            "claude-3-5-sonnet": {
+                "requests_per_minute": 50, "burst": 5,
+                "tokens_per_minute": 40000, "token_burst": 8000,
+                "min_concurrency": 1, "max_concurrency": 32,
+                "max_retries": 3, "backoff_seconds": 1.0
+            }
+        }
+
+    Modellen zonder eigen limiet en zonder "default" worden niet begrensd.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Initialize de rate limiter.
+
+        Args:
+            limits: Limieten per modelnaam
+        """
+        self.limits = limits or {}
+        self._models: Dict[str, Optional[_ModelLimit]] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, model: str) -> Optional[_ModelLimit]:
+        """Haal de limieten voor een model op (of maak ze aan)."""
+        if model not in self._models:
+            limit = self.limits.get(model, self.limits.get("default"))
+            self._models[model] = _ModelLimit(limit) if limit else None
+        return self._models[model]
+
+    @staticmethod
+    def _wake(state: _ModelLimit):
+        """Maak zoveel wachtenden wakker als er plaatsen vrij zijn (onder de lock)."""
+        free = state.concurrency.free_slots()
+        waiters = state.concurrency.waiters
+        while free > 0 and waiters:
+            loop, future = waiters.popleft()
+            if future.done():
+                continue
+            loop.call_soon_threadsafe(_resolve, future)
+            free -= 1
+
+    async def acquire(self, model: str, tokens: float = 0):
+        """Wacht tot er budget en een vrije plaats is voor een call naar het model.
+
+        Na elke acquire moet release volgen (zie slot).
+
+        Args:
+            model: Naam van het model
+            tokens: Verwacht aantal tokens van de call (input plus output)
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            future = None
+            with self._lock:
+                state = self._model(model)
+                if state is None:
+                    return
+                pause = state.paused_until - time.monotonic()
+                if pause <= 0:
+                    if state.concurrency.try_acquire():
+                        break
+                    future = loop.create_future()
+                    state.concurrency.waiters.append((loop, future))
+            if future is None:
+                await asyncio.sleep(pause)
+                continue
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Geef een eventuele wekroep door aan de volgende wachtende
+                with self._lock:
+                    self._wake(state)
+                raise
+
+        with self._lock:
+            wait = state.requests.reserve() if state.requests is not None else 0.0
+            if state.tokens is not None and tokens:
+                wait = max(wait, state.tokens.reserve(tokens))
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.release(model)
+                raise
+
+    def release(self, model: str):
+        """Geef de plaats van een afgeronde call vrij."""
+        with self._lock:
+            state = self._model(model)
+            if state is None:
+                return
+            state.concurrency.active = max(0, state.concurrency.active - 1)
+            self._wake(state)
+
+    @asynccontextmanager
+    async def slot(self, model: str, tokens: float = 0) -> AsyncIterator[None]:
+        """Context manager rond één call: acquire bij binnenkomst, release bij afsluiten.
+
+        Args:
+            model: Naam van het model
+            tokens: Verwacht aantal tokens van de call
+        """
+        await self.acquire(model, tokens)
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def report_success(self, model: str, reserved_tokens: float = 0, used_tokens: float = 0):
+        """Verwerk een geslaagde call: verhoog de concurrency en verreken het tokenverbruik.
+
+        Args:
+            model: Naam van het model
+            reserved_tokens: Bij acquire gereserveerde tokens
+            used_tokens: Werkelijk verbruik (0 = onbekend, reservering blijft staan)
+        """
+        with self._lock:
+            state = self._model(model)
+            if state is None:
+                return
+            state.concurrency.on_success()
+            if state.tokens is not None and used_tokens:
+                state.tokens.refund(reserved_tokens - used_tokens)
+            self._wake(state)
+
+    def report_overload(self, model: str, retry_after: Optional[float] = None,
+                        attempt: int = 0) -> float:
+        """Verwerk een 429 of overbelasting: verlaag de concurrency.
+
+        Met een retry-after van de provider wordt het hele model zo lang
+        gepauzeerd. Zonder retry-after wacht alleen de mislukte call (met
+        exponentiële backoff); de lagere limiet remt de andere calls al af.
+
+        Args:
+            model: Naam van het model
+            retry_after: Door de provider gevraagde wachttijd (None = exponentiële backoff)
+            attempt: Nummer van de mislukte poging (0 = eerste)
+
+        Returns:
+            Wachttijd in seconden voordat de mislukte call herhaald wordt
+        """
+        with self._lock:
+            state = self._model(model)
+            if state is None:
+                return 0.0
+            state.throttled += 1
+            state.concurrency.on_overload()
+            if retry_after is None:
+                delay = min(state.max_backoff_seconds, state.backoff_seconds * 2 ** attempt)
+                return delay * random.uniform(0.5, 1.0)
+            state.paused_until = max(state.paused_until, time.monotonic() + retry_after)
+            return retry_after
+
+    def max_retries(self, model: str) -> int:
+        """Aantal herhalingen na een 429 of overbelasting (0 zonder limiet voor het model)."""
+        with self._lock:
+            state = self._model(model)
+            return state.max_retries if state is not None else 0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Geef per model de huidige concurrency-limiet, lopende calls en throttles."""
+        with self._lock:
+            return {
+                model: {
+                    "concurrency_limit": round(state.concurrency.limit, 2),
+                    "active": state.concurrency.active,
+                    "waiting": len(state.concurrency.waiters),
+                    "throttled": state.throttled,
+                }
+                for model, state in self._models.items() if state is not None
+            }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,285 @@
+# Tracing en metrics voor AutoGen Marketing Team
+
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+# Grenzen van de latency-histogrammen in seconden
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# De span die in de huidige task/thread actief is (ouder van nieuwe spans)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """Eén gemeten stap (bijv. een modelcall) met attributen.
+
+    Attributen met een naam die eindigt op "_tokens" worden als tokens
+    geteld, "cache_hit" als cache hit/miss en "queue_wait_seconds" als
+    wachttijd in de metrics.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration",
+                 "attrs", "error", "_started")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time()
+        self.duration = 0.0
+        self.attrs = attrs
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set(self, **attrs: Any):
+        """Voeg attributen toe (bijv. token counts zodra de response binnen is)."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+            "parent_id": self.parent_id, "start": round(self.start, 6),
+            "duration_seconds": round(self.duration, 6), "error": self.error, **self.attrs,
+        }
+
+
+class _NoopSpan:
+    """Span die niets vastlegt, voor als tracing uit staat."""
+
+    def set(self, **attrs: Any):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Histogram:
+    """Cumulatieve histogram in OpenMetrics-vorm."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _escape(value: Any) -> str:
+    """Escape een labelwaarde volgens OpenMetrics."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    """Formatteer labels als {naam="waarde",...}."""
+    pairs = list(labels) + list(extra.items())
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class Tracer:
+    """Verzamelt spans en aggregeert ze tot metrics.
+
+    Elke afgeronde span wordt (indien geconfigureerd) als JSON-regel naar
+    een logbestand geschreven en telt mee in de latency-histogram van zijn
+    naam en agent. Token counts, cache hits en wachttijden worden als
+    aparte metrics opgeteld. De metrics zijn als OpenMetrics-tekst op te
+    vragen (render_openmetrics) of naar een bestand te schrijven.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """Initialize de tracer.
+
+        Args:
+            config: Zie configure
+        """
+        self._lock = threading.Lock()
+        self._jsonl = None
+        self.configure(config or {})
+
+    def configure(self, config: Dict[str, Any]):
+        """(Her)configureer de tracer.
+
+        Args:
+            config: Settings: enabled, jsonl_path (standaard logs/traces.jsonl,
+                leeg = geen JSONL), metrics_path (standaard logs/metrics.prom),
+                buckets
+        """
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+            self.enabled = config.get("enabled", False)
+            self.jsonl_path = config.get("jsonl_path", "logs/traces.jsonl")
+            self.metrics_path = config.get("metrics_path", "logs/metrics.prom")
+            self.buckets = tuple(config.get("buckets", DEFAULT_BUCKETS))
+            self._durations: Dict[Tuple, _Histogram] = {}
+            self._queue_waits: Dict[Tuple, _Histogram] = {}
+            self._tokens: Dict[Tuple, int] = {}
+            self._cache: Dict[Tuple, int] = {}
+            self._errors: Dict[Tuple, int] = {}
+            if self.enabled and self.jsonl_path:
+                directory = os.path.dirname(self.jsonl_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._jsonl = open(self.jsonl_path, "a", encoding="utf-8", buffering=1)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Any]:
+        """Meet een stap als span; geneste spans krijgen deze span als ouder.
+
+        Args:
+            name: Naam van de stap (bijv. "llm.call", "reviewer.parse")
+            **attrs: Attributen zoals agent, model of campaign_type
+
+        Returns:
+            Context manager die de span geeft (met set() voor extra attributen)
+        """
+        if not self.enabled:
+            yield _NOOP
+            return
+        span = Span(name, _current_span.get(), attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - span._started
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Afgesloten in een andere context (bijv. een async generator)
+                pass
+            self._finish(span)
+
+    def annotate(self, **attrs: Any):
+        """Voeg attributen toe aan de span die nu actief is (no-op zonder span)."""
+        span = _current_span.get() if self.enabled else None
+        if span is not None:
+            span.set(**attrs)
+
+    def record(self, name: str, duration: float, **attrs: Any):
+        """Leg een al gemeten stap vast als span onder de huidige span.
+
+        Args:
+            name: Naam van de stap
+            duration: Duur in seconden
+            **attrs: Attributen
+        """
+        if not self.enabled:
+            return
+        span = Span(name, _current_span.get(), attrs)
+        span.start -= duration
+        span.duration = duration
+        self._finish(span)
+
+    def _finish(self, span: Span):
+        """Verwerk een afgeronde span in de metrics en het logbestand."""
+        labels = (("span", span.name),)
+        if span.attrs.get("agent"):
+            labels += (("agent", str(span.attrs["agent"])),)
+        with self._lock:
+            histogram = self._durations.get(labels)
+            if histogram is None:
+                histogram = self._durations[labels] = _Histogram(self.buckets)
+            histogram.observe(span.duration)
+            if span.error:
+                self._errors[labels] = self._errors.get(labels, 0) + 1
+            for key, value in span.attrs.items():
+                if key.endswith("_tokens") and isinstance(value, (int, float)):
+                    token_labels = labels + (("kind", key[:-len("_tokens")]),)
+                    self._tokens[token_labels] = self._tokens.get(token_labels, 0) + int(value)
+            if "cache_hit" in span.attrs:
+                cache_labels = labels + (("result", "hit" if span.attrs["cache_hit"] else "miss"),)
+                self._cache[cache_labels] = self._cache.get(cache_labels, 0) + 1
+            wait = span.attrs.get("queue_wait_seconds")
+            if isinstance(wait, (int, float)):
+                waits = self._queue_waits.get(labels)
+                if waits is None:
+                    waits = self._queue_waits[labels] = _Histogram(self.buckets)
+                waits.observe(wait)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+    def render_openmetrics(self) -> str:
+        """Geef alle metrics als OpenMetrics-tekst (afgesloten met # EOF)."""
+        lines: List[str] = []
+        with self._lock:
+            for metric, histograms, help_text in (
+                ("marketing_span_duration_seconds", self._durations, "Duur van spans per stap en agent"),
+                ("marketing_queue_wait_seconds", self._queue_waits, "Wachttijd voor een stap (rate limit of queue)"),
+            ):
+                lines += [f"# TYPE {metric} histogram", f"# HELP {metric} {help_text}",
+                          f"# UNIT {metric} seconds"]
+                for labels, histogram in sorted(histograms.items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{metric}_bucket{_labels(labels, le=repr(float(bound)))} {count}")
+                    lines.append(f"{metric}_bucket{_labels(labels, le='+Inf')} {histogram.count}")
+                    lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+                    lines.append(f"{metric}_sum{_labels(labels)} {histogram.sum:.6f}")
+            for metric, counters, help_text in (
+                ("marketing_tokens", self._tokens, "Tokens per stap, agent en soort"),
+                ("marketing_cache_lookups", self._cache, "Cache lookups per stap en resultaat"),
+                ("marketing_span_errors", self._errors, "Spans die met een exception eindigden"),
+            ):
+                lines += [f"# TYPE {metric} counter", f"# HELP {metric} {help_text}"]
+                for labels, value in sorted(counters.items()):
+                    lines.append(f"{metric}_total{_labels(labels)} {value}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, path: Optional[str] = None) -> Optional[str]:
+        """Schrijf de metrics atomair naar een bestand.
+
+        Args:
+            path: Doelbestand (standaard metrics_path uit de config)
+
+        Returns:
+            Het pad, of None als tracing uit staat of er geen pad is
+        """
+        path = path or self.metrics_path
+        if not self.enabled or not path:
+            return None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_openmetrics())
+        os.replace(tmp_path, path)
+        return path
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Geef per span (en agent) aantal, totale en gemiddelde duur."""
+        with self._lock:
+            return {
+                "/".join(value for _, value in labels): {
+                    "count": histogram.count,
+                    "total_seconds": round(histogram.sum, 3),
+                    "mean_seconds": round(histogram.sum / histogram.count, 4) if histogram.count else 0.0,
+                }
+                for labels, histogram in sorted(self._durations.items())
+            }
+
+    def close(self):
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+# Process-brede tracer; MarketingTeam configureert hem met de "tracing" sectie
+tracer = Tracer()
@@ -10,12 +10,12 @@ from typing import Dict, Any
 # Voeg de src directory toe aan sys.path zodat we de modules kunnen importeren
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from src.main import MarketingTeam
+from src.main import lease_marketing_team
 from src.web.components.header import render_header
 from src.web.components.sidebar import render_sidebar
 from src.web.components.form import render_form
 from src.web.components.results import render_results
-from src.web.components.processing import process_with_animation
+from src.orchestration import events
 
 # Pagina configuratie
 st.set_page_config(
@@ -25,6 +25,42 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+async def render_stream(event_stream) -> Dict[str, Any]:
+    """Render de events van MarketingTeam.run_stream incrementeel.
+    
+    Args:
+        event_stream: Async iterator met events van run_stream
+        
+    Returns:
+        Het eindresultaat uit het done event
+    """
+    draft_col, review_col = st.columns(2)
+    draft_col.subheader("Concept")
+    review_col.subheader("Beoordeling")
+    draft_placeholder = draft_col.empty()
+    review_placeholder = review_col.empty()
+    score_placeholder = st.empty()
+    
+    draft_text = ""
+    review_text = ""
+    results: Dict[str, Any] = {}
+    
+    async for event in event_stream:
+        if event["type"] == events.DRAFT_CHUNK:
+            draft_text += event["text"]
+            draft_placeholder.markdown(draft_text + "▌")
+        elif event["type"] == events.REVIEW_CHUNK:
+            draft_placeholder.markdown(draft_text)
+            review_text += event["text"]
+            review_placeholder.markdown(review_text + "▌")
+        elif event["type"] == events.SCORE:
+            review_placeholder.markdown(review_text)
+            score_placeholder.metric("Score", f"{event['score']}/10")
+        elif event["type"] == events.DONE:
+            results = event["result"]
+    
+    return results
+
 # Hoofdfunctie voor de app
 async def main():
     # Render de header
@@ -41,17 +77,15 @@ async def main():
         if not form_data["brand_info"] or not form_data["target_audience"] or not form_data["prompt"]:
             st.error("Vul alle velden in om content te genereren.")
         else:
-            # Initialiseer MarketingTeam
-            marketing_team = MarketingTeam()
-            
-            # Process met animatie
-            results = await process_with_animation(
-                marketing_team.run,
-                prompt=form_data["prompt"],
-                campaign_type=form_data["campaign_type"],
-                brand_info=form_data["brand_info"],
-                target_audience=form_data["target_audience"]
-            )
+            # Hergebruik het gedeelde MarketingTeam (wordt alleen opnieuw gebouwd als de config wijzigt)
+            async with lease_marketing_team() as marketing_team:
+                # Stream de voortgang zodat de eerste tokens direct zichtbaar zijn
+                results = await render_stream(marketing_team.run_stream(
+                    prompt=form_data["prompt"],
+                    campaign_type=form_data["campaign_type"],
+                    brand_info=form_data["brand_info"],
+                    target_audience=form_data["target_audience"]
+                ))
             
             # Render de resultaten
             render_results(results)
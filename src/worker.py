@@ -0,0 +1,138 @@
+# Worker entry point voor AutoGen Marketing Team
+
+import os
+import json
+import signal
+import asyncio
+import argparse
+import multiprocessing
+from typing import Dict, List, Any, Optional
+
+from jobs.factory import create_broker
+from orchestration.batch import load_campaigns
+
+
+def load_jobs_config(config_path: str) -> Dict[str, Any]:
+    """Lees de "jobs" sectie uit de configuratie (leeg als het bestand ontbreekt)."""
+    config = {}
+    if os.path.exists(config_path):
+        with open(config_path, "r") as f:
+            config = json.load(f)
+    return config.get("jobs", {})
+
+
+async def enqueue_file(input_path: str, config_path: str) -> List[str]:
+    """Zet alle campagnes uit een JSONL-bestand in de queue.
+
+    Args:
+        input_path: JSONL-bestand met één campagne-specificatie per regel
+        config_path: Pad naar het configuratiebestand
+
+    Returns:
+        De job ids
+    """
+    broker = create_broker(load_jobs_config(config_path))
+    try:
+        job_ids = [await broker.enqueue(campaign) for campaign in load_campaigns(input_path)]
+    finally:
+        await broker.close()
+    for job_id in job_ids:
+        print(job_id)
+    return job_ids
+
+
+async def show_status(job_id: Optional[str], config_path: str):
+    """Print de status van één job, of de aantallen per status."""
+    broker = create_broker(load_jobs_config(config_path))
+    try:
+        info = await broker.get(job_id) if job_id else await broker.stats()
+    finally:
+        await broker.close()
+    print(json.dumps(info, ensure_ascii=False, indent=2) if info else f"Onbekende job: {job_id}")
+
+
+async def run_worker(config_path: str, concurrency: int):
+    """Draai één worker tot SIGTERM/SIGINT; lopende jobs worden eerst afgerond."""
+    from main import lease_marketing_team
+    from jobs.worker import JobWorker
+
+    broker = create_broker(load_jobs_config(config_path))
+    try:
+        async with lease_marketing_team(config_path) as team:
+            worker = JobWorker(broker, team, concurrency)
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.add_signal_handler(sig, worker.stop)
+
+            print(f"Worker gestart (concurrency {concurrency})")
+            try:
+                stats = await worker.run()
+            finally:
+                await team.flush_results(usage_label=f"worker:{os.getpid()}")
+                await team.aclose()
+    finally:
+        await broker.close()
+    print(f"Worker gestopt: {stats['processed']} jobs verwerkt, {stats['failed']} pogingen mislukt")
+
+
+def _process_main(config_path: str, concurrency: int):
+    """Entry point van een worker-proces."""
+    asyncio.run(run_worker(config_path, concurrency))
+
+
+def serve(config_path: str, processes: Optional[int] = None, concurrency: Optional[int] = None):
+    """Start worker-processen, elk met een eigen MarketingTeam en event loop.
+
+    Args:
+        config_path: Pad naar het configuratiebestand
+        processes: Aantal processen (standaard jobs.worker.processes)
+        concurrency: Gelijktijdige jobs per proces (standaard jobs.worker.concurrency)
+    """
+    jobs_config = load_jobs_config(config_path)
+    worker_config = jobs_config.get("worker", {})
+    processes = processes or worker_config.get("processes", 1)
+    concurrency = concurrency or worker_config.get("concurrency", 2)
+
+    # De in-memory broker leeft binnen één proces
+    if jobs_config.get("broker", "sqlite") == "memory" or processes <= 1:
+        _process_main(config_path, concurrency)
+        return
+
+    workers = [multiprocessing.Process(target=_process_main, args=(config_path, concurrency),
+                                       name=f"worker-{i}")
+               for i in range(processes)]
+    for process in workers:
+        process.start()
+
+    # Stuur SIGTERM door zodat elk proces zijn lopende jobs afrondt
+    def forward(signum, frame):
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in workers:
+        process.join()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse de command-line argumenten."""
+    parser = argparse.ArgumentParser(description="AutoGen Marketing Team worker")
+    parser.add_argument("--processes", type=int, help="Aantal worker-processen")
+    parser.add_argument("--concurrency", type=int, help="Gelijktijdige jobs per proces")
+    parser.add_argument("--enqueue", help="JSONL-bestand met campagnes om in de queue te zetten")
+    parser.add_argument("--status", nargs="?", const="",
+                        help="Toon de status van een job (zonder id: aantallen per status)")
+    parser.add_argument("--config", default="config/config.json", help="Pad naar configuratiebestand")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.enqueue:
+        asyncio.run(enqueue_file(args.enqueue, args.config))
+    elif args.status is not None:
+        asyncio.run(show_status(args.status, args.config))
+    else:
+        serve(args.config, args.processes, args.concurrency)
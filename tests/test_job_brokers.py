@@ -0,0 +1,158 @@
+# Tests voor de job brokers en de lease-verlenging van de worker
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from jobs.base import QUEUED, RUNNING, DONE, DEAD
+from jobs.memory_broker import InMemoryBroker
+from jobs.sqlite_broker import SQLiteBroker
+from jobs.worker import JobWorker
+
+CAMPAIGN = {"prompt": "Lancering", "campaign_type": "Tweet",
+            "brand_info": "Koffiebar", "target_audience": "Studenten"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_broker(request, tmp_path):
+    brokers = []
+
+    def make(**config):
+        config = {"retry_backoff_seconds": 0.0, "poll_interval": 0.01, **config}
+        if request.param == "memory":
+            broker = InMemoryBroker(config)
+        else:
+            broker = SQLiteBroker({"path": str(tmp_path / "jobs.sqlite"), **config})
+        brokers.append(broker)
+        return broker
+
+    yield make
+    for broker in brokers:
+        asyncio.run(broker.close())
+
+
+def test_ack_stores_result(make_broker):
+    async def scenario():
+        broker = make_broker()
+        job_id = await broker.enqueue(CAMPAIGN)
+        job = await broker.dequeue(timeout=1)
+        assert job.id == job_id and job.payload == CAMPAIGN and job.attempts == 1
+        assert (await broker.get(job_id))["status"] == RUNNING
+        assert await broker.ack(job, {"content": "klaar"})
+        status = await broker.get(job_id)
+        assert status["status"] == DONE
+        assert status["result"] == {"content": "klaar"}
+        assert await broker.dequeue(timeout=0.05) is None
+
+    asyncio.run(scenario())
+
+
+def test_nack_retries_then_dead_letters(make_broker):
+    async def scenario():
+        broker = make_broker(max_attempts=2)
+        job_id = await broker.enqueue(CAMPAIGN)
+        job = await broker.dequeue(timeout=1)
+        await broker.nack(job, "eerste fout")
+        assert (await broker.get(job_id))["status"] == QUEUED
+
+        job = await broker.dequeue(timeout=1)
+        assert job.attempts == 2 and job.final_attempt
+        await broker.nack(job, "tweede fout")
+        status = await broker.get(job_id)
+        assert status["status"] == DEAD
+        assert status["error"] == "tweede fout"
+        assert await broker.dequeue(timeout=0.05) is None
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_is_offered_again(make_broker):
+    async def scenario():
+        broker = make_broker(visibility_timeout=0.05, max_attempts=3)
+        job_id = await broker.enqueue(CAMPAIGN)
+        first = await broker.dequeue(timeout=1)
+        await asyncio.sleep(0.1)
+        second = await broker.dequeue(timeout=1)
+        assert second.id == job_id and second.attempts == 2
+        # De worker met de verlopen lease kan niet meer verlengen
+        assert not await broker.extend(first)
+        assert await broker.extend(second)
+
+    asyncio.run(scenario())
+
+
+def test_stale_ack_and_nack_are_ignored(make_broker):
+    async def scenario():
+        broker = make_broker(visibility_timeout=0.05, max_attempts=3)
+        job_id = await broker.enqueue(CAMPAIGN)
+        first = await broker.dequeue(timeout=1)
+        await asyncio.sleep(0.1)
+        second = await broker.dequeue(timeout=1)
+        # De eerste poging mag het resultaat van de tweede niet overschrijven
+        assert not await broker.ack(first, {"content": "oud"})
+        assert not await broker.nack(first, "oude fout")
+        assert (await broker.get(job_id))["status"] == RUNNING
+        assert await broker.ack(second, {"content": "nieuw"})
+        assert (await broker.get(job_id))["result"] == {"content": "nieuw"}
+        assert not await broker.ack(first, {"content": "oud"})
+        assert (await broker.get(job_id))["result"] == {"content": "nieuw"}
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_on_final_attempt_dead_letters(make_broker):
+    async def scenario():
+        broker = make_broker(visibility_timeout=0.05, max_attempts=2)
+        job_id = await broker.enqueue(CAMPAIGN)
+        for _ in range(2):
+            assert await broker.dequeue(timeout=1) is not None
+            await asyncio.sleep(0.1)
+        assert await broker.dequeue(timeout=0.1) is None
+        status = await broker.get(job_id)
+        assert status["status"] == DEAD
+        assert status["attempts"] == 2
+        assert "Lease verlopen" in status["error"]
+
+    asyncio.run(scenario())
+
+
+def test_extend_keeps_the_lease(make_broker):
+    async def scenario():
+        broker = make_broker(visibility_timeout=0.1)
+        await broker.enqueue(CAMPAIGN)
+        job = await broker.dequeue(timeout=1)
+        for _ in range(3):
+            await asyncio.sleep(0.05)
+            assert await broker.extend(job)
+        assert await broker.dequeue(timeout=0.05) is None
+
+    asyncio.run(scenario())
+
+
+class SlowTeam:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.runs = 0
+
+    async def run_campaign(self, **campaign):
+        self.runs += 1
+        await asyncio.sleep(self.seconds)
+        return {"content": campaign["prompt"]}
+
+
+def test_worker_renews_lease_of_long_runs(make_broker):
+    async def scenario():
+        broker = make_broker(visibility_timeout=0.1)
+        team = SlowTeam(0.35)
+        job_id = await broker.enqueue(CAMPAIGN)
+        worker = JobWorker(broker, team, concurrency=2, poll_timeout=0.02)
+        assert await worker.run(max_jobs=1) == {"processed": 1, "failed": 0}
+        assert team.runs == 1
+        status = await broker.get(job_id)
+        assert status["status"] == DONE and status["attempts"] == 1
+
+    asyncio.run(scenario())